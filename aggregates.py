@@ -0,0 +1,393 @@
+"""
+Потокова агрегація відстаней без збереження списку результатів
+
+Статистики оновлюються фрагментами і займають сталу пам'ять:
+  RunningStats   — кількість, мінімум, максимум, середнє, дисперсія
+                   (Велфорд для окремих значень, Чан для об'єднання фрагментів)
+  Histogram      — гістограма з рівними інтервалами на [low, high)
+  QuantileSketch — квантилі з гарантованою відносною похибкою (як DDSketch)
+
+Часткові агрегати з різних фрагментів або процесів об'єднуються через merge().
+"""
+
+import math
+from array import array
+from collections import Counter
+from itertools import islice, repeat
+from operator import mul, sub, truediv
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple, Union
+from distances import DISTANCE_KERNELS
+
+
+DEFAULT_CHUNK_SIZE = 65_536
+# Відносна похибка квантилів за замовчуванням (1%)
+DEFAULT_RELATIVE_ACCURACY = 0.01
+# Межа кількості кошиків ескізу; далі найменші кошики зливаються
+DEFAULT_MAX_BUCKETS = 2048
+
+
+def _as_values(values: Iterable[float]):
+    if isinstance(values, (array, memoryview, list, tuple)):
+        return values
+    return array('d', values)
+
+
+class RunningStats:
+    """Кількість, мінімум, максимум, середнє та дисперсія потоку значень"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # сума квадратів відхилень від середнього
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        """Одне значення (алгоритм Велфорда)"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def add_many(self, values: Iterable[float]) -> None:
+        """Фрагмент значень: статистики фрагмента у два проходи, потім merge"""
+        values = _as_values(values)
+        n = len(values)
+        if not n:
+            return
+        chunk = RunningStats()
+        chunk.count = n
+        chunk.mean = math.fsum(values) / n
+        deviations = list(map(sub, values, repeat(chunk.mean)))
+        chunk.m2 = math.fsum(map(mul, deviations, deviations))
+        chunk.min = min(values)
+        chunk.max = max(values)
+        self.merge(chunk)
+
+    def merge(self, other: 'RunningStats') -> 'RunningStats':
+        """Додає інший агрегат (формула Чана); повертає self"""
+        if not other.count:
+            return self
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta**2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self) -> float:
+        """Дисперсія генеральної сукупності"""
+        return self.m2 / self.count if self.count else math.nan
+
+    @property
+    def sample_variance(self) -> float:
+        """Вибіркова дисперсія (ділення на n - 1)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance) if self.count else math.nan
+
+    def __repr__(self) -> str:
+        return (f"RunningStats(n={self.count}, min={self.min:.6g}, max={self.max:.6g}, "
+                f"mean={self.mean:.6g}, stdev={self.stdev:.6g})")
+
+
+class Histogram:
+    """
+    Гістограма з bins рівними інтервалами на [low, high)
+    Значення поза межами рахуються в underflow / overflow
+    """
+
+    def __init__(self, low: float, high: float, bins: int):
+        if not high > low:
+            raise ValueError("high має бути більшим за low")
+        if bins < 1:
+            raise ValueError("bins має бути додатним")
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.counts = [0] * bins
+        self.underflow = 0
+        self.overflow = 0
+
+    @property
+    def edges(self) -> list:
+        width = (self.high - self.low) / self.bins
+        return [self.low + i * width for i in range(self.bins)] + [self.high]
+
+    def add(self, value: float) -> None:
+        self.add_many((value,))
+
+    def add_many(self, values: Iterable[float]) -> None:
+        low, high, bins, counts = self.low, self.high, self.bins, self.counts
+        scale = bins / (high - low)
+        for value in values:
+            if value < low:
+                self.underflow += 1
+            elif value >= high:
+                self.overflow += 1
+            else:
+                # min() захищає від округлення біля верхньої межі
+                counts[min(int((value - low) * scale), bins - 1)] += 1
+
+    def merge(self, other: 'Histogram') -> 'Histogram':
+        if (other.low, other.high, other.bins) != (self.low, self.high, self.bins):
+            raise ValueError("Об'єднувати можна лише гістограми з однаковими інтервалами")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        return self
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts) + self.underflow + self.overflow
+
+    def __repr__(self) -> str:
+        return (f"Histogram([{self.low:g}, {self.high:g}), bins={self.bins}, "
+                f"n={self.total}, underflow={self.underflow}, overflow={self.overflow})")
+
+
+class QuantileSketch:
+    """
+    Ескіз квантилів невід'ємних значень з відносною похибкою relative_accuracy
+
+    Значення x потрапляє в кошик i = ⌈log_γ x⌉, γ = (1 + α) / (1 - α);
+    представник кошика 2γ^i / (γ + 1) відрізняється від будь-якого значення
+    кошика не більше ніж на α відносно. Кількість кошиків обмежена max_buckets:
+    при переповненні зливаються найменші, тож похибка може зрости лише
+    для найнижчих квантилів.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+                 max_buckets: int = DEFAULT_MAX_BUCKETS):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy має бути в інтервалі (0, 1)")
+        if max_buckets < 1:
+            raise ValueError("max_buckets має бути додатним")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self.add_many((value,))
+
+    def add_many(self, values: Iterable[float]) -> None:
+        values = _as_values(values)
+        try:
+            # Швидкий шлях без циклу Python: усі значення додатні та скінченні
+            # (нуль чи від'ємне дають ValueError, нескінченність — OverflowError)
+            counts = Counter(map(math.ceil, map(truediv, map(math.log, values),
+                                                repeat(self._log_gamma))))
+        except (ValueError, OverflowError):
+            self._add_slowly(values)
+        else:
+            buckets = self.buckets
+            for key, count in counts.items():
+                buckets[key] = buckets.get(key, 0) + count
+            self.count += len(values)
+        self._collapse()
+
+    def _add_slowly(self, values: Iterable[float]) -> None:
+        """Поелементно: нулі окремо, від'ємні, нескінченні та NaN — помилка"""
+        buckets, log, ceil, log_gamma = self.buckets, math.log, math.ceil, self._log_gamma
+        inf = math.inf
+        added = 0
+        for value in values:
+            added += 1
+            if 0 < value < inf:
+                key = ceil(log(value) / log_gamma)
+                buckets[key] = buckets.get(key, 0) + 1
+            elif value == 0:
+                self.zero_count += 1
+            else:
+                self.count += added - 1
+                self._collapse()
+                raise ValueError(f"Ескіз приймає лише скінченні невід'ємні значення, отримано {value}")
+        self.count += added
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        if other.gamma != self.gamma:
+            raise ValueError("Об'єднувати можна лише ескізи з однаковою точністю")
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self._collapse()
+        return self
+
+    def _collapse(self) -> None:
+        excess = len(self.buckets) - self.max_buckets
+        if excess <= 0:
+            return
+        keys = sorted(self.buckets)
+        merged = sum(self.buckets.pop(key) for key in keys[:excess])
+        self.buckets[keys[excess]] += merged
+
+    def quantile(self, q: float) -> float:
+        """Значення квантиля q ∈ [0, 1] (ранг ⌊q·(n - 1)⌋ відсортованих значень)"""
+        if not 0 <= q <= 1:
+            raise ValueError("q має бути в інтервалі [0, 1]")
+        if not self.count:
+            return math.nan
+        rank = int(q * (self.count - 1))
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                return 2 * self.gamma**key / (self.gamma + 1)
+        return 2 * self.gamma**max(self.buckets) / (self.gamma + 1)
+
+    def __repr__(self) -> str:
+        return (f"QuantileSketch(n={self.count}, α={self.relative_accuracy:g}, "
+                f"buckets={len(self.buckets)})")
+
+
+class DistanceAggregate:
+    """
+    Усі статистики разом: RunningStats, необов'язкова гістограма
+    (histogram=(low, high, bins)) та ескіз квантилів (relative_accuracy=None вимикає)
+    """
+
+    def __init__(self, histogram: Optional[Tuple[float, float, int]] = None,
+                 relative_accuracy: Optional[float] = DEFAULT_RELATIVE_ACCURACY):
+        self.stats = RunningStats()
+        self.histogram = Histogram(*histogram) if histogram is not None else None
+        self.sketch = QuantileSketch(relative_accuracy) if relative_accuracy is not None else None
+
+    def add_many(self, values: Iterable[float]) -> None:
+        """
+        Фрагмент значень; весь фрагмент перевіряється до оновлення будь-якої статистики,
+        тож після помилки RunningStats, гістограма та ескіз лишаються узгодженими
+        """
+        values = _as_values(values)
+        if not all(map(math.isfinite, values)):
+            bad = next(value for value in values if not math.isfinite(value))
+            raise ValueError(f"Агрегат приймає лише скінченні значення, отримано {bad}")
+        if self.sketch is not None and len(values) and min(values) < 0:
+            raise ValueError(f"Ескіз приймає лише невід'ємні значення, отримано {min(values)}")
+        self.stats.add_many(values)
+        if self.histogram is not None:
+            self.histogram.add_many(values)
+        if self.sketch is not None:
+            self.sketch.add_many(values)
+
+    def add(self, value: float) -> None:
+        self.add_many((value,))
+
+    def merge(self, other: 'DistanceAggregate') -> 'DistanceAggregate':
+        if (self.histogram is None) != (other.histogram is None) or \
+                (self.sketch is None) != (other.sketch is None):
+            raise ValueError("Об'єднувати можна лише агрегати з однаковим набором статистик")
+        self.stats.merge(other.stats)
+        if self.histogram is not None:
+            self.histogram.merge(other.histogram)
+        if self.sketch is not None:
+            self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def count(self) -> int:
+        return self.stats.count
+
+    def quantile(self, q: float) -> float:
+        if self.sketch is None:
+            raise ValueError("Ескіз квантилів вимкнено (relative_accuracy=None)")
+        return self.sketch.quantile(q)
+
+    def summary(self, quantiles: Sequence[float] = (0.5, 0.9, 0.99)) -> dict:
+        """Словник підсумкових значень (зручно для JSON)"""
+        result = {
+            'count': self.stats.count, 'min': self.stats.min, 'max': self.stats.max,
+            'mean': self.stats.mean, 'variance': self.stats.variance, 'stdev': self.stats.stdev,
+        }
+        if self.sketch is not None:
+            result['quantiles'] = {q: self.sketch.quantile(q) for q in quantiles}
+        if self.histogram is not None:
+            result['histogram'] = {'edges': self.histogram.edges, 'counts': list(self.histogram.counts),
+                                   'underflow': self.histogram.underflow,
+                                   'overflow': self.histogram.overflow}
+        return result
+
+    def __repr__(self) -> str:
+        return f"DistanceAggregate({self.stats!r})"
+
+
+def merge_all(aggregates: Iterable[DistanceAggregate]) -> DistanceAggregate:
+    """Об'єднує часткові агрегати (наприклад, від різних процесів) в один"""
+    aggregates = iter(aggregates)
+    try:
+        result = next(aggregates)
+    except StopIteration:
+        raise ValueError("Немає агрегатів для об'єднання")
+    for aggregate in aggregates:
+        result.merge(aggregate)
+    return result
+
+
+def aggregate_chunks(chunks: Iterable[tuple], metric: str,
+                     histogram: Optional[Tuple[float, float, int]] = None,
+                     relative_accuracy: Optional[float] = DEFAULT_RELATIVE_ACCURACY,
+                     aggregate: Optional[DistanceAggregate] = None) -> DistanceAggregate:
+    """
+    Агрегує відстані для потоку фрагментів (p1, p2) — колонкових наборів
+    або колонки та точки, як у пакетних функціях; metric — ключ DISTANCE_KERNELS
+    """
+    _, kernel = _kernel(metric)
+    aggregate = aggregate or DistanceAggregate(histogram, relative_accuracy)
+    for p1, p2 in chunks:
+        aggregate.add_many(kernel(p1, p2))
+    return aggregate
+
+
+def aggregate_pairs(pairs: Iterable[tuple], distance: Union[str, Callable],
+                    chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    histogram: Optional[Tuple[float, float, int]] = None,
+                    relative_accuracy: Optional[float] = DEFAULT_RELATIVE_ACCURACY,
+                    aggregate: Optional[DistanceAggregate] = None) -> DistanceAggregate:
+    """
+    Агрегує відстані для потоку пар точок (p1, p2)
+    distance — ключ DISTANCE_KERNELS (пари пакуються у колонки по chunk_size
+    і йдуть через пакетну функцію) або скалярна функція відстані
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size має бути додатним")
+    aggregate = aggregate or DistanceAggregate(histogram, relative_accuracy)
+    pairs = iter(pairs)
+    if callable(distance):
+        while True:
+            values = array('d', [distance(p1, p2) for p1, p2 in islice(pairs, chunk_size)])
+            if not values:
+                return aggregate
+            aggregate.add_many(values)
+    array_type, kernel = _kernel(distance)
+    while True:
+        chunk = list(islice(pairs, chunk_size))
+        if not chunk:
+            return aggregate
+        aggregate.add_many(kernel(array_type.from_points([p1 for p1, _ in chunk]),
+                                  array_type.from_points([p2 for _, p2 in chunk])))
+
+
+def _kernel(metric: str):
+    try:
+        return DISTANCE_KERNELS[metric]
+    except KeyError:
+        raise ValueError(f"Невідома метрика: {metric!r}; доступні: {sorted(DISTANCE_KERNELS)}")
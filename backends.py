@@ -0,0 +1,570 @@
+"""
+Змінні бекенди пакетних відстаней і перетворень з калібруванням
+
+Пакетні функції distances (distance_*_batch) та векторизовані перетворення
+колонкових наборів (CartesianArray2D.from_polar тощо) мають кілька реалізацій:
+  'python' — еталонні функції distances / coordinate_systems; побітово
+             збігаються зі скалярними функціями (за замовчуванням)
+  'stdlib' — map з math.dist / math.hypot без циклу на рівні Python
+             (лише декартові відстані та перетворення з декартової системи)
+  'numpy'  — векторні операції NumPy, якщо numpy імпортується
+Результати 'stdlib' і 'numpy' відрізняються від еталону на кілька ulp;
+там, де рахується acos від значення біля ±1 (дуга, полярний кут), — до ~1e-8
+відносно, як і в самих точних формулах.
+
+Калібрування один раз міряє кожен бекенд на пакетах різного розміру й
+обирає найшвидший для кожної операції та діапазону розмірів:
+  auto_select()                 # завантажити вибір з файла або відкалібрувати й зберегти
+  use_backend('numpy')          # явний вибір для всіх (чи лише вказаних) операцій
+  reset_backends()              # повернути еталонні функції
+
+  COORDINATES_BACKEND=auto python3 main.py ...        # те саме в точках входу
+  COORDINATES_BACKEND=numpy python3 main.py ...       # (distances.enable_from_environment)
+  COORDINATES_BACKEND=choice.json python3 main.py ... # вибір з указаного файла
+  python3 main.py calibrate                           # відкалібрувати заново
+
+Вибір підміняє функції так само, як instrumentation: атрибути distances,
+статичні методи класів і записи реєстрів instrumentation.DISPATCH_TABLES. Якщо
+потрібне й інструментування, вмикайте його після вибору бекендів — тоді
+воно рахує виклики диспетчерів.
+"""
+
+import functools
+import json
+import math
+import os
+import platform
+import random
+import time
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import distances
+from coordinate_systems import (
+    CartesianArray2D, PolarArray,
+    CartesianArray3D, SphericalArray, _column_typecode, _float_view
+)
+from distances import _batch_length, _batch_typecode, _column, _result
+from instrumentation import _ORIGINALS, _current, _install, _rebind
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+ENV_VAR = 'COORDINATES_BACKEND'
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'coordinate_systems', 'backends.json')
+
+# Розміри пакетів, на яких міряє calibrate()
+DEFAULT_SIZES = (16, 256, 4096, 65_536)
+
+# Мінімальна кількість точок в одному замірі: малі пакети викликаються кілька разів
+_CALIBRATION_POINTS = 16_384
+
+_CACHE_VERSION = 1
+
+# Операція -> (власник, атрибут); власник — модуль distances або клас колонкового набору
+OPERATIONS = {
+    'distance_2d_cartesian_batch': (distances, 'distance_2d_cartesian_batch'),
+    'distance_2d_polar_batch': (distances, 'distance_2d_polar_batch'),
+    'distance_3d_cartesian_batch': (distances, 'distance_3d_cartesian_batch'),
+    'distance_3d_spherical_chord_batch': (distances, 'distance_3d_spherical_chord_batch'),
+    'distance_3d_spherical_arc_batch': (distances, 'distance_3d_spherical_arc_batch'),
+    'CartesianArray2D.from_polar': (CartesianArray2D, 'from_polar'),
+    'PolarArray.from_cartesian': (PolarArray, 'from_cartesian'),
+    'CartesianArray3D.from_spherical': (CartesianArray3D, 'from_spherical'),
+    'SphericalArray.from_cartesian': (SphericalArray, 'from_cartesian'),
+}
+
+_ARRAY_TYPES = frozenset((CartesianArray2D, PolarArray, CartesianArray3D, SphericalArray))
+
+# Steps — кроки вибору: ((від n, бекенд), ...) за зростанням n, перший крок від 0
+Steps = Tuple[Tuple[int, str], ...]
+
+
+@dataclass(frozen=True)
+class Backend:
+    """Набір реалізацій операцій з OPERATIONS; відсутні операції виконує 'python'"""
+    name: str
+    kernels: Dict[str, Callable]
+    description: str = ''
+
+
+# Бекенд 'stdlib': map з math.dist / math.hypot замість генераторів списків
+# ---------------------------------------------------------------------------
+
+def _stdlib_distance_2d_cartesian(p1, p2, out=None) -> array:
+    n = _batch_length(p1, p2, CartesianArray2D)
+    typecode = _batch_typecode(p1, p2)
+    return _result(map(math.dist,
+                       zip(_column(p1, 'x', n), _column(p1, 'y', n)),
+                       zip(_column(p2, 'x', n), _column(p2, 'y', n))), out, typecode)
+
+
+def _stdlib_distance_3d_cartesian(p1, p2, out=None) -> array:
+    n = _batch_length(p1, p2, CartesianArray3D)
+    typecode = _batch_typecode(p1, p2)
+    return _result(map(math.dist,
+                       zip(_column(p1, 'x', n), _column(p1, 'y', n), _column(p1, 'z', n)),
+                       zip(_column(p2, 'x', n), _column(p2, 'y', n), _column(p2, 'z', n))),
+                   out, typecode)
+
+
+def _stdlib_polar_from_cartesian(cartesian_array: CartesianArray2D) -> PolarArray:
+    xs, ys = cartesian_array.x, cartesian_array.y
+    typecode = cartesian_array.typecode()
+    return PolarArray(array(typecode, map(math.hypot, xs, ys)),
+                      array(typecode, map(math.atan2, ys, xs)))
+
+
+def _stdlib_spherical_from_cartesian(cartesian_array: CartesianArray3D) -> SphericalArray:
+    acos = math.acos
+    xs, ys, zs = cartesian_array.x, cartesian_array.y, cartesian_array.z
+    typecode = cartesian_array.typecode()
+    radius = array('d', map(math.hypot, xs, ys, zs))
+    polar_angle = array(typecode, [acos(z / r) if r != 0 else 0.0 for z, r in zip(zs, radius)])
+    return SphericalArray(array(typecode, radius), array(typecode, map(math.atan2, ys, xs)),
+                          polar_angle)
+
+
+# Бекенд 'numpy': ті самі формули над ndarray у float64; результати — array
+# точності вхідних колонок, як в еталоні
+# ---------------------------------------------------------------------------
+
+def _np_column(points, name: str):
+    """Колонка як ndarray без копіювання (буфер array/memoryview) або скаляр для точки"""
+    if type(points) in _ARRAY_TYPES:
+        return numpy.asarray(getattr(points, name), dtype=numpy.float64)
+    return numpy.float64(getattr(points, name))
+
+
+def _np_array(values, n: int, out=None, typecode: str = 'd'):
+    """Записує values у out (див. distances._result) або в новий array(typecode) довжиною n"""
+    target = array(typecode, bytes(array(typecode).itemsize * n)) if out is None else out
+    view = _float_view(target, _column_typecode(target), writable=True)
+    if len(view) != n:
+        raise ValueError(f"Буфер out на {len(view)} значень, потрібно {n}")
+    if n:
+        numpy.asarray(view)[:] = values
+    return target
+
+
+def _np_haversine(p1, p2):
+    """(ρ₁, ρ₂, hav) для гаверсинусного режиму, як distances._haversine_columns"""
+    sin = numpy.sin
+    t1, t2 = _np_column(p1, 'azimuth'), _np_column(p2, 'azimuth')
+    f1, f2 = _np_column(p1, 'polar_angle'), _np_column(p2, 'polar_angle')
+    weight = sin((t2 - t1) * 0.5)**2
+    hav = sin((f2 - f1) * 0.5)**2 * (1 - weight) + sin((f2 + f1) * 0.5)**2 * weight
+    return _np_column(p1, 'radius'), _np_column(p2, 'radius'), hav
+
+
+def _np_cos_arc(p1, p2):
+    """(ρ₁, ρ₂, косинус кута між точками) для точних сферичних формул"""
+    f1, f2 = _np_column(p1, 'polar_angle'), _np_column(p2, 'polar_angle')
+    t1, t2 = _np_column(p1, 'azimuth'), _np_column(p2, 'azimuth')
+    cos_arc = numpy.sin(f1) * numpy.sin(f2) * numpy.cos(t2 - t1) + numpy.cos(f1) * numpy.cos(f2)
+    return _np_column(p1, 'radius'), _np_column(p2, 'radius'), cos_arc
+
+
+def _numpy_distance_2d_cartesian(p1, p2, out=None) -> array:
+    n = _batch_length(p1, p2, CartesianArray2D)
+    typecode = _batch_typecode(p1, p2)
+    dx = _np_column(p2, 'x') - _np_column(p1, 'x')
+    dy = _np_column(p2, 'y') - _np_column(p1, 'y')
+    return _np_array(numpy.sqrt(dx**2 + dy**2), n, out, typecode)
+
+
+def _numpy_distance_2d_polar(p1, p2, haversine: bool = False, out=None) -> array:
+    n = _batch_length(p1, p2, PolarArray)
+    typecode = _batch_typecode(p1, p2)
+    r1, r2 = _np_column(p1, 'radius'), _np_column(p2, 'radius')
+    delta = _np_column(p2, 'angle') - _np_column(p1, 'angle')
+    if haversine:
+        return _np_array(numpy.sqrt((r1 - r2)**2 + 4 * r1 * r2 * numpy.sin(delta * 0.5)**2),
+                         n, out, typecode)
+    return _np_array(numpy.sqrt(r1**2 + r2**2 - 2 * r1 * r2 * numpy.cos(delta)), n, out, typecode)
+
+
+def _numpy_distance_3d_cartesian(p1, p2, out=None) -> array:
+    n = _batch_length(p1, p2, CartesianArray3D)
+    typecode = _batch_typecode(p1, p2)
+    dx = _np_column(p2, 'x') - _np_column(p1, 'x')
+    dy = _np_column(p2, 'y') - _np_column(p1, 'y')
+    dz = _np_column(p2, 'z') - _np_column(p1, 'z')
+    return _np_array(numpy.sqrt(dx**2 + dy**2 + dz**2), n, out, typecode)
+
+
+def _numpy_distance_3d_spherical_chord(p1, p2, haversine: bool = False, out=None) -> array:
+    n = _batch_length(p1, p2, SphericalArray)
+    typecode = _batch_typecode(p1, p2)
+    if haversine:
+        r1, r2, hav = _np_haversine(p1, p2)
+        return _np_array(numpy.sqrt((r1 - r2)**2 + 4 * r1 * r2 * hav), n, out, typecode)
+    r1, r2, cos_arc = _np_cos_arc(p1, p2)
+    return _np_array(numpy.sqrt(r1**2 + r2**2 - 2 * r1 * r2 * cos_arc), n, out, typecode)
+
+
+def _numpy_distance_3d_spherical_arc(p1, p2, haversine: bool = False, out=None) -> array:
+    n = _batch_length(p1, p2, SphericalArray)
+    typecode = _batch_typecode(p1, p2)
+    if haversine:
+        r1, r2, hav = _np_haversine(p1, p2)
+        return _np_array((r1 + r2) * numpy.arcsin(numpy.sqrt(numpy.minimum(hav, 1.0))),
+                         n, out, typecode)
+    r1, r2, cos_arc = _np_cos_arc(p1, p2)
+    return _np_array((r1 + r2) / 2 * numpy.arccos(numpy.clip(cos_arc, -1, 1)), n, out, typecode)
+
+
+def _numpy_cartesian_from_polar(polar_array: PolarArray) -> CartesianArray2D:
+    n, typecode = len(polar_array), polar_array.typecode()
+    radius, angle = _np_column(polar_array, 'radius'), _np_column(polar_array, 'angle')
+    return CartesianArray2D(_np_array(radius * numpy.cos(angle), n, typecode=typecode),
+                            _np_array(radius * numpy.sin(angle), n, typecode=typecode))
+
+
+def _numpy_polar_from_cartesian(cartesian_array: CartesianArray2D) -> PolarArray:
+    n, typecode = len(cartesian_array), cartesian_array.typecode()
+    x, y = _np_column(cartesian_array, 'x'), _np_column(cartesian_array, 'y')
+    return PolarArray(_np_array(numpy.sqrt(x**2 + y**2), n, typecode=typecode),
+                      _np_array(numpy.arctan2(y, x), n, typecode=typecode))
+
+
+def _numpy_cartesian_from_spherical(spherical_array: SphericalArray) -> CartesianArray3D:
+    n, typecode = len(spherical_array), spherical_array.typecode()
+    radius = _np_column(spherical_array, 'radius')
+    azimuth = _np_column(spherical_array, 'azimuth')
+    polar_angle = _np_column(spherical_array, 'polar_angle')
+    projected = radius * numpy.sin(polar_angle)
+    return CartesianArray3D(_np_array(projected * numpy.cos(azimuth), n, typecode=typecode),
+                            _np_array(projected * numpy.sin(azimuth), n, typecode=typecode),
+                            _np_array(radius * numpy.cos(polar_angle), n, typecode=typecode))
+
+
+def _numpy_spherical_from_cartesian(cartesian_array: CartesianArray3D) -> SphericalArray:
+    n, typecode = len(cartesian_array), cartesian_array.typecode()
+    x, y, z = (_np_column(cartesian_array, name) for name in ('x', 'y', 'z'))
+    radius = numpy.sqrt(x**2 + y**2 + z**2)
+    # Для r = 0 полярний кут 0, як і у скалярній версії: acos(1) = 0
+    ratio = numpy.divide(z, radius, out=numpy.ones(n), where=radius != 0)
+    return SphericalArray(_np_array(radius, n, typecode=typecode),
+                          _np_array(numpy.arctan2(y, x), n, typecode=typecode),
+                          _np_array(numpy.arccos(ratio), n, typecode=typecode))
+
+
+def _build_backends() -> Dict[str, Backend]:
+    backends = {
+        # Еталон — оригінали, а не те, що встановлено зараз (обгортка чи диспетчер)
+        'python': Backend('python', {name: _ORIGINALS[name] for name in OPERATIONS},
+                          "еталонні цикли, побітово як скалярні функції"),
+        'stdlib': Backend('stdlib', {
+            'distance_2d_cartesian_batch': _stdlib_distance_2d_cartesian,
+            'distance_3d_cartesian_batch': _stdlib_distance_3d_cartesian,
+            'PolarArray.from_cartesian': _stdlib_polar_from_cartesian,
+            'SphericalArray.from_cartesian': _stdlib_spherical_from_cartesian,
+        }, "map з math.dist / math.hypot"),
+    }
+    if numpy is not None:
+        backends['numpy'] = Backend('numpy', {
+            'distance_2d_cartesian_batch': _numpy_distance_2d_cartesian,
+            'distance_2d_polar_batch': _numpy_distance_2d_polar,
+            'distance_3d_cartesian_batch': _numpy_distance_3d_cartesian,
+            'distance_3d_spherical_chord_batch': _numpy_distance_3d_spherical_chord,
+            'distance_3d_spherical_arc_batch': _numpy_distance_3d_spherical_arc,
+            'CartesianArray2D.from_polar': _numpy_cartesian_from_polar,
+            'PolarArray.from_cartesian': _numpy_polar_from_cartesian,
+            'CartesianArray3D.from_spherical': _numpy_cartesian_from_spherical,
+            'SphericalArray.from_cartesian': _numpy_spherical_from_cartesian,
+        }, f"NumPy {numpy.__version__}")
+    return backends
+
+
+# Бекенди, доступні в цьому середовищі (numpy — лише якщо імпортується)
+BACKENDS: Dict[str, Backend] = _build_backends()
+
+
+def available_backends() -> List[str]:
+    return list(BACKENDS)
+
+
+def _environment() -> Dict[str, str]:
+    """Відбиток середовища: збережений вибір чинний лише для тих самих версій"""
+    return {
+        'python': f"{platform.python_implementation()} {platform.python_version()}",
+        'machine': platform.machine(),
+        'numpy': numpy.__version__ if numpy is not None else '',
+    }
+
+
+@dataclass(frozen=True)
+class Calibration:
+    """
+    Вибір бекенду для кожної операції: кроки ((від n, бекенд), ...) і,
+    якщо вибір отримано заміром, секунди на точку для кожного розміру й бекенду
+    """
+    choices: Dict[str, Steps]
+    environment: Dict[str, str] = field(default_factory=_environment)
+    timings: Dict[str, Dict[int, Dict[str, float]]] = field(default_factory=dict)
+
+    def backend_for(self, operation: str, n: int) -> str:
+        steps = self.choices.get(operation, ((0, 'python'),))
+        return steps[bisect_right([limit for limit, _ in steps], n) - 1][1]
+
+    def matches_environment(self) -> bool:
+        return self.environment == _environment()
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'version': _CACHE_VERSION,
+            'environment': self.environment,
+            'choices': {name: [list(step) for step in steps] for name, steps in self.choices.items()},
+            'timings': self.timings,
+        }, indent=2, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text: str) -> 'Calibration':
+        data = json.loads(text)
+        if data.get('version') != _CACHE_VERSION:
+            raise ValueError(f"Непідтримувана версія файла калібрування: {data.get('version')!r}")
+        choices = {name: tuple((int(limit), str(backend)) for limit, backend in steps)
+                   for name, steps in data['choices'].items()}
+        timings = {name: {int(size): dict(by_backend) for size, by_backend in sizes.items()}
+                   for name, sizes in data.get('timings', {}).items()}
+        return cls(choices, dict(data['environment']), timings)
+
+    def save(self, path: str = DEFAULT_CACHE_PATH) -> str:
+        """Атомарно записує вибір у JSON-файл; повертає шлях"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            f.write(self.to_json())
+        os.replace(temporary, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_CACHE_PATH) -> 'Calibration':
+        with open(path, encoding='utf-8') as f:
+            return cls.from_json(f.read())
+
+
+def _sample_arguments(operation: str, n: int, rng: random.Random) -> tuple:
+    """Випадкові аргументи операції для пакета з n точок"""
+    def column(low, high):
+        return array('d', [rng.uniform(low, high) for _ in range(n)])
+
+    def cartesian_2d():
+        return CartesianArray2D(column(-100, 100), column(-100, 100))
+
+    def polar():
+        return PolarArray(column(0, 100), column(-math.pi, math.pi))
+
+    def cartesian_3d():
+        return CartesianArray3D(column(-100, 100), column(-100, 100), column(-100, 100))
+
+    def spherical():
+        return SphericalArray(column(1, 100), column(-math.pi, math.pi), column(0, math.pi))
+
+    make = {
+        'distance_2d_cartesian_batch': cartesian_2d, 'distance_2d_polar_batch': polar,
+        'distance_3d_cartesian_batch': cartesian_3d,
+        'distance_3d_spherical_chord_batch': spherical,
+        'distance_3d_spherical_arc_batch': spherical,
+        'CartesianArray2D.from_polar': polar, 'PolarArray.from_cartesian': cartesian_2d,
+        'CartesianArray3D.from_spherical': spherical, 'SphericalArray.from_cartesian': cartesian_3d,
+    }[operation]
+    return (make(), make()) if operation.startswith('distance_') else (make(),)
+
+
+def _seconds_per_point(kernel: Callable, arguments: tuple, n: int, repeat: int) -> float:
+    """Найкращий із repeat замірів; малі пакети викликаються кілька разів поспіль"""
+    calls = max(1, _CALIBRATION_POINTS // n)
+    kernel(*arguments)
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            kernel(*arguments)
+        best = min(best, time.perf_counter() - start)
+    return best / (calls * n)
+
+
+def _steps(sizes: Sequence[int], winners: Sequence[str]) -> Steps:
+    """Кроки вибору; межа між сусідніми розмірами — їхнє середнє геометричне"""
+    steps = [(0, winners[0])]
+    for previous, size, winner in zip(sizes, sizes[1:], winners[1:]):
+        if winner != steps[-1][1]:
+            steps.append((round(math.sqrt(previous * size)), winner))
+    return tuple(steps)
+
+
+def calibrate(sizes: Sequence[int] = DEFAULT_SIZES, repeat: int = 3,
+              operations: Optional[Sequence[str]] = None, seed: int = 0) -> Calibration:
+    """
+    Міряє всі доступні бекенди кожної операції на пакетах розмірів sizes
+    і повертає вибір найшвидшого (без застосування — див. apply_calibration)
+    """
+    sizes = sorted(set(sizes))
+    if not sizes or sizes[0] < 1:
+        raise ValueError("Розміри пакетів мають бути додатними")
+    rng = random.Random(seed)
+    choices: Dict[str, Steps] = {}
+    timings: Dict[str, Dict[int, Dict[str, float]]] = {}
+    for operation in _operations(operations):
+        candidates = [b for b in BACKENDS.values() if operation in b.kernels]
+        if len(candidates) == 1:
+            choices[operation] = ((0, candidates[0].name),)
+            continue
+        timings[operation] = {}
+        for n in sizes:
+            arguments = _sample_arguments(operation, n, rng)
+            timings[operation][n] = {
+                backend.name: _seconds_per_point(backend.kernels[operation], arguments, n, repeat)
+                for backend in candidates}
+        winners = [min(timings[operation][n], key=timings[operation][n].get) for n in sizes]
+        choices[operation] = _steps(sizes, winners)
+    return Calibration(choices, timings=timings)
+
+
+def _operations(operations: Optional[Sequence[str]]) -> List[str]:
+    names = list(OPERATIONS if operations is None else operations)
+    unknown = [name for name in names if name not in OPERATIONS]
+    if unknown:
+        raise ValueError(f"Невідомі операції: {unknown}; доступні: {list(OPERATIONS)}")
+    return names
+
+
+# Поточний вибір: операція -> кроки (відсутні операції — 'python')
+_selection: Dict[str, Steps] = {}
+
+
+def _dispatcher(operation: str, steps: Steps) -> Callable:
+    """
+    Функція, що передає виклик бекенду за розміром пакета — довжиною першого
+    колонкового аргументу; для одного кроку — сама реалізація бекенду
+    """
+    kernels = [BACKENDS[name].kernels.get(operation, BACKENDS['python'].kernels[operation])
+               for _, name in steps]
+    if len(kernels) == 1:
+        return kernels[0]
+    limits = [limit for limit, _ in steps[1:]]
+    array_types = _ARRAY_TYPES
+
+    @functools.wraps(BACKENDS['python'].kernels[operation])
+    def dispatch(*args, **kwargs):
+        n = 0
+        for arg in args[:2]:
+            if type(arg) in array_types:
+                n = len(arg)
+                break
+        return kernels[bisect_right(limits, n)](*args, **kwargs)
+    return dispatch
+
+
+def _select(choices: Dict[str, Steps]) -> None:
+    """Встановлює функції для вибору choices (операції поза ним не змінюються)"""
+    mapping = {}
+    for operation, steps in choices.items():
+        steps = tuple((int(limit), name) for limit, name in steps)
+        if not steps or steps[0][0] != 0:
+            raise ValueError(f"{operation}: перший крок має починатися з 0")
+        missing = [name for _, name in steps if name not in BACKENDS]
+        if missing:
+            raise ValueError(f"Бекенди {missing} недоступні; доступні: {available_backends()}")
+        owner, attribute = OPERATIONS[operation]
+        current = _current(owner, attribute)
+        new = _dispatcher(operation, steps)
+        if new is not current:
+            _install(owner, attribute, new)
+            mapping[current] = new
+        if steps == ((0, 'python'),):
+            _selection.pop(operation, None)
+        else:
+            _selection[operation] = steps
+    _rebind(mapping)
+
+
+def use_backend(name: str, operations: Optional[Sequence[str]] = None) -> None:
+    """
+    Явний вибір бекенду для всіх операцій або лише для operations; операції,
+    яких бекенд не реалізує, виконує 'python' (якщо їх не названо явно)
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Бекенд {name!r} недоступний; доступні: {available_backends()}")
+    backend = BACKENDS[name]
+    if operations is not None:
+        unsupported = [op for op in _operations(operations) if op not in backend.kernels]
+        if unsupported:
+            raise ValueError(f"Бекенд {name!r} не реалізує {unsupported}")
+    _select({op: ((0, name if op in backend.kernels else 'python'),)
+             for op in _operations(operations)})
+
+
+def apply_calibration(calibration: Calibration) -> None:
+    """Встановлює вибір з калібрування (лише для відомих операцій)"""
+    _select({op: steps for op, steps in calibration.choices.items() if op in OPERATIONS})
+
+
+def reset_backends(operations: Optional[Sequence[str]] = None) -> None:
+    """Повертає еталонні функції ('python') для всіх операцій або лише для operations"""
+    _select({op: ((0, 'python'),) for op in _operations(operations)})
+
+
+def active_backends() -> Dict[str, Steps]:
+    """Поточний вибір для кожної операції"""
+    return {op: _selection.get(op, ((0, 'python'),)) for op in OPERATIONS}
+
+
+def auto_select(path: str = DEFAULT_CACHE_PATH, recalibrate: bool = False) -> Calibration:
+    """
+    Застосовує збережений у path вибір; якщо файла немає, він пошкоджений,
+    записаний в іншому середовищі або recalibrate=True — калібрує й зберігає
+    """
+    calibration = None
+    if not recalibrate:
+        try:
+            calibration = Calibration.load(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            calibration = None
+    if calibration is None or not calibration.matches_environment() \
+            or any(name not in BACKENDS for steps in calibration.choices.values() for _, name in steps):
+        calibration = calibrate()
+        try:
+            calibration.save(path)
+        except OSError:
+            pass  # Кеш лише пришвидшує наступний запуск; вибір застосовується й без нього
+    apply_calibration(calibration)
+    return calibration
+
+
+def format_calibration(calibration: Calibration) -> str:
+    """Текстова таблиця: операція, діапазони розмірів і бекенди"""
+    lines = [f"{'Операція':<36} вибір (від n: бекенд)"]
+    for operation, steps in calibration.choices.items():
+        lines.append(f"{operation:<36} " + ", ".join(f"{limit:,}: {name}" for limit, name in steps))
+        for n, by_backend in sorted(calibration.timings.get(operation, {}).items()):
+            measured = ", ".join(f"{name} {seconds * 1e9:.0f}" for name, seconds in by_backend.items())
+            lines.append(f"{'':<38}n={n:<8,} нс/точку: {measured}")
+    return "\n".join(lines)
+
+
+def enable_from_environment() -> bool:
+    """
+    Вибір бекендів зі змінної COORDINATES_BACKEND: 'auto' — auto_select(),
+    шлях *.json — auto_select(шлях), інше непорожнє значення (крім 0) — use_backend
+    """
+    value = os.environ.get(ENV_VAR, '').strip()
+    if value in ('', '0'):
+        return False
+    if value.lower() == 'auto':
+        auto_select()
+    elif value.lower().endswith('.json'):
+        auto_select(value)
+    else:
+        use_backend(value)
+    return True
@@ -3,19 +3,51 @@
 у різних системах координат
 """
 
-import time
-import random
+import argparse
+import functools
+import json
 import math
-from typing import List, Tuple
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from array import array
+from dataclasses import astuple
+from typing import List, Optional, Sequence, Tuple
 from coordinate_systems import (
     CartesianPoint2D, PolarPoint,
-    CartesianPoint3D, SphericalPoint
+    CartesianPoint3D, SphericalPoint,
+    CartesianArray2D, PolarArray,
+    CartesianArray3D, SphericalArray,
+    PreparedPolarPoint, PreparedSphericalPoint
 )
-from distances import (
-    distance_2d_cartesian, distance_2d_polar,
-    distance_3d_cartesian, distance_3d_spherical_chord,
-    distance_3d_spherical_arc
+from compact_points import (
+    CompactCartesianPoint2D, CompactPolarPoint,
+    CompactCartesianPoint3D, CompactSphericalPoint
 )
+import distances
+from distances import enable_from_environment
+from data_generator import generate
+
+
+def generate_2d_columns(n: int, seed: int = 42) -> Tuple[PolarArray, PolarArray]:
+    """Дві колонкові вибірки по n полярних точок (незалежні потоки генератора)"""
+    return (generate('uniform_polar', n, seed, stream=0),
+            generate('uniform_polar', n, seed, stream=1))
+
+
+def generate_3d_columns(n: int, seed: int = 42) -> Tuple[SphericalArray, SphericalArray]:
+    """
+    Дві колонкові вибірки по n сферичних точок
+    Умова: для кожної пари радіуси однакові (для дугової відстані)
+    """
+    first = generate('uniform_spherical', n, seed, stream=0)
+    second = generate('uniform_spherical', n, seed, stream=1)
+    return first, SphericalArray(first.radius, second.azimuth, second.polar_angle)
 
 
 def generate_2d_test_data(n: int) -> Tuple[List[Tuple[PolarPoint, PolarPoint]], 
@@ -24,66 +56,64 @@ def generate_2d_test_data(n: int) -> Tuple[List[Tuple[PolarPoint, PolarPoint]],
     Генерує n пар точок для 2D бенчмарків
     Повертає: (список пар полярних точок, список пар декартових точок)
     """
-    random.seed(42)  # Для відтворюваності результатів
-    
-    polar_pairs = []
-    for _ in range(n):
-        # Генеруємо випадкові полярні координати
-        r1 = random.uniform(1, 100)
-        angle1 = random.uniform(0, 2 * math.pi)
-        r2 = random.uniform(1, 100)
-        angle2 = random.uniform(0, 2 * math.pi)
-        
-        p1 = PolarPoint(r1, angle1)
-        p2 = PolarPoint(r2, angle2)
-        polar_pairs.append((p1, p2))
-    
-    # Конвертуємо у декартові координати
-    cartesian_pairs = [
-        (CartesianPoint2D.from_polar(p1), CartesianPoint2D.from_polar(p2))
-        for p1, p2 in polar_pairs
-    ]
-    
+    first, second = generate_2d_columns(n)
+    polar_pairs = list(zip(first.to_points(), second.to_points()))
+    cartesian_pairs = list(zip(CartesianArray2D.from_polar(first).to_points(),
+                               CartesianArray2D.from_polar(second).to_points()))
     return polar_pairs, cartesian_pairs
 
 
 def generate_3d_test_data(n: int) -> Tuple[List[Tuple[SphericalPoint, SphericalPoint]], 
                                              List[Tuple[CartesianPoint3D, CartesianPoint3D]]]:
     """
-    Генерує n пар точок для 3D бенчмарків
-    Умова: для кожної пари радіуси однакові (для дугової відстані)
+    Генерує n пар точок для 3D бенчмарків (радіуси в парі однакові)
     Повертає: (список пар сферичних точок, список пар декартових точок)
     """
-    random.seed(42)
-    
-    spherical_pairs = []
-    for _ in range(n):
-        # Генеруємо спільний радіус для пари
-        radius = random.uniform(10, 100)
-        
-        # Перша точка
-        azimuth1 = random.uniform(0, 2 * math.pi)
-        polar_angle1 = random.uniform(0, math.pi)
-        
-        # Друга точка (з тим же радіусом)
-        azimuth2 = random.uniform(0, 2 * math.pi)
-        polar_angle2 = random.uniform(0, math.pi)
-        
-        p1 = SphericalPoint(radius, azimuth1, polar_angle1)
-        p2 = SphericalPoint(radius, azimuth2, polar_angle2)
-        spherical_pairs.append((p1, p2))
-    
-    # Конвертуємо у декартові координати
-    cartesian_pairs = [
-        (CartesianPoint3D.from_spherical(p1), CartesianPoint3D.from_spherical(p2))
-        for p1, p2 in spherical_pairs
-    ]
-    
+    first, second = generate_3d_columns(n)
+    spherical_pairs = list(zip(first.to_points(), second.to_points()))
+    cartesian_pairs = list(zip(CartesianArray3D.from_spherical(first).to_points(),
+                               CartesianArray3D.from_spherical(second).to_points()))
     return spherical_pairs, cartesian_pairs
 
 
-def benchmark_2d(n: int = 100_000):
-    """Бенчмарк для 2D відстаней"""
+def default_worker_counts() -> List[int]:
+    """Степені двійки до кількості доступних ядер: 1, 2, 4, ..."""
+    from parallel import default_workers
+    counts, workers = [], 1
+    while workers < default_workers():
+        counts.append(workers)
+        workers *= 2
+    return counts + [default_workers()]
+
+
+def benchmark_parallel(cases, worker_counts: Sequence[int]):
+    """
+    Час паралельних пакетних відстаней для кожної кількості процесів
+    cases — список (назва, метрика, колонка A, колонка B)
+    Прискорення рахується відносно одного процесу
+    """
+    from parallel import parallel_distances
+    
+    print(f"\n  {'Метрика':<20}" + "".join(f"{str(w) + ' пр.':>12}" for w in worker_counts))
+    results = {}
+    for name, metric, points_a, points_b in cases:
+        timings = {}
+        for workers in worker_counts:
+            start = time.perf_counter()
+            parallel_distances(points_a, points_b, metric, workers=workers)
+            timings[workers] = time.perf_counter() - start
+        base = timings[worker_counts[0]]
+        print(f"  {name:<20}" + "".join(f"{t:>10.4f} с" for t in timings.values()))
+        print(f"  {'  прискорення':<20}" + "".join(f"{base / t:>11.2f}x" for t in timings.values()))
+        results[name] = timings
+    return results
+
+
+def benchmark_2d(n: int = 100_000, worker_counts: Optional[Sequence[int]] = None):
+    """
+    Бенчмарк для 2D відстаней
+    worker_counts — кількості процесів для паралельної колонки (за замовчуванням 1, 2, 4, ... ядер)
+    """
     print("=" * 70)
     print(f"БЕНЧМАРК 2D (n = {n:,} пар точок)")
     print("=" * 70)
@@ -95,17 +125,50 @@ def benchmark_2d(n: int = 100_000):
     # Бенчмарк А: Полярні координати
     print("\n[A] Обчислення у полярних координатах (теорема косинусів)...")
     start = time.perf_counter()
-    polar_distances = [distance_2d_polar(p1, p2) for p1, p2 in polar_pairs]
+    polar_distances = [distances.distance_2d_polar(p1, p2) for p1, p2 in polar_pairs]
     time_polar = time.perf_counter() - start
     print(f"    Час виконання: {time_polar:.6f} секунд")
     
     # Бенчмарк Б: Декартові координати
     print("\n[B] Обчислення у декартових координатах (евклідова відстань)...")
     start = time.perf_counter()
-    cartesian_distances = [distance_2d_cartesian(c1, c2) for c1, c2 in cartesian_pairs]
+    cartesian_distances = [distances.distance_2d_cartesian(c1, c2) for c1, c2 in cartesian_pairs]
     time_cartesian = time.perf_counter() - start
     print(f"    Час виконання: {time_cartesian:.6f} секунд")
     
+    # Бенчмарк В: Пакетні версії на колонках (пакування не входить у час)
+    polar_a = PolarArray.from_points([p1 for p1, _ in polar_pairs])
+    polar_b = PolarArray.from_points([p2 for _, p2 in polar_pairs])
+    cartesian_a = CartesianArray2D.from_points([c1 for c1, _ in cartesian_pairs])
+    cartesian_b = CartesianArray2D.from_points([c2 for _, c2 in cartesian_pairs])
+    
+    print("\n[C] Пакетне обчислення на колонках (полярна / декартова)...")
+    start = time.perf_counter()
+    distances.distance_2d_polar_batch(polar_a, polar_b)
+    time_polar_batch = time.perf_counter() - start
+    start = time.perf_counter()
+    distances.distance_2d_cartesian_batch(cartesian_a, cartesian_b)
+    time_cartesian_batch = time.perf_counter() - start
+    print(f"    Час виконання: {time_polar_batch:.6f} / {time_cartesian_batch:.6f} секунд")
+    
+    # Бенчмарк Г: Підготовлені точки з кешованими sin/cos (підготовка не входить у час)
+    prepared_pairs = [(PreparedPolarPoint.from_point(p1), PreparedPolarPoint.from_point(p2))
+                      for p1, p2 in polar_pairs]
+    
+    print("\n[D] Обчислення у полярних координатах (підготовлені точки)...")
+    start = time.perf_counter()
+    prepared_distances = [distances.distance_2d_polar(p1, p2) for p1, p2 in prepared_pairs]
+    time_polar_prepared = time.perf_counter() - start
+    print(f"    Час виконання: {time_polar_prepared:.6f} секунд")
+    
+    # Бенчмарк Д: Паралельні пакетні обчислення у пулі процесів
+    worker_counts = list(worker_counts or default_worker_counts())
+    print("\n[E] Паралельне пакетне обчислення (спільна пам'ять)...")
+    parallel_times = benchmark_parallel([
+        ("Полярна", 'polar_2d', polar_a, polar_b),
+        ("Декартова", 'cartesian_2d', cartesian_a, cartesian_b),
+    ], worker_counts)
+    
     # Аналіз
     print("\n" + "-" * 70)
     print("РЕЗУЛЬТАТИ:")
@@ -122,16 +185,29 @@ def benchmark_2d(n: int = 100_000):
         percent = ((time_polar - time_cartesian) / time_polar) * 100
     
     print(f"  Швидша система: {faster} (на {percent:.1f}%)")
+    print(f"  Пакетна полярна:   {time_polar_batch:.6f} с "
+          f"({time_polar / time_polar_batch:.2f}x)")
+    print(f"  Пакетна декартова: {time_cartesian_batch:.6f} с "
+          f"({time_cartesian / time_cartesian_batch:.2f}x)")
+    print(f"  Підготовлена полярна: {time_polar_prepared:.6f} с "
+          f"({time_polar / time_polar_prepared:.2f}x)")
     
     return {
         'polar': time_polar,
         'cartesian': time_cartesian,
-        'ratio': ratio
+        'ratio': ratio,
+        'polar_batch': time_polar_batch,
+        'cartesian_batch': time_cartesian_batch,
+        'polar_prepared': time_polar_prepared,
+        'parallel': parallel_times
     }
 
 
-def benchmark_3d(n: int = 100_000):
-    """Бенчмарк для 3D відстаней"""
+def benchmark_3d(n: int = 100_000, worker_counts: Optional[Sequence[int]] = None):
+    """
+    Бенчмарк для 3D відстаней
+    worker_counts — кількості процесів для паралельної колонки (за замовчуванням 1, 2, 4, ... ядер)
+    """
     print("\n" + "=" * 70)
     print(f"БЕНЧМАРК 3D (n = {n:,} пар точок)")
     print("=" * 70)
@@ -143,24 +219,65 @@ def benchmark_3d(n: int = 100_000):
     # Бенчмарк А: Сферична (хорда)
     print("\n[A] Обчислення у сферичних координатах (пряма відстань - хорда)...")
     start = time.perf_counter()
-    chord_distances = [distance_3d_spherical_chord(s1, s2) for s1, s2 in spherical_pairs]
+    chord_distances = [distances.distance_3d_spherical_chord(s1, s2) for s1, s2 in spherical_pairs]
     time_chord = time.perf_counter() - start
     print(f"    Час виконання: {time_chord:.6f} секунд")
     
     # Бенчмарк Б: Сферична (дуга)
     print("\n[B] Обчислення у сферичних координатах (дугова відстань)...")
     start = time.perf_counter()
-    arc_distances = [distance_3d_spherical_arc(s1, s2) for s1, s2 in spherical_pairs]
+    arc_distances = [distances.distance_3d_spherical_arc(s1, s2) for s1, s2 in spherical_pairs]
     time_arc = time.perf_counter() - start
     print(f"    Час виконання: {time_arc:.6f} секунд")
     
     # Бенчмарк В: Декартова
     print("\n[C] Обчислення у декартових координатах (евклідова відстань)...")
     start = time.perf_counter()
-    cartesian_distances = [distance_3d_cartesian(c1, c2) for c1, c2 in cartesian_pairs]
+    cartesian_distances = [distances.distance_3d_cartesian(c1, c2) for c1, c2 in cartesian_pairs]
     time_cartesian = time.perf_counter() - start
     print(f"    Час виконання: {time_cartesian:.6f} секунд")
     
+    # Бенчмарк Г: Пакетні версії на колонках (пакування не входить у час)
+    spherical_a = SphericalArray.from_points([s1 for s1, _ in spherical_pairs])
+    spherical_b = SphericalArray.from_points([s2 for _, s2 in spherical_pairs])
+    cartesian_a = CartesianArray3D.from_points([c1 for c1, _ in cartesian_pairs])
+    cartesian_b = CartesianArray3D.from_points([c2 for _, c2 in cartesian_pairs])
+    
+    print("\n[D] Пакетне обчислення на колонках (хорда / дуга / декартова)...")
+    start = time.perf_counter()
+    distances.distance_3d_spherical_chord_batch(spherical_a, spherical_b)
+    time_chord_batch = time.perf_counter() - start
+    start = time.perf_counter()
+    distances.distance_3d_spherical_arc_batch(spherical_a, spherical_b)
+    time_arc_batch = time.perf_counter() - start
+    start = time.perf_counter()
+    distances.distance_3d_cartesian_batch(cartesian_a, cartesian_b)
+    time_cartesian_batch = time.perf_counter() - start
+    print(f"    Час виконання: {time_chord_batch:.6f} / {time_arc_batch:.6f} / "
+          f"{time_cartesian_batch:.6f} секунд")
+    
+    # Бенчмарк Д: Підготовлені точки з кешованими sin/cos (підготовка не входить у час)
+    prepared_pairs = [(PreparedSphericalPoint.from_point(s1), PreparedSphericalPoint.from_point(s2))
+                      for s1, s2 in spherical_pairs]
+    
+    print("\n[E] Обчислення у сферичних координатах (підготовлені точки: хорда / дуга)...")
+    start = time.perf_counter()
+    prepared_chord = [distances.distance_3d_spherical_chord(s1, s2) for s1, s2 in prepared_pairs]
+    time_chord_prepared = time.perf_counter() - start
+    start = time.perf_counter()
+    prepared_arc = [distances.distance_3d_spherical_arc(s1, s2) for s1, s2 in prepared_pairs]
+    time_arc_prepared = time.perf_counter() - start
+    print(f"    Час виконання: {time_chord_prepared:.6f} / {time_arc_prepared:.6f} секунд")
+    
+    # Бенчмарк Е: Паралельні пакетні обчислення у пулі процесів
+    worker_counts = list(worker_counts or default_worker_counts())
+    print("\n[F] Паралельне пакетне обчислення (спільна пам'ять)...")
+    parallel_times = benchmark_parallel([
+        ("Сферична (хорда)", 'spherical_chord', spherical_a, spherical_b),
+        ("Сферична (дуга)", 'spherical_arc', spherical_a, spherical_b),
+        ("Декартова", 'cartesian_3d', cartesian_a, cartesian_b),
+    ], worker_counts)
+    
     # Аналіз
     print("\n" + "-" * 70)
     print("РЕЗУЛЬТАТИ:")
@@ -183,15 +300,694 @@ def benchmark_3d(n: int = 100_000):
     slowest_time = times_sorted[-1][1]
     print(f"\n  Різниця між найшвидшою та найповільнішою: {(slowest_time/fastest_time):.2f}x")
     
+    print(f"\n  Пакетні версії:")
+    print(f"    Сферична (хорда):  {time_chord_batch:.6f} с ({time_chord / time_chord_batch:.2f}x)")
+    print(f"    Сферична (дуга):   {time_arc_batch:.6f} с ({time_arc / time_arc_batch:.2f}x)")
+    print(f"    Декартова:         {time_cartesian_batch:.6f} с "
+          f"({time_cartesian / time_cartesian_batch:.2f}x)")
+    
+    print(f"\n  Підготовлені точки:")
+    print(f"    Сферична (хорда):  {time_chord_prepared:.6f} с "
+          f"({time_chord / time_chord_prepared:.2f}x)")
+    print(f"    Сферична (дуга):   {time_arc_prepared:.6f} с "
+          f"({time_arc / time_arc_prepared:.2f}x)")
+    
     return {
         'chord': time_chord,
         'arc': time_arc,
-        'cartesian': time_cartesian
+        'cartesian': time_cartesian,
+        'chord_batch': time_chord_batch,
+        'arc_batch': time_arc_batch,
+        'cartesian_batch': time_cartesian_batch,
+        'chord_prepared': time_chord_prepared,
+        'arc_prepared': time_arc_prepared,
+        'parallel': parallel_times
     }
 
 
-if __name__ == "__main__":
-    # Запуск бенчмарків
+def benchmark_kdtree(sizes=(10**4, 10**5, 10**6, 10**7), queries: int = 20, k: int = 10):
+    """
+    Бенчмарк KD-дерева проти повного перебору для k найближчих сусідів
+    Великі розміри (10^7) потребують кількох ГБ пам'яті та хвилин на побудову
+    """
+    from spatial_index import KDTree, brute_force_knn
+    
+    print("\n" + "=" * 70)
+    print(f"БЕНЧМАРК KD-ДЕРЕВА (k = {k}, запитів = {queries})")
+    print("=" * 70)
+    print(f"\n  {'n':>12} {'побудова, с':>12} {'KD, мс/запит':>14} "
+          f"{'перебір, мс/запит':>18} {'прискорення':>12}")
+    
+    results = {}
+    for n in sizes:
+        rng = random.Random(42)
+        points = CartesianArray2D(
+            array('d', [rng.uniform(-1000, 1000) for _ in range(n)]),
+            array('d', [rng.uniform(-1000, 1000) for _ in range(n)]))
+        query_points = [CartesianPoint2D(rng.uniform(-1000, 1000), rng.uniform(-1000, 1000))
+                        for _ in range(queries)]
+        
+        start = time.perf_counter()
+        tree = KDTree(points)
+        time_build = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        tree.knn_batch(query_points, k)
+        time_tree = (time.perf_counter() - start) / queries
+        
+        start = time.perf_counter()
+        for query in query_points:
+            brute_force_knn(points, query, k)
+        time_brute = (time.perf_counter() - start) / queries
+        
+        print(f"  {n:>12,} {time_build:>12.3f} {time_tree * 1e3:>14.3f} "
+              f"{time_brute * 1e3:>18.3f} {time_brute / time_tree:>11.0f}x")
+        results[n] = {'build': time_build, 'kdtree': time_tree, 'brute_force': time_brute}
+    
+    return results
+
+
+def benchmark_join(sizes=(10**4, 10**5, 10**6), matches: float = 4.0, sample: int = 200):
+    """
+    Просторове з'єднання (spatial_join) проти вкладених циклів
+    Щільність стала: в середньому matches пар на точку при будь-якому n.
+    Час перебору N×N екстраполюється з sample рядків
+    """
+    from spatial_join import arc_join, count_pairs, radius_join
+    
+    print("\n" + "=" * 70)
+    print(f"БЕНЧМАРК ПРОСТОРОВОГО З'ЄДНАННЯ (~{matches:g} пар на точку)")
+    print("=" * 70)
+    print(f"\n  {'':<8} {'n':>10} {'пар':>12} {'з’єднання, с':>14} "
+          f"{'перебір, с':>12} {'прискорення':>12}")
+    
+    results = {}
+    for n in sizes:
+        # Площа 4·extent² на n точок: radius дає matches сусідів у колі πr²
+        extent = 1000.0
+        radius = math.sqrt(matches * 4 * extent**2 / (n * math.pi))
+        a = generate('uniform_2d', n, extent=extent)
+        b = generate('uniform_2d', n, stream=1, extent=extent)
+        # Та сама кількість сусідів на сфері: частка площі шапки 2π(1 - cos α) / 4π
+        sphere_a = generate('uniform_on_sphere', n, radius=6371.0)
+        sphere_b = generate('uniform_on_sphere', n, stream=1, radius=6371.0)
+        arc = 6371.0 * math.acos(1 - 2 * matches / n)
+        
+        for label, join, points_a, points_b, threshold, batch in [
+                ("2D", radius_join, a, b, radius, distances.distance_2d_cartesian_batch),
+                ("сфера", arc_join, sphere_a, sphere_b, arc, distances.distance_3d_spherical_arc_batch)]:
+            start = time.perf_counter()
+            pairs = count_pairs(join(points_a, points_b, threshold))
+            time_join = time.perf_counter() - start
+            
+            rows = points_a[:sample].to_points()
+            start = time.perf_counter()
+            for point in rows:
+                sum(1 for d in batch(point, points_b) if d <= threshold)
+            time_brute = (time.perf_counter() - start) * n / len(rows)
+            
+            print(f"  {label:<8} {n:>10,} {pairs:>12,} {time_join:>14.3f} "
+                  f"{time_brute:>12.1f} {time_brute / time_join:>11.0f}x")
+            results[(label, n)] = {'pairs': pairs, 'join': time_join, 'brute_force': time_brute}
+    
+    return results
+
+
+def benchmark_compact_points(n: int = 100_000):
+    """
+    Порівняння dataclass-точок з компактними (compact_points.py):
+    створення, доступ до атрибутів, перетворення та пам'ять на екземпляр
+    """
+    print("\n" + "=" * 70)
+    print(f"КОМПАКТНІ ТОЧКИ (n = {n:,})")
+    print("=" * 70)
+    
+    rng = random.Random(42)
+    values = [(rng.uniform(0, 1000), rng.uniform(-math.pi, math.pi)) for _ in range(n)]
+    variants = {
+        'dataclass': (PolarPoint, CartesianPoint2D.from_polar),
+        'compact': (CompactPolarPoint, CompactCartesianPoint2D.from_polar),
+    }
+    
+    results = {'construct': {}, 'access': {}, 'convert': {}, 'bytes_per_point': {}}
+    for name, (point_type, from_polar) in variants.items():
+        start = time.perf_counter()
+        points = [point_type(r, a) for r, a in values]
+        results['construct'][name] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        [p.radius + p.angle for p in points]
+        results['access'][name] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        [from_polar(p) for p in points]
+        results['convert'][name] = time.perf_counter() - start
+        del points
+        
+        tracemalloc.start()
+        points = [point_type(r, a) for r, a in values]
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        # Без урахування самого списку
+        results['bytes_per_point'][name] = (used - sys.getsizeof(points)) / n
+        del points
+    
+    labels = {
+        'construct': "Створення, с",
+        'access': "Доступ до атрибутів, с",
+        'convert': "Полярна -> декартова, с",
+        'bytes_per_point': "Пам'ять на точку, байт",
+    }
+    print(f"\n  {'':<26} {'dataclass':>12} {'компактні':>12} {'виграш':>8}")
+    for key, label in labels.items():
+        row = results[key]
+        print(f"  {label:<26} {row['dataclass']:>12.6g} {row['compact']:>12.6g} "
+              f"{row['dataclass'] / row['compact']:>7.2f}x")
+    
+    return results
+
+
+@functools.lru_cache(maxsize=None)
+def _geodetic_pairs(n: int):
+    """Дві вибірки по n геодезичних точок, рівномірних за площею, та їхні сферичні аналоги"""
+    from geodetic import GeodeticArray, MEAN_EARTH_RADIUS, cartesian_array_from_geodetic
+    rng = random.Random(42)
+    sets = []
+    for stream in (0, 1):
+        on_sphere = generate('uniform_on_sphere', n, stream=stream, radius=MEAN_EARTH_RADIUS)
+        latitude = array('d', [math.pi / 2 - t for t in on_sphere.polar_angle])
+        height = array('d', [rng.uniform(-500.0, 9000.0) for _ in range(n)])
+        sets.append((GeodeticArray(latitude, on_sphere.azimuth, height), on_sphere))
+    geodetic = tuple(g for g, _ in sets)
+    return {
+        'geodetic': geodetic,
+        'ecef': tuple(cartesian_array_from_geodetic(g) for g in geodetic),
+        'spherical': tuple(s for _, s in sets),
+    }
+
+
+def benchmark_geodetic(n: int = 100_000):
+    """
+    Геодезичні перетворення WGS84 та відстань Вінсенті поруч зі сферичною дугою:
+    пропускна здатність і точність (зворотне перетворення, похибка сфери)
+    """
+    from geodetic import (
+        GeodeticArray, WGS84_A, cartesian_array_from_geodetic, geodesic_distance_batch
+    )
+    
+    print("\n" + "=" * 70)
+    print(f"ГЕОДЕЗИЧНІ КООРДИНАТИ WGS84 (n = {n:,})")
+    print("=" * 70)
+    
+    data = _geodetic_pairs(n)
+    geodetic, ecef, spherical = data['geodetic'][0], data['ecef'][0], data['spherical']
+    
+    timings = {}
+    for label, func in [
+        ("Геодезичні -> ECEF", lambda: cartesian_array_from_geodetic(geodetic)),
+        ("ECEF -> геодезичні (Хейккінен)", lambda: GeodeticArray.from_cartesian(ecef)),
+        ("Сферичні -> декартові", lambda: CartesianArray3D.from_spherical(spherical[0])),
+        ("Відстань Вінсенті", lambda: geodesic_distance_batch(*data['geodetic'])),
+        ("Сферична дуга", lambda: distances.distance_3d_spherical_arc_batch(*spherical)),
+    ]:
+        timings[label] = measure(func, warmup=1, repeat=3)['min']
+    
+    print(f"\n  {'Операція':<34} {'час, с':>10} {'точок/с':>14}")
+    for label, seconds in timings.items():
+        print(f"  {label:<34} {seconds:>10.4f} {n / seconds:>14,.0f}")
+    
+    back = GeodeticArray.from_cartesian(ecef)
+    # Довгота повертається у (-π, π], тому різниця береться за модулем 2π
+    horizontal = max(max(abs(a - b) for a, b in zip(back.latitude, geodetic.latitude)),
+                     max(abs(math.remainder(a - b, 2 * math.pi))
+                         for a, b in zip(back.longitude, geodetic.longitude))) * WGS84_A
+    vertical = max(abs(a - b) for a, b in zip(back.height, geodetic.height))
+    
+    geodesic = geodesic_distance_batch(*data['geodetic'])
+    arc = distances.distance_3d_spherical_arc_batch(*spherical)
+    relative = [abs(s - g) / g for s, g in zip(arc, geodesic) if g > 0]
+    
+    print("\nТочність:")
+    print(f"  ├─ геодезичні -> ECEF -> геодезичні: по горизонталі ≤ {horizontal:.2e} м, "
+          f"по висоті ≤ {vertical:.2e} м")
+    print(f"  └─ Сферична дуга (R = 6371 км) проти еліпсоїда: середня похибка "
+          f"{statistics.fmean(relative) * 100:.3f}%, максимальна {max(relative) * 100:.3f}%")
+    
+    return {'seconds': timings, 'round_trip_m': max(horizontal, vertical),
+            'sphere_relative_error': max(relative)}
+
+
+@functools.lru_cache(maxsize=None)
+def _cylindrical(n: int):
+    """Полярні покази плюс висота — циліндричні точки — та їхні сферичні аналоги"""
+    from coordinate_systems import CylindricalArray
+    polar = generate('uniform_polar', n)
+    rng = random.Random(42)
+    columns = CylindricalArray(polar.radius, polar.angle,
+                               array('d', [rng.uniform(-100.0, 100.0) for _ in range(n)]))
+    spherical = SphericalArray.from_cartesian(CartesianArray3D.from_cylindrical(columns))
+    return {
+        'cylindrical': (columns, None),
+        'spherical': (spherical, None),
+        'cylindrical_points': [(p, None) for p in columns.to_points()],
+        'spherical_points': [(p, None) for p in spherical.to_points()],
+    }
+
+
+def _chained(*steps):
+    """Ланцюжок окремих перетворень через проміжні об'єкти"""
+    def run(value):
+        for step in steps:
+            value = step(value)
+        return value
+    return run
+
+
+def _fused(source: str, target: str, batch: bool = False):
+    from conversion_registry import compile_conversion
+    conversion = compile_conversion(source, target)
+    return conversion.batch if batch else conversion.scalar
+
+
+def _fused_cases():
+    from coordinate_systems import CylindricalArray, CylindricalPoint
+    return {
+        "циліндрична -> сферична": (
+            'cylindrical',
+            _chained(CartesianPoint3D.from_cylindrical, SphericalPoint.from_cartesian),
+            _chained(CartesianArray3D.from_cylindrical, SphericalArray.from_cartesian),
+            _fused('cylindrical', 'spherical'), _fused('cylindrical', 'spherical', True)),
+        "сферична -> циліндрична": (
+            'spherical',
+            _chained(CartesianPoint3D.from_spherical, CylindricalPoint.from_cartesian),
+            _chained(CartesianArray3D.from_spherical, CylindricalArray.from_cartesian),
+            _fused('spherical', 'cylindrical'), _fused('spherical', 'cylindrical', True)),
+    }
+
+
+def benchmark_fused_conversions(n: int = 100_000):
+    """Злиті багатокрокові перетворення з conversion_registry проти ланцюжка викликів"""
+    print("\n" + "=" * 70)
+    print(f"ЗЛИТІ ПЕРЕТВОРЕННЯ ПРОТИ ЛАНЦЮЖКА ВИКЛИКІВ (n = {n:,})")
+    print("=" * 70)
+    
+    data = _cylindrical(n)
+    results = {}
+    print(f"\n  {'':<36} {'ланцюжок, с':>12} {'злите, с':>10} {'виграш':>8}")
+    for label, (source, chained, chained_batch, fused, fused_batch) in _fused_cases().items():
+        points = [p for p, _ in data[source + '_points']]
+        columns = data[source][0]
+        for kind, slow, fast in [
+            ("скалярно", lambda: [chained(p) for p in points], lambda: [fused(p) for p in points]),
+            ("пакетно", lambda: chained_batch(columns), lambda: fused_batch(columns)),
+        ]:
+            slow_time = measure(slow, warmup=1, repeat=3)['min']
+            fast_time = measure(fast, warmup=1, repeat=3)['min']
+            results[(label, kind)] = (slow_time, fast_time)
+            print(f"  {label + ', ' + kind:<36} {slow_time:>12.4f} {fast_time:>10.4f} "
+                  f"{slow_time / fast_time:>7.2f}x")
+    return results
+
+
+def benchmark_startup(repeat: int = 20):
+    """
+    Час разового запуску CLI (main.py convert/distance) окремим процесом
+    порівняно з порожнім інтерпретатором та імпортом тестів і бенчмарків,
+    які main.py раніше завантажував при кожному запуску
+    """
+    print("\n" + "=" * 70)
+    print(f"ЧАС ЗАПУСКУ CLI (медіана з {repeat} запусків)")
+    print("=" * 70)
+
+    main_py = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+    cases = {
+        "python3 -c pass": ([sys.executable, '-c', 'pass'], b''),
+        "import тестів і бенчмарків": (
+            [sys.executable, '-c', 'import test_conversions, test_service, benchmark'], b''),
+        "main.py --help": ([sys.executable, main_py, '--help'], b''),
+        "main.py convert (1 точка)": (
+            [sys.executable, main_py, 'convert', '--from', 'polar', '--to', 'cartesian_2d'],
+            b'1.0,0.5\n'),
+        "main.py distance (1 пара)": (
+            [sys.executable, main_py, 'distance', '--metric', 'spherical_arc'],
+            b'1.0,0.1,0.2,1.0,0.3,0.4\n'),
+    }
+
+    results = {}
+    for label, (command, stdin) in cases.items():
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run(command, input=stdin, stdout=subprocess.DEVNULL, check=True,
+                           cwd=os.path.dirname(main_py))
+            timings.append(time.perf_counter() - start)
+        results[label] = statistics.median(timings)
+
+    baseline = results["python3 -c pass"]
+    print(f"\n  {'':<30} {'медіана, мс':>12} {'понад інтерпретатор':>20}")
+    for label, value in results.items():
+        print(f"  {label:<30} {value * 1e3:>12.1f} {(value - baseline) * 1e3:>17.1f} мс")
+
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Статистично коректний запуск: прогрів, повтори, медіана/IQR/мінімум,
+# JSON-результати та порівняння з базовим файлом
+# ---------------------------------------------------------------------------
+
+DEFAULT_WARMUP = 2
+DEFAULT_REPEAT = 7
+# Уповільнення медіани менше цього порогу не вважається регресією
+DEFAULT_THRESHOLD = 0.05
+# Рівень значущості одностороннього U-тесту Манна-Вітні
+DEFAULT_ALPHA = 0.05
+
+
+@functools.lru_cache(maxsize=None)
+def _pairs_2d(n: int):
+    polar = generate_2d_columns(n)
+    polar_pairs = list(zip(*(p.to_points() for p in polar)))
+    cartesian_pairs = list(zip(*(CartesianArray2D.from_polar(p).to_points() for p in polar)))
+    return {
+        'polar_pairs': polar_pairs,
+        'cartesian_pairs': cartesian_pairs,
+        'prepared_pairs': [(PreparedPolarPoint.from_point(p1), PreparedPolarPoint.from_point(p2))
+                           for p1, p2 in polar_pairs],
+        'polar': polar,
+        'cartesian': tuple(CartesianArray2D.from_polar(p) for p in polar),
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _pairs_3d(n: int):
+    spherical = generate_3d_columns(n)
+    spherical_pairs = list(zip(*(s.to_points() for s in spherical)))
+    cartesian_pairs = list(zip(*(CartesianArray3D.from_spherical(s).to_points() for s in spherical)))
+    return {
+        'spherical_pairs': spherical_pairs,
+        'cartesian_pairs': cartesian_pairs,
+        'prepared_pairs': [(PreparedSphericalPoint.from_point(s1),
+                            PreparedSphericalPoint.from_point(s2))
+                           for s1, s2 in spherical_pairs],
+        'spherical': spherical,
+        'cartesian': tuple(CartesianArray3D.from_spherical(s) for s in spherical),
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _compact(n: int):
+    polar_pairs = _pairs_2d(n)['polar_pairs']
+    spherical_pairs = _pairs_3d(n)['spherical_pairs']
+    return {
+        'polar_pairs': [(CompactPolarPoint(*astuple(p1)), CompactPolarPoint(*astuple(p2)))
+                        for p1, p2 in polar_pairs],
+        'spherical_pairs': [(CompactSphericalPoint(*astuple(s1)), CompactSphericalPoint(*astuple(s2)))
+                            for s1, s2 in spherical_pairs],
+    }
+
+
+def _construct(data, key: str, point_type):
+    values = [(p.radius, p.angle) for p, _ in data[key]]
+    return lambda: [point_type(a, b) for a, b in values]
+
+
+def _access(data, key: str):
+    points = [p for p, _ in data[key]]
+    return lambda: [p.radius + p.angle for p in points]
+
+
+@functools.lru_cache(maxsize=None)
+def _stations(n: int, distinct: int = 1000):
+    """Потік з n показів фіксованих станцій (повторювані точки)"""
+    rng = random.Random(42)
+    stations = [PolarPoint(rng.uniform(0, 1000), rng.uniform(-math.pi, math.pi))
+                for _ in range(distinct)]
+    return [(rng.choice(stations), None) for _ in range(n)]
+
+
+def _convert_cached(n: int):
+    from conversion_cache import ConversionCache
+    points = [p for p, _ in _stations(n)]
+    
+    def run():
+        # Новий кеш на кожен замір, щоб не міряти лише влучання
+        convert = ConversionCache.for_conversion('polar_to_cartesian')
+        return [convert(p) for p in points]
+    return run
+
+
+def _aggregate(data, key: str, metric: str, chunk_size: int = 65_536):
+    from aggregates import aggregate_chunks
+    columns_a, columns_b = data[key]
+    chunks = [(columns_a[i:i + chunk_size], columns_b[i:i + chunk_size])
+              for i in range(0, len(columns_a), chunk_size)]
+    return lambda: aggregate_chunks(chunks, metric)
+
+
+def _scalar(data, key: str, func):
+    pairs = data[key]
+    return lambda: [func(p1, p2) for p1, p2 in pairs]
+
+
+def _batch(data, key: str, func):
+    columns_a, columns_b = data[key]
+    return lambda: func(columns_a, columns_b)
+
+
+def _float32(data, key: str):
+    """Ті самі колонки data[key] у точності зберігання float32"""
+    return {key: tuple(columns.astype('float32') for columns in data[key])}
+
+
+def _convert_scalar(data, key: str, func):
+    points = [p for p, _ in data[key]]
+    return lambda: [func(p) for p in points]
+
+
+def _convert_batch(data, key: str, func):
+    columns = data[key][0]
+    return lambda: func(columns)
+
+
+def _geodetic_to_cartesian(points):
+    from geodetic import cartesian_array_from_geodetic
+    return cartesian_array_from_geodetic(points)
+
+
+def _geodetic_from_cartesian(points):
+    from geodetic import GeodeticArray
+    return GeodeticArray.from_cartesian(points)
+
+
+def _geodesic_batch(p1, p2):
+    from geodetic import geodesic_distance_batch
+    return geodesic_distance_batch(p1, p2)
+
+
+# Назва -> функція, що за n готує дані (поза виміром) і повертає вимірюваний виклик
+BENCHMARKS = {
+    '2d_polar': lambda n: _scalar(_pairs_2d(n), 'polar_pairs', distances.distance_2d_polar),
+    '2d_cartesian': lambda n: _scalar(_pairs_2d(n), 'cartesian_pairs', distances.distance_2d_cartesian),
+    '2d_polar_prepared': lambda n: _scalar(_pairs_2d(n), 'prepared_pairs', distances.distance_2d_polar),
+    '2d_polar_batch': lambda n: _batch(_pairs_2d(n), 'polar', distances.distance_2d_polar_batch),
+    '2d_cartesian_batch': lambda n: _batch(_pairs_2d(n), 'cartesian', distances.distance_2d_cartesian_batch),
+    '3d_chord': lambda n: _scalar(_pairs_3d(n), 'spherical_pairs', distances.distance_3d_spherical_chord),
+    '3d_arc': lambda n: _scalar(_pairs_3d(n), 'spherical_pairs', distances.distance_3d_spherical_arc),
+    '3d_cartesian': lambda n: _scalar(_pairs_3d(n), 'cartesian_pairs', distances.distance_3d_cartesian),
+    '3d_chord_prepared': lambda n: _scalar(_pairs_3d(n), 'prepared_pairs',
+                                           distances.distance_3d_spherical_chord),
+    '3d_arc_prepared': lambda n: _scalar(_pairs_3d(n), 'prepared_pairs',
+                                         distances.distance_3d_spherical_arc),
+    '3d_chord_batch': lambda n: _batch(_pairs_3d(n), 'spherical',
+                                       distances.distance_3d_spherical_chord_batch),
+    '3d_arc_batch': lambda n: _batch(_pairs_3d(n), 'spherical', distances.distance_3d_spherical_arc_batch),
+    '3d_cartesian_batch': lambda n: _batch(_pairs_3d(n), 'cartesian', distances.distance_3d_cartesian_batch),
+    '3d_arc_batch_float32': lambda n: _batch(_float32(_pairs_3d(n), 'spherical'), 'spherical',
+                                             distances.distance_3d_spherical_arc_batch),
+    '3d_cartesian_batch_float32': lambda n: _batch(_float32(_pairs_3d(n), 'cartesian'),
+                                                   'cartesian', distances.distance_3d_cartesian_batch),
+    '3d_arc_aggregate': lambda n: _aggregate(_pairs_3d(n), 'spherical', 'spherical_arc'),
+    '2d_polar_haversine': lambda n: _scalar(
+        _pairs_2d(n), 'polar_pairs', functools.partial(distances.distance_2d_polar, haversine=True)),
+    '2d_polar_batch_haversine': lambda n: _batch(
+        _pairs_2d(n), 'polar', functools.partial(distances.distance_2d_polar_batch, haversine=True)),
+    '3d_chord_haversine': lambda n: _scalar(
+        _pairs_3d(n), 'spherical_pairs',
+        functools.partial(distances.distance_3d_spherical_chord, haversine=True)),
+    '3d_arc_haversine': lambda n: _scalar(
+        _pairs_3d(n), 'spherical_pairs',
+        functools.partial(distances.distance_3d_spherical_arc, haversine=True)),
+    '3d_chord_batch_haversine': lambda n: _batch(
+        _pairs_3d(n), 'spherical',
+        functools.partial(distances.distance_3d_spherical_chord_batch, haversine=True)),
+    '3d_arc_batch_haversine': lambda n: _batch(
+        _pairs_3d(n), 'spherical',
+        functools.partial(distances.distance_3d_spherical_arc_batch, haversine=True)),
+    'convert_polar_to_cartesian': lambda n: _convert_scalar(
+        _pairs_2d(n), 'polar_pairs', CartesianPoint2D.from_polar),
+    'convert_polar_to_cartesian_batch': lambda n: _convert_batch(
+        _pairs_2d(n), 'polar', CartesianArray2D.from_polar),
+    'convert_spherical_to_cartesian': lambda n: _convert_scalar(
+        _pairs_3d(n), 'spherical_pairs', CartesianPoint3D.from_spherical),
+    'convert_spherical_to_cartesian_batch': lambda n: _convert_batch(
+        _pairs_3d(n), 'spherical', CartesianArray3D.from_spherical),
+    'convert_spherical_to_cartesian_batch_float32': lambda n: _convert_batch(
+        _float32(_pairs_3d(n), 'spherical'), 'spherical', CartesianArray3D.from_spherical),
+    'generate_uniform_spherical': lambda n: lambda: generate('uniform_spherical', n),
+    'generate_clustered_on_sphere': lambda n: lambda: generate('clustered_on_sphere', n),
+    'geodetic_to_ecef_batch': lambda n: _convert_batch(
+        _geodetic_pairs(n), 'geodetic', _geodetic_to_cartesian),
+    'ecef_to_geodetic_batch': lambda n: _convert_batch(
+        _geodetic_pairs(n), 'ecef', _geodetic_from_cartesian),
+    'geodesic_batch': lambda n: _batch(_geodetic_pairs(n), 'geodetic', _geodesic_batch),
+    'convert_cylindrical_to_spherical_chained': lambda n: _convert_scalar(
+        _cylindrical(n), 'cylindrical_points',
+        _chained(CartesianPoint3D.from_cylindrical, SphericalPoint.from_cartesian)),
+    'convert_cylindrical_to_spherical_fused': lambda n: _convert_scalar(
+        _cylindrical(n), 'cylindrical_points', _fused('cylindrical', 'spherical')),
+    'convert_cylindrical_to_spherical_batch_chained': lambda n: _convert_batch(
+        _cylindrical(n), 'cylindrical',
+        _chained(CartesianArray3D.from_cylindrical, SphericalArray.from_cartesian)),
+    'convert_cylindrical_to_spherical_batch_fused': lambda n: _convert_batch(
+        _cylindrical(n), 'cylindrical', _fused('cylindrical', 'spherical', batch=True)),
+    'convert_stations': lambda n: _convert_scalar(
+        {'stations': _stations(n)}, 'stations', CartesianPoint2D.from_polar),
+    'convert_stations_cached': _convert_cached,
+    'construct_polar': lambda n: _construct(_pairs_2d(n), 'polar_pairs', PolarPoint),
+    'construct_polar_compact': lambda n: _construct(_compact(n), 'polar_pairs', CompactPolarPoint),
+    'access_polar': lambda n: _access(_pairs_2d(n), 'polar_pairs'),
+    'access_polar_compact': lambda n: _access(_compact(n), 'polar_pairs'),
+    'convert_polar_to_cartesian_compact': lambda n: _convert_scalar(
+        _compact(n), 'polar_pairs', CompactCartesianPoint2D.from_polar),
+    'convert_spherical_to_cartesian_compact': lambda n: _convert_scalar(
+        _compact(n), 'spherical_pairs', CompactCartesianPoint3D.from_spherical),
+}
+
+
+def measure(func, warmup: int = DEFAULT_WARMUP, repeat: int = DEFAULT_REPEAT) -> dict:
+    """
+    Вимірює func(): warmup прогрівальних запусків, потім repeat замірів
+    Повертає медіану, міжквартильний розмах (IQR), мінімум та всі заміри
+    """
+    if repeat < 1:
+        raise ValueError("repeat має бути не менше 1")
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    if repeat > 1:
+        q1, _, q3 = statistics.quantiles(samples, n=4, method='inclusive')
+    else:
+        q1 = q3 = samples[0]
+    return {
+        'median': statistics.median(samples),
+        'iqr': q3 - q1,
+        'min': min(samples),
+        'samples': samples,
+    }
+
+
+def run_suite(names: Optional[Sequence[str]] = None, n: int = 100_000,
+              warmup: int = DEFAULT_WARMUP, repeat: int = DEFAULT_REPEAT,
+              verbose: bool = True) -> dict:
+    """Запускає вибрані бенчмарки (за замовчуванням усі) і повертає результати для JSON"""
+    names = list(names or BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Невідомі бенчмарки: {unknown}; доступні: {sorted(BENCHMARKS)}")
+    
+    results = {}
+    for name in names:
+        stats = measure(BENCHMARKS[name](n), warmup, repeat)
+        stats['ns_per_item'] = stats['median'] / n * 1e9
+        results[name] = stats
+        if verbose:
+            print(f"  {name:<38} медіана {stats['median']:.6f} с  IQR {stats['iqr']:.6f} с  "
+                  f"мін {stats['min']:.6f} с  ({stats['ns_per_item']:.1f} нс/елемент)")
+    
+    return {
+        'meta': {
+            'n': n,
+            'warmup': warmup,
+            'repeat': repeat,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        },
+        'results': results,
+    }
+
+
+def mann_whitney_greater(current: Sequence[float], baseline: Sequence[float]) -> float:
+    """
+    p-значення одностороннього U-тесту Манна-Вітні (H1: current більші за baseline)
+    Нормальне наближення з поправкою на однакові значення та неперервність
+    """
+    n1, n2 = len(current), len(baseline)
+    if not n1 or not n2:
+        return 1.0
+    combined = sorted([(v, 0) for v in current] + [(v, 1) for v in baseline])
+    ranks = [0.0] * len(combined)
+    tie_term = 0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        tie_term += (j - i + 1)**3 - (j - i + 1)
+        i = j + 1
+    rank_sum = sum(r for r, (_, group) in zip(ranks, combined) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    total = n1 + n2
+    variance = n1 * n2 / 12 * ((total + 1) - tie_term / (total * (total - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 1 - statistics.NormalDist().cdf(z)
+
+
+def compare_results(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD,
+                    alpha: float = DEFAULT_ALPHA) -> List[dict]:
+    """
+    Порівнює результати з базовими; регресія — медіана повільніша більш ніж
+    на threshold і U-тест значущий на рівні alpha
+    """
+    rows = []
+    for name, stats in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            continue
+        ratio = stats['median'] / base['median'] if base['median'] > 0 else float('inf')
+        p_value = mann_whitney_greater(stats['samples'], base['samples'])
+        rows.append({
+            'name': name,
+            'baseline': base['median'],
+            'current': stats['median'],
+            'ratio': ratio,
+            'p_value': p_value,
+            'regression': ratio > 1 + threshold and p_value < alpha,
+        })
+    return rows
+
+
+def print_comparison(rows: List[dict]) -> None:
+    """Таблиця порівняння з позначкою статистично значущих уповільнень"""
+    print(f"\n  {'Бенчмарк':<38} {'база, с':>10} {'зараз, с':>10} {'зміна':>8} {'p':>7}")
+    for row in rows:
+        flag = "  ✗ РЕГРЕСІЯ" if row['regression'] else ""
+        print(f"  {row['name']:<38} {row['baseline']:>10.6f} {row['current']:>10.6f} "
+              f"{row['ratio'] - 1:>+7.1%} {row['p_value']:>7.3f}{flag}")
+
+
+def print_legacy_report():
+    """Детальний звіт benchmark_2d / benchmark_3d з підсумком"""
     results_2d = benchmark_2d(100_000)
     results_3d = benchmark_3d(100_000)
     
@@ -210,3 +1006,292 @@ if __name__ == "__main__":
     print(f"  Декартова:          {results_3d['cartesian']:.6f} с")
     
     print("\n" + "=" * 70)
+
+
+# ---------------------------------------------------------------------------
+# Розгортка: кожна метрика й перетворення на геометричній послідовності
+# розмірів і для кількох кількостей процесів; нс/пару, пари/с у CSV
+# ---------------------------------------------------------------------------
+
+# Операція -> (вид, система вхідних точок); імена — ключі
+# distances.DISTANCE_KERNELS та coordinate_systems.CONVERSIONS
+SWEEP_OPERATIONS = {
+    'polar_2d': ('distance', 'polar'),
+    'cartesian_2d': ('distance', 'cartesian_2d'),
+    'cartesian_3d': ('distance', 'cartesian_3d'),
+    'spherical_chord': ('distance', 'spherical'),
+    'spherical_arc': ('distance', 'spherical'),
+    'polar_to_cartesian': ('conversion', 'polar'),
+    'cartesian_to_polar': ('conversion', 'cartesian_2d'),
+    'spherical_to_cartesian': ('conversion', 'spherical'),
+    'cartesian_to_spherical': ('conversion', 'cartesian_3d'),
+}
+
+SWEEP_CSV_FIELDS = ('operation', 'kind', 'n', 'workers', 'seconds', 'iqr',
+                    'ns_per_pair', 'pairs_per_second')
+
+SWEEP_WARMUP = 1
+SWEEP_REPEAT = 3
+# Кожен замір охоплює щонайменше стільки пар: малі пакети викликаються у циклі
+SWEEP_MIN_PAIRS = 100_000
+# Зміна нс/пару відносно попереднього розміру, яку таблиця позначає як злам
+KNEE_THRESHOLD = 0.25
+# Оцінка пікової пам'яті на пару: дві 3D-вибірки, їх копія у спільній пам'яті
+# parallel.py, вихідні колонки та тимчасовий список під час генерації
+_SWEEP_BYTES_PER_PAIR = 200
+
+
+def sweep_sizes(start: int = 10**2, stop: int = 10**8, per_decade: int = 2) -> List[int]:
+    """Геометрична послідовність розмірів від start до stop, per_decade на декаду"""
+    if start < 1 or stop < start or per_decade < 1:
+        raise ValueError("Потрібно 1 <= start <= stop та per_decade >= 1")
+    sizes: List[int] = []
+    step = 0
+    while True:
+        n = round(start * 10 ** (step / per_decade))
+        if n > stop:
+            return sizes
+        if not sizes or n != sizes[-1]:
+            sizes.append(n)
+        step += 1
+
+
+def available_memory() -> Optional[int]:
+    """Доступна пам'ять у байтах (MemAvailable у Linux, інакше вільні сторінки) або None"""
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def _sweep_inputs(system: str, n: int, workers: int):
+    """Дві незалежні вибірки по n точок у системі system"""
+    if system == 'polar':
+        return tuple(generate('uniform_polar', n, stream=s, workers=workers) for s in (0, 1))
+    if system == 'cartesian_2d':
+        return tuple(generate('uniform_2d', n, stream=s, workers=workers) for s in (0, 1))
+    spherical = tuple(generate('uniform_spherical', n, stream=s, workers=workers) for s in (0, 1))
+    if system == 'spherical':
+        return spherical
+    return tuple(CartesianArray3D.from_spherical(s) for s in spherical)
+
+
+def _sweep_call(operation: str, inputs, workers: int):
+    from parallel import parallel_convert, parallel_distances
+    kind, _ = SWEEP_OPERATIONS[operation]
+    if kind == 'distance':
+        return lambda: parallel_distances(inputs[0], inputs[1], operation, workers=workers)
+    return lambda: parallel_convert(inputs[0], operation, workers=workers)
+
+
+def benchmark_scaling(sizes: Optional[Sequence[int]] = None,
+                      worker_counts: Optional[Sequence[int]] = None,
+                      operations: Optional[Sequence[str]] = None,
+                      csv_path: Optional[str] = None,
+                      warmup: int = SWEEP_WARMUP, repeat: int = SWEEP_REPEAT,
+                      max_memory: Optional[int] = None) -> List[dict]:
+    """
+    Розгортка: кожна операція з SWEEP_OPERATIONS (або operations) для кожного
+    розміру sizes (за замовчуванням 10^2..10^8, дві точки на декаду) і кожної
+    кількості процесів через parallel_distances / parallel_convert — з їхнім
+    власним рішенням, коли пакет замалий для пулу процесів
+    Розміри, для яких оцінка пам'яті перевищує max_memory (за замовчуванням
+    доступну пам'ять), пропускаються. Рядки пишуться у csv_path одразу після
+    заміру, тож перервана розгортка зберігає вже виміряне
+    """
+    import csv
+    
+    sizes = sorted(set(sizes or sweep_sizes()))
+    worker_counts = sorted(set(worker_counts or default_worker_counts()))
+    operations = list(operations or SWEEP_OPERATIONS)
+    unknown = [name for name in operations if name not in SWEEP_OPERATIONS]
+    if unknown:
+        raise ValueError(f"Невідомі операції: {unknown}; доступні: {list(SWEEP_OPERATIONS)}")
+    max_memory = available_memory() if max_memory is None else max_memory
+    systems = list(dict.fromkeys(SWEEP_OPERATIONS[name][1] for name in operations))
+    
+    print("\n" + "=" * 70)
+    print(f"РОЗГОРТКА: {len(operations)} операцій, n = {sizes[0]:,}..{sizes[-1]:,}, "
+          f"процесів: {', '.join(map(str, worker_counts))}")
+    print("=" * 70)
+    
+    rows: List[dict] = []
+    output = open(csv_path, 'w', newline='', encoding='utf-8') if csv_path else None
+    try:
+        writer = csv.DictWriter(output, SWEEP_CSV_FIELDS) if output else None
+        if writer:
+            writer.writeheader()
+        for n in sizes:
+            needed = n * _SWEEP_BYTES_PER_PAIR
+            if max_memory is not None and needed > max_memory:
+                print(f"  n = {n:,}: пропущено (потрібно ~{needed / 2**30:.1f} ГБ, "
+                      f"доступно {max_memory / 2**30:.1f} ГБ)")
+                continue
+            for system in systems:
+                inputs = _sweep_inputs(system, n, max(worker_counts))
+                for operation in (name for name in operations if SWEEP_OPERATIONS[name][1] == system):
+                    for workers in worker_counts:
+                        call = _sweep_call(operation, inputs, workers)
+                        loops = max(1, SWEEP_MIN_PAIRS // n)
+                        
+                        def run(call=call, loops=loops):
+                            for _ in range(loops):
+                                call()
+                        stats = measure(run, warmup, repeat)
+                        seconds = stats['median'] / loops
+                        row = {
+                            'operation': operation,
+                            'kind': SWEEP_OPERATIONS[operation][0],
+                            'n': n,
+                            'workers': workers,
+                            'seconds': seconds,
+                            'iqr': stats['iqr'] / loops,
+                            'ns_per_pair': seconds / n * 1e9,
+                            'pairs_per_second': n / seconds if seconds > 0 else float('inf'),
+                        }
+                        rows.append(row)
+                        if writer:
+                            writer.writerow(row)
+                            output.flush()
+                        print(f"  {operation:<24} n = {n:>11,} {workers:>3} пр. "
+                              f"{row['ns_per_pair']:>10.1f} нс/пару "
+                              f"{row['pairs_per_second']:>14,.0f} пар/с")
+                del inputs
+    finally:
+        if output:
+            output.close()
+    
+    print("\n" + format_scaling_table(rows))
+    if csv_path:
+        print(f"\nРезультати записано у {csv_path}")
+    return rows
+
+
+def format_scaling_table(rows: Sequence[dict], threshold: float = KNEE_THRESHOLD) -> str:
+    """
+    Таблиця нс/пару: рядок — розмір, стовпець — кількість процесів
+    ↑ / ↓ — нс/пару зросла / спала понад threshold відносно попереднього
+    розміру (злам кривої: межа кешу, накладні витрати виклику чи пулу)
+    """
+    lines = []
+    for operation in dict.fromkeys(row['operation'] for row in rows):
+        cells = {(row['n'], row['workers']): row['ns_per_pair']
+                 for row in rows if row['operation'] == operation}
+        sizes = sorted({n for n, _ in cells})
+        worker_counts = sorted({w for _, w in cells})
+        lines.append(f"{operation} (нс/пару; ↑/↓ — зміна понад {threshold:.0%} "
+                     f"відносно попереднього розміру)")
+        lines.append(f"  {'n':>12}" + "".join(f"{str(w) + ' пр.':>12}" for w in worker_counts))
+        for i, n in enumerate(sizes):
+            line = f"  {n:>12,}"
+            for workers in worker_counts:
+                value = cells.get((n, workers))
+                if value is None:
+                    line += f"{'—':>12}"
+                    continue
+                previous = cells.get((sizes[i - 1], workers)) if i else None
+                mark = ' '
+                if previous:
+                    if value > previous * (1 + threshold):
+                        mark = '↑'
+                    elif value < previous / (1 + threshold):
+                        mark = '↓'
+                line += f"{value:>11.1f}{mark}"
+            lines.append(line)
+        lines.append("")
+    return "\n".join(lines).rstrip()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Точка входу командного рядка; повертає код завершення (1 — є регресії)"""
+    parser = argparse.ArgumentParser(description="Бенчмарки систем координат")
+    parser.add_argument('--list', action='store_true', help="показати доступні бенчмарки")
+    parser.add_argument('--only', nargs='+', metavar='NAME', help="запустити лише вказані")
+    parser.add_argument('-n', type=int, default=100_000, help="кількість пар/точок")
+    parser.add_argument('--warmup', type=int,
+                        help=f"прогрівальні запуски (за замовчуванням {DEFAULT_WARMUP}, для --sweep {SWEEP_WARMUP})")
+    parser.add_argument('--repeat', type=int,
+                        help=f"заміри (за замовчуванням {DEFAULT_REPEAT}, для --sweep {SWEEP_REPEAT})")
+    parser.add_argument('--json', metavar='PATH', help="записати результати у JSON")
+    parser.add_argument('--compare', metavar='BASELINE', help="порівняти з базовим JSON")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA)
+    parser.add_argument('--report', action='store_true',
+                        help="детальний звіт benchmark_2d / benchmark_3d")
+    parser.add_argument('--geodetic', action='store_true',
+                        help="геодезичні перетворення WGS84 та відстань Вінсенті")
+    parser.add_argument('--fused', action='store_true',
+                        help="злиті багатокрокові перетворення проти ланцюжка викликів")
+    parser.add_argument('--startup', action='store_true',
+                        help="час запуску разових викликів main.py convert/distance")
+    parser.add_argument('--join', action='store_true',
+                        help="просторове з'єднання сіткою проти вкладених циклів")
+    parser.add_argument('--compact', action='store_true',
+                        help="порівняння dataclass-точок з компактними")
+    parser.add_argument('--sweep', action='store_true',
+                        help="розгортка за розміром набору та кількістю процесів (--only — операції)")
+    parser.add_argument('--sizes', nargs='+', type=int, metavar='N',
+                        help="розміри для --sweep (за замовчуванням 10^2..--max-n, дві точки на декаду)")
+    parser.add_argument('--max-n', type=int, default=10**8, help="найбільший розмір для --sweep")
+    parser.add_argument('--workers', nargs='+', type=int, metavar='W',
+                        help="кількості процесів для --sweep (за замовчуванням 1, 2, 4, ... ядер)")
+    parser.add_argument('--csv', metavar='PATH', help="записати результати --sweep у CSV")
+    args = parser.parse_args(argv)
+    enable_from_environment()
+    
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+    if args.report:
+        print_legacy_report()
+        return 0
+    if args.geodetic:
+        benchmark_geodetic(args.n)
+        return 0
+    if args.fused:
+        benchmark_fused_conversions(args.n)
+        return 0
+    if args.startup:
+        benchmark_startup()
+        return 0
+    if args.join:
+        benchmark_join()
+        return 0
+    if args.compact:
+        benchmark_compact_points(args.n)
+        return 0
+    if args.sweep:
+        benchmark_scaling(args.sizes or sweep_sizes(stop=args.max_n), args.workers, args.only,
+                          args.csv, SWEEP_WARMUP if args.warmup is None else args.warmup,
+                          SWEEP_REPEAT if args.repeat is None else args.repeat)
+        return 0
+    
+    warmup = DEFAULT_WARMUP if args.warmup is None else args.warmup
+    repeat = DEFAULT_REPEAT if args.repeat is None else args.repeat
+    print(f"Бенчмарки: n = {args.n:,}, прогрів = {warmup}, повторів = {repeat}")
+    results = run_suite(args.only, args.n, warmup, repeat)
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\nРезультати записано у {args.json}")
+    
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows = compare_results(results, baseline, args.threshold, args.alpha)
+        print_comparison(rows)
+        if any(row['regression'] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Компактні імутабельні класи точок на основі кортежів
+
+Мають той самий публічний інтерфейс, що й класи з coordinate_systems.py
+(поля, from_* перетворення, рівність, хешування, repr; без впорядкування,
+індексації та арифметики кортежів), але не мають
+__dict__ на екземпляр і створюються без object.__setattr__, тому займають
+менше пам'яті та швидше створюються у гарячих циклах.
+"""
+
+import math
+from collections import namedtuple
+from typing import ClassVar
+
+
+class _CompactPoint:
+    """
+    Рівність і хешування як у frozen dataclass: точка дорівнює лише точці
+    того самого класу з тими самими координатами (а не звичайному кортежу).
+    NotImplemented тут не підходить: Python тоді порівняв би як кортежі.
+    З тієї ж причини впорядкування, індексація, + та * кортежу явно дають
+    TypeError, як і для dataclass (розпакування й tuple(point) лишаються)
+    """
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return type(other) is type(self) and tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = tuple.__hash__
+
+    def _unordered(self, other):
+        raise TypeError(f"Точки {type(self).__name__} не впорядковуються")
+
+    __lt__ = __le__ = __gt__ = __ge__ = _unordered
+
+    def _not_a_sequence(self, other):
+        raise TypeError(f"Точка {type(self).__name__} не є послідовністю")
+
+    __getitem__ = __add__ = __radd__ = __mul__ = __rmul__ = _not_a_sequence
+
+
+class CompactCartesianPoint2D(_CompactPoint, namedtuple('CompactCartesianPoint2D', 'x y')):
+    """Компактна точка у двовимірній декартовій системі координат"""
+    __slots__ = ()
+
+    @staticmethod
+    def from_polar(polar_point) -> 'CompactCartesianPoint2D':
+        """
+        Перетворення з полярної системи координат у декартову
+        x = r * cos(θ)
+        y = r * sin(θ)
+        """
+        radius, angle = polar_point.radius, polar_point.angle
+        return CompactCartesianPoint2D(radius * math.cos(angle), radius * math.sin(angle))
+
+    def __repr__(self) -> str:
+        return f"CompactCartesianPoint2D(x={self.x:.4f}, y={self.y:.4f})"
+
+
+class CompactPolarPoint(_CompactPoint, namedtuple('CompactPolarPoint', 'radius angle')):
+    """Компактна точка у полярній системі координат"""
+    __slots__ = ()
+
+    is_prepared: ClassVar[bool] = False
+
+    @staticmethod
+    def from_cartesian(cartesian_point) -> 'CompactPolarPoint':
+        """
+        Перетворення з декартової системи координат у полярну
+        r = √(x² + y²)
+        θ = atan2(y, x)
+        """
+        x, y = cartesian_point.x, cartesian_point.y
+        return CompactPolarPoint(math.sqrt(x**2 + y**2), math.atan2(y, x))
+
+    def __repr__(self) -> str:
+        return f"CompactPolarPoint(r={self.radius:.4f}, θ={self.angle:.4f} rad)"
+
+
+class CompactCartesianPoint3D(_CompactPoint, namedtuple('CompactCartesianPoint3D', 'x y z')):
+    """Компактна точка у тривимірній декартовій системі координат"""
+    __slots__ = ()
+
+    @staticmethod
+    def from_spherical(spherical_point) -> 'CompactCartesianPoint3D':
+        """
+        Перетворення зі сферичної системи координат у декартову
+        x = ρ * sin(φ) * cos(θ)
+        y = ρ * sin(φ) * sin(θ)
+        z = ρ * cos(φ)
+        """
+        radius = spherical_point.radius
+        azimuth = spherical_point.azimuth
+        polar_angle = spherical_point.polar_angle
+        return CompactCartesianPoint3D(
+            radius * math.sin(polar_angle) * math.cos(azimuth),
+            radius * math.sin(polar_angle) * math.sin(azimuth),
+            radius * math.cos(polar_angle),
+        )
+
+    def __repr__(self) -> str:
+        return f"CompactCartesianPoint3D(x={self.x:.4f}, y={self.y:.4f}, z={self.z:.4f})"
+
+
+class CompactSphericalPoint(_CompactPoint,
+                            namedtuple('CompactSphericalPoint', 'radius azimuth polar_angle')):
+    """Компактна точка у сферичній системі координат"""
+    __slots__ = ()
+
+    is_prepared: ClassVar[bool] = False
+
+    @staticmethod
+    def from_cartesian(cartesian_point) -> 'CompactSphericalPoint':
+        """
+        Перетворення з декартової системи координат у сферичну
+        ρ = √(x² + y² + z²)
+        θ = atan2(y, x)
+        φ = acos(z / ρ)
+        """
+        x, y, z = cartesian_point.x, cartesian_point.y, cartesian_point.z
+        radius = math.sqrt(x**2 + y**2 + z**2)
+        # Уникаємо ділення на нуль
+        polar_angle = math.acos(z / radius) if radius != 0 else 0
+        return CompactSphericalPoint(radius, math.atan2(y, x), polar_angle)
+
+    def __repr__(self) -> str:
+        return (f"CompactSphericalPoint(ρ={self.radius:.4f}, "
+                f"θ={self.azimuth:.4f} rad, φ={self.polar_angle:.4f} rad)")
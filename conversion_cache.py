@@ -0,0 +1,244 @@
+"""
+Кеш перетворень точок з обмеженим розміром та витісненням LRU
+
+Корисний, коли ті самі точки (наприклад, нерухомі станції) перетворюються
+знову і знову. Ключ кешу — двійкове подання (float64) координат вхідної точки.
+
+Два способи увімкнення:
+  для окремого місця виклику —
+      from_polar = ConversionCache.for_conversion('polar_to_cartesian', maxsize=4096)
+      cartesian = from_polar(polar_point)
+  для всього модуля coordinate_systems —
+      enable_conversion_cache(maxsize=4096)  # CartesianPoint2D.from_polar тощо кешуються
+      ...
+      disable_conversion_cache()
+"""
+
+import functools
+import math
+import struct
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Callable, Dict, Iterator, Optional, Sequence
+from coordinate_systems import (
+    CartesianPoint2D, PolarPoint,
+    CartesianPoint3D, SphericalPoint
+)
+from instrumentation import _current, _install, _rebind
+
+
+DEFAULT_MAXSIZE = 4096
+
+# Перетворення -> (клас, ім'я статичного методу, поля вхідної точки для ключа)
+CACHEABLE = {
+    'polar_to_cartesian': (CartesianPoint2D, 'from_polar', ('radius', 'angle')),
+    'cartesian_to_polar': (PolarPoint, 'from_cartesian', ('x', 'y')),
+    'spherical_to_cartesian': (CartesianPoint3D, 'from_spherical',
+                               ('radius', 'azimuth', 'polar_angle')),
+    'cartesian_to_spherical': (SphericalPoint, 'from_cartesian', ('x', 'y', 'z')),
+}
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Знімок лічильників кешу"""
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __repr__(self) -> str:
+        return (f"CacheStats(hits={self.hits}, misses={self.misses}, "
+                f"evictions={self.evictions}, size={self.size}/{self.maxsize}, "
+                f"hit_rate={self.hit_rate:.1%})")
+
+
+class ConversionCache:
+    """
+    Потокобезпечна обгортка перетворення з кешем LRU
+
+    func — функція точка -> точка, key_fields — поля вхідної точки, з яких
+    складається ключ. Точки з однаковими координатами (зокрема звичайна,
+    підготовлена чи компактна) ділять один запис. Ключ — байти float64, а не
+    кортеж чисел: 0.0 та -0.0 рівні як числа, але atan2 дає для них різні кути,
+    тож вони мають різні записи. Точки з NaN не кешуються (NaN != NaN, і кожна
+    така точка додавала б новий запис)
+    """
+
+    def __init__(self, func: Callable, key_fields: Sequence[str],
+                 maxsize: int = DEFAULT_MAXSIZE):
+        if maxsize < 1:
+            raise ValueError("maxsize має бути додатним")
+        self.func = func
+        self.maxsize = maxsize
+        self._fields = attrgetter(*key_fields)
+        self._pack = struct.Struct(f'{len(key_fields)}d').pack
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = 0
+
+    @classmethod
+    def for_conversion(cls, conversion: str, maxsize: int = DEFAULT_MAXSIZE) -> 'ConversionCache':
+        """Кеш для перетворення з CACHEABLE, наприклад 'polar_to_cartesian'"""
+        _, _, key_fields = _conversion(conversion)
+        return cls(_uncached(conversion), key_fields, maxsize)
+
+    def __call__(self, point):
+        values = self._fields(point)
+        try:
+            key = self._pack(*values)
+        except struct.error:
+            return self.func(point)  # не числа: помилку дасть саме перетворення
+        with self._lock:
+            result = self._data.get(key)
+            if result is not None:
+                self._data.move_to_end(key)
+                self._hits += 1
+                return result
+            self._misses += 1
+        # Перетворення — чиста функція, тож обчислюємо поза блокуванням;
+        # у разі гонки два потоки отримають однакові результати
+        result = self.func(point)
+        if any(map(math.isnan, values)):
+            return result
+        with self._lock:
+            if key not in self._data:
+                self._data[key] = result
+                if len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+                    self._evictions += 1
+        return result
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions,
+                              len(self._data), self.maxsize)
+
+    def clear(self) -> None:
+        """Очищає записи та лічильники"""
+        with self._lock:
+            self._data.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"ConversionCache({getattr(self.func, '__qualname__', self.func)}, {self.stats()})"
+
+
+@dataclass(frozen=True)
+class _Installed:
+    """
+    Кеш модуля для одного перетворення: встановлена функція і функція, яку
+    вона замінила
+    """
+    cache: ConversionCache
+    cached: Callable
+    previous: Callable
+
+
+# Увімкнені для модуля кеші: перетворення -> _Installed
+_module_caches: Dict[str, _Installed] = {}
+_module_lock = threading.Lock()
+
+
+def _conversion(name: str):
+    try:
+        return CACHEABLE[name]
+    except KeyError:
+        raise ValueError(f"Невідоме перетворення: {name!r}; доступні: {sorted(CACHEABLE)}")
+
+
+def _uncached(name: str) -> Callable:
+    """
+    Поточна функція перетворення без кешу модуля: якщо кеш модуля ще встановлений,
+    то функція, яку він замінив (можливо, обгортка інструментування чи бекенду)
+    """
+    owner, method, _ = CACHEABLE[name]
+    current = _current(owner, method)
+    entry = _module_caches.get(name)
+    return entry.previous if entry and entry.cached is current else current
+
+
+def _cached(cache: ConversionCache) -> Callable:
+    # Звичайна функція, а не сам кеш: _rebind підміняє лише функції.
+    # target — кеш, а після вимкнення — замінена функція (див. disable_conversion_cache)
+    @functools.wraps(cache.func)
+    def cached(point):
+        return cached.target(point)
+    cached.target = cache
+    return cached
+
+
+def enable_conversion_cache(maxsize: int = DEFAULT_MAXSIZE,
+                            conversions: Optional[Sequence[str]] = None) -> Dict[str, ConversionCache]:
+    """
+    Підміняє статичні методи перетворень у coordinate_systems кешованими
+    (усі з CACHEABLE або лише conversions); повертає словник кешів
+    Кеш обгортає функцію, встановлену на момент виклику (зокрема обгортку
+    інструментування чи вибраний бекенд). Повторний виклик замінює кеші новими
+    """
+    names = list(conversions or CACHEABLE)
+    for name in names:
+        _conversion(name)
+    caches, mapping = {}, {}
+    with _module_lock:
+        for name in names:
+            owner, method, key_fields = CACHEABLE[name]
+            current = _current(owner, method)
+            previous = _uncached(name)
+            cache = ConversionCache(previous, key_fields, maxsize)
+            cached = _cached(cache)
+            _install(owner, method, cached)
+            mapping[current] = cached
+            caches[name] = cache
+            _module_caches[name] = _Installed(cache, cached, previous)
+        _rebind(mapping)
+    return caches
+
+
+def disable_conversion_cache(conversions: Optional[Sequence[str]] = None) -> None:
+    """
+    Повертає функції, замінені під час увімкнення (усіх або лише conversions)
+    Функцію, яку пізніше встановили поверх кешу (інструментування тощо), не
+    чіпає — кешована функція під нею далі просто викликає замінену
+    """
+    with _module_lock:
+        mapping = {}
+        for name in list(conversions or _module_caches):
+            if name not in _module_caches:
+                continue
+            entry = _module_caches.pop(name)
+            owner, method, _ = CACHEABLE[name]
+            entry.cached.target = entry.previous
+            if _current(owner, method) is entry.cached:
+                _install(owner, method, entry.previous)
+            mapping[entry.cached] = entry.previous
+        _rebind(mapping)
+
+
+def conversion_cache_stats() -> Dict[str, CacheStats]:
+    """Лічильники увімкнених для модуля кешів"""
+    with _module_lock:
+        return {name: entry.cache.stats() for name, entry in _module_caches.items()}
+
+
+@contextmanager
+def conversion_cache(maxsize: int = DEFAULT_MAXSIZE,
+                     conversions: Optional[Sequence[str]] = None) -> Iterator[Dict[str, ConversionCache]]:
+    """Кешування перетворень модуля на час блоку with"""
+    caches = enable_conversion_cache(maxsize, conversions)
+    try:
+        yield caches
+    finally:
+        disable_conversion_cache(list(caches))
@@ -0,0 +1,230 @@
+"""
+Реєстр систем координат і перетворень з пошуком шляху та злиттям кроків
+
+Кожне пряме перетворення реєструється як кілька рядків коду над скалярними
+координатами. Для пари систем реєстр шукає найкоротший шлях у графі
+перетворень і генерує з кроків одну функцію (скалярну та пакетну), у якій
+проміжні координати — лише локальні змінні: жодних проміжних точок чи колонок.
+
+  to_spherical = compile_conversion('cylindrical', 'spherical')
+  to_spherical.path            # ('cylindrical', 'cartesian_3d', 'spherical')
+  to_spherical(point)          # SphericalPoint
+  to_spherical.batch(points)   # SphericalArray
+
+Формули кроків повторюють методи from_* з coordinate_systems у тому самому
+порядку операцій, тож злите перетворення побітово збігається з ланцюжком
+окремих викликів.
+"""
+
+import math
+import threading
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Sequence, Tuple
+from coordinate_systems import (
+    CartesianPoint2D, PolarPoint,
+    CartesianPoint3D, SphericalPoint, CylindricalPoint,
+    CartesianArray2D, PolarArray,
+    CartesianArray3D, SphericalArray, CylindricalArray
+)
+
+
+@dataclass(frozen=True)
+class System:
+    """Зареєстрована система координат: клас точки та колонковий клас"""
+    name: str
+    point_type: type
+    array_type: type
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        return self.array_type.field_names()
+
+
+# Назва системи -> System
+SYSTEMS: Dict[str, System] = {}
+
+# (звідки, куди) -> рядки коду кроку; {s.поле} — координата джерела, {t.поле} — результату
+EDGES: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+
+# Функції, доступні згенерованому коду
+_NAMESPACE = {'sqrt': math.sqrt, 'sin': math.sin, 'cos': math.cos,
+              'atan2': math.atan2, 'acos': math.acos, 'array': array}
+
+_compiled: Dict[Tuple[str, str], 'FusedConversion'] = {}
+_lock = threading.Lock()
+
+
+def register_system(name: str, point_type: type, array_type: type) -> None:
+    """Реєструє систему координат (поля беруться з колонкового класу)"""
+    with _lock:
+        SYSTEMS[name] = System(name, point_type, array_type)
+        _compiled.clear()
+
+
+def register_conversion(source: str, target: str, statements: Sequence[str]) -> None:
+    """
+    Реєструє пряме перетворення source -> target як рядки присвоєнь, наприклад
+    '{t.x} = {s.radius} * cos({s.angle})'; кожне поле target має бути присвоєне
+    """
+    for name in (source, target):
+        if name not in SYSTEMS:
+            raise ValueError(f"Невідома система координат: {name!r}; доступні: {sorted(SYSTEMS)}")
+    with _lock:
+        EDGES[(source, target)] = tuple(statements)
+        _compiled.clear()
+
+
+def find_path(source: str, target: str) -> Tuple[str, ...]:
+    """Найкоротший (за кількістю кроків) шлях між системами пошуком у ширину"""
+    for name in (source, target):
+        if name not in SYSTEMS:
+            raise ValueError(f"Невідома система координат: {name!r}; доступні: {sorted(SYSTEMS)}")
+    previous = {source: None}
+    queue = deque([source])
+    while queue:
+        current = queue.popleft()
+        if current == target:
+            path = []
+            while current is not None:
+                path.append(current)
+                current = previous[current]
+            return tuple(reversed(path))
+        for start, end in EDGES:
+            if start == current and end not in previous:
+                previous[end] = current
+                queue.append(end)
+    raise ValueError(f"Немає шляху перетворення {source} -> {target}")
+
+
+def _variables(step: int, system: System) -> SimpleNamespace:
+    return SimpleNamespace(**{name: f"v{step}_{name}" for name in system.fields})
+
+
+def _fused_statements(path: Sequence[str]) -> Tuple[List[str], SimpleNamespace, SimpleNamespace]:
+    """Рядки злитого тіла: кроки шляху над змінними v<крок>_<поле>"""
+    first = _variables(0, SYSTEMS[path[0]])
+    lines, source = [], first
+    for step, (start, end) in enumerate(zip(path, path[1:]), 1):
+        target = _variables(step, SYSTEMS[end])
+        lines.extend(statement.format(s=source, t=target) for statement in EDGES[(start, end)])
+        source = target
+    return lines, first, source
+
+
+def _generate(path: Sequence[str]) -> str:
+    """Вихідний код скалярної (_scalar) та пакетної (_batch) функцій для шляху"""
+    source, target = SYSTEMS[path[0]], SYSTEMS[path[-1]]
+    lines, inputs, outputs = _fused_statements(path)
+    in_names = [getattr(inputs, name) for name in source.fields]
+    out_names = [getattr(outputs, name) for name in target.fields]
+
+    # Функції простору імен прив'язуються як локальні змінні (аргументи за замовчуванням)
+    local = ', '.join(f"{name}={name}" for name in _NAMESPACE)
+    scalar = [f"def _scalar(point, {local}):"]
+    scalar += [f"    {var} = point.{name}" for var, name in zip(in_names, source.fields)]
+    scalar += [f"    {line}" for line in lines]
+    scalar.append(f"    return PointType({', '.join(out_names)})")
+
+    columns = [f"out_{name}" for name in target.fields]
+    batch = [f"def _batch(points, {local}):"]
+    # Проміжні значення — float64, вихідні колонки — у точності вхідного набору
+    batch.append("    typecode = points.typecode()")
+    batch += [f"    {column} = array(typecode)" for column in columns]
+    batch += [f"    {column}_append = {column}.append" for column in columns]
+    batch.append(f"    for {', '.join(in_names)} in zip("
+                 f"{', '.join(f'points.{name}' for name in source.fields)}):")
+    batch += [f"        {line}" for line in lines]
+    batch += [f"        {column}_append({var})" for column, var in zip(columns, out_names)]
+    batch.append(f"    return ArrayType({', '.join(columns)})")
+    return "\n".join(scalar) + "\n\n\n" + "\n".join(batch) + "\n"
+
+
+class FusedConversion:
+    """Злите перетворення вздовж шляху: виклик — для точки, batch — для колонок"""
+
+    def __init__(self, path: Sequence[str]):
+        self.path = tuple(path)
+        self.source = SYSTEMS[self.path[0]]
+        self.target = SYSTEMS[self.path[-1]]
+        self.source_code = _generate(self.path)
+        namespace = dict(_NAMESPACE, PointType=self.target.point_type,
+                         ArrayType=self.target.array_type)
+        exec(compile(self.source_code, f"<fused {' -> '.join(self.path)}>", 'exec'), namespace)
+        # Згенеровані функції напряму, без додаткового виклику методу
+        self.scalar: Callable = namespace['_scalar']
+        self.batch: Callable = namespace['_batch']
+
+    def __call__(self, point):
+        return self.scalar(point)
+
+    def __repr__(self) -> str:
+        return f"FusedConversion({' -> '.join(self.path)})"
+
+
+def compile_conversion(source: str, target: str) -> FusedConversion:
+    """Злите перетворення source -> target (компілюється один раз і кешується)"""
+    key = (source, target)
+    with _lock:
+        conversion = _compiled.get(key)
+    if conversion is None:
+        conversion = FusedConversion(find_path(source, target))
+        with _lock:
+            conversion = _compiled.setdefault(key, conversion)
+    return conversion
+
+
+def system_of(value) -> str:
+    """Назва системи для точки або колонкового набору"""
+    for system in SYSTEMS.values():
+        if isinstance(value, (system.point_type, system.array_type)):
+            return system.name
+    raise TypeError(f"Невідомий тип точки: {type(value).__name__}")
+
+
+def convert(point, target: str):
+    """Перетворює одну точку у систему target будь-яким зареєстрованим шляхом"""
+    return compile_conversion(system_of(point), target)(point)
+
+
+def convert_batch(points, target: str):
+    """Перетворює колонковий набір у систему target будь-яким зареєстрованим шляхом"""
+    return compile_conversion(system_of(points), target).batch(points)
+
+
+register_system('cartesian_2d', CartesianPoint2D, CartesianArray2D)
+register_system('polar', PolarPoint, PolarArray)
+register_system('cartesian_3d', CartesianPoint3D, CartesianArray3D)
+register_system('spherical', SphericalPoint, SphericalArray)
+register_system('cylindrical', CylindricalPoint, CylindricalArray)
+
+register_conversion('polar', 'cartesian_2d', [
+    "{t.x} = {s.radius} * cos({s.angle})",
+    "{t.y} = {s.radius} * sin({s.angle})",
+])
+register_conversion('cartesian_2d', 'polar', [
+    "{t.radius} = sqrt({s.x}**2 + {s.y}**2)",
+    "{t.angle} = atan2({s.y}, {s.x})",
+])
+register_conversion('spherical', 'cartesian_3d', [
+    "{t.x} = {s.radius} * sin({s.polar_angle}) * cos({s.azimuth})",
+    "{t.y} = {s.radius} * sin({s.polar_angle}) * sin({s.azimuth})",
+    "{t.z} = {s.radius} * cos({s.polar_angle})",
+])
+register_conversion('cartesian_3d', 'spherical', [
+    "{t.radius} = sqrt({s.x}**2 + {s.y}**2 + {s.z}**2)",
+    "{t.azimuth} = atan2({s.y}, {s.x})",
+    "{t.polar_angle} = acos({s.z} / {t.radius}) if {t.radius} != 0 else 0.0",
+])
+register_conversion('cylindrical', 'cartesian_3d', [
+    "{t.x} = {s.radius} * cos({s.azimuth})",
+    "{t.y} = {s.radius} * sin({s.azimuth})",
+    "{t.z} = {s.height}",
+])
+register_conversion('cartesian_3d', 'cylindrical', [
+    "{t.radius} = sqrt({s.x}**2 + {s.y}**2)",
+    "{t.azimuth} = atan2({s.y}, {s.x})",
+    "{t.height} = {s.z}",
+])
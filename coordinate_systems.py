@@ -3,9 +3,75 @@
 Імутабельні класи для представлення точок у різних системах координат
 """
 
-from dataclasses import dataclass
-from typing import Tuple
+from array import array
+from dataclasses import dataclass, field, fields
+from operator import attrgetter, mul
+from typing import ClassVar, Iterable, Iterator, List, Optional, Sequence, Tuple
 import math
+import sys
+
+
+# Розташування координат у суцільному буфері float64 (float32):
+#   'columns'     — колонки одна за одною (structure-of-arrays): x0..xn, y0..yn, ...
+#   'interleaved' — координати кожної точки поспіль: x0, y0, x1, y1, ...
+LAYOUTS = ('columns', 'interleaved')
+
+# Точність зберігання колонок набору -> код типу array. Обчислення завжди
+# виконуються у float64; float32 удвічі зменшує пам'ять і обсяг читання
+# ціною округлення кожного збереженого значення (відносно ~6e-8)
+PRECISIONS = {'float64': 'd', 'float32': 'f'}
+
+_PRECISION_OF_TYPECODE = {typecode: name for name, typecode in PRECISIONS.items()}
+
+_NATIVE_ORDER = '<' if sys.byteorder == 'little' else '>'
+
+# Формати буфера, що читаються як float64 / float32 без перетворення
+_FLOAT_FORMATS = {typecode: frozenset({typecode, '@' + typecode, '=' + typecode,
+                                       _NATIVE_ORDER + typecode})
+                  for typecode in PRECISIONS.values()}
+_BYTE_FORMATS = frozenset({'B', 'b', 'c'})
+
+
+def _typecode_of(precision: str) -> str:
+    """Код типу array для точності 'float64' / 'float32'"""
+    try:
+        return PRECISIONS[precision]
+    except KeyError:
+        raise ValueError(f"Невідома точність: {precision!r}; доступні: {list(PRECISIONS)}")
+
+
+def _column_typecode(column) -> str:
+    """'f' для колонки чи буфера float32 (array, memoryview, масив numpy), інакше 'd'"""
+    code = getattr(column, 'typecode', None)
+    if code is None:
+        try:
+            code = memoryview(column).format
+        except TypeError:
+            # Списки та інші послідовності Python тримають float64
+            return 'd'
+    return 'f' if code in _FLOAT_FORMATS['f'] else 'd'
+
+
+def _float_view(buffer, typecode: str = 'd', writable: bool = False) -> memoryview:
+    """
+    Одновимірний memoryview float64 ('d') чи float32 ('f') над будь-яким
+    об'єктом з буферним протоколом (array, bytearray, mmap, масив numpy,
+    пам'ять C-розширення) без копіювання
+    """
+    view = memoryview(buffer)
+    name = _PRECISION_OF_TYPECODE[typecode]
+    if writable and view.readonly:
+        raise ValueError("Буфер доступний лише для читання")
+    if view.format not in _FLOAT_FORMATS[typecode] and view.format not in _BYTE_FORMATS:
+        raise TypeError(f"Очікується буфер {name} або байтів, отримано формат {view.format!r}")
+    if view.ndim == 1 and view.format == typecode:
+        return view
+    if not view.c_contiguous:
+        raise ValueError("Буфер має бути суцільним (C-contiguous)")
+    itemsize = array(typecode).itemsize
+    if view.nbytes % itemsize:
+        raise ValueError(f"Розмір буфера {view.nbytes} байт не кратний розміру {name}")
+    return view.cast('B').cast(typecode)
 
 
 @dataclass(frozen=True)
@@ -35,6 +101,9 @@ class PolarPoint:
     radius: float  # r - відстань від початку координат
     angle: float   # θ (theta) - кут у радіанах
     
+    # Чи має точка попередньо обчислені sin/cos (див. PreparedPolarPoint)
+    is_prepared: ClassVar[bool] = False
+    
     @staticmethod
     def from_cartesian(cartesian_point: 'CartesianPoint2D') -> 'PolarPoint':
         """
@@ -74,6 +143,18 @@ class CartesianPoint3D:
         z = spherical_point.radius * math.cos(spherical_point.polar_angle)
         return CartesianPoint3D(x, y, z)
     
+    @staticmethod
+    def from_cylindrical(cylindrical_point: 'CylindricalPoint') -> 'CartesianPoint3D':
+        """
+        Перетворення з циліндричної системи координат у декартову
+        x = r * cos(θ)
+        y = r * sin(θ)
+        z = h
+        """
+        x = cylindrical_point.radius * math.cos(cylindrical_point.azimuth)
+        y = cylindrical_point.radius * math.sin(cylindrical_point.azimuth)
+        return CartesianPoint3D(x, y, cylindrical_point.height)
+    
     def __repr__(self) -> str:
         return f"CartesianPoint3D(x={self.x:.4f}, y={self.y:.4f}, z={self.z:.4f})"
 
@@ -85,6 +166,9 @@ class SphericalPoint:
     azimuth: float       # θ (theta) - азимутальний кут у радіанах
     polar_angle: float   # φ (phi) - полярний кут у радіанах
     
+    # Чи має точка попередньо обчислені sin/cos (див. PreparedSphericalPoint)
+    is_prepared: ClassVar[bool] = False
+    
     @staticmethod
     def from_cartesian(cartesian_point: 'CartesianPoint3D') -> 'SphericalPoint':
         """
@@ -111,3 +195,345 @@ class SphericalPoint:
     def __repr__(self) -> str:
         return (f"SphericalPoint(ρ={self.radius:.4f}, "
                 f"θ={self.azimuth:.4f} rad, φ={self.polar_angle:.4f} rad)")
+
+
+@dataclass(frozen=True)
+class CylindricalPoint:
+    """Точка у циліндричній системі координат (полярна площина xy плюс висота)"""
+    radius: float   # r - відстань від осі z
+    azimuth: float  # θ (theta) - азимутальний кут у радіанах
+    height: float   # h - координата z
+    
+    @staticmethod
+    def from_cartesian(cartesian_point: 'CartesianPoint3D') -> 'CylindricalPoint':
+        """
+        Перетворення з декартової системи координат у циліндричну
+        r = √(x² + y²)
+        θ = atan2(y, x)
+        h = z
+        """
+        radius = math.sqrt(cartesian_point.x**2 + cartesian_point.y**2)
+        azimuth = math.atan2(cartesian_point.y, cartesian_point.x)
+        return CylindricalPoint(radius, azimuth, cartesian_point.z)
+    
+    def __repr__(self) -> str:
+        return (f"CylindricalPoint(r={self.radius:.4f}, "
+                f"θ={self.azimuth:.4f} rad, h={self.height:.4f})")
+
+
+@dataclass(frozen=True, repr=False)
+class PreparedPolarPoint(PolarPoint):
+    """
+    Полярна точка з sin/cos кута, обчисленими один раз під час створення
+    Вигідна, коли одна точка порівнюється з багатьма іншими
+    """
+    cos_angle: float = field(init=False, compare=False)
+    sin_angle: float = field(init=False, compare=False)
+    
+    is_prepared: ClassVar[bool] = True
+    
+    def __post_init__(self):
+        object.__setattr__(self, 'cos_angle', math.cos(self.angle))
+        object.__setattr__(self, 'sin_angle', math.sin(self.angle))
+    
+    @classmethod
+    def from_point(cls, point: PolarPoint) -> 'PreparedPolarPoint':
+        """Готує звичайну полярну точку до повторних обчислень відстаней"""
+        return cls(point.radius, point.angle)
+    
+    def __repr__(self) -> str:
+        return "Prepared" + super().__repr__()
+
+
+@dataclass(frozen=True, repr=False)
+class PreparedSphericalPoint(SphericalPoint):
+    """
+    Сферична точка з sin/cos полярного кута та одиничним вектором напрямку,
+    обчисленими один раз під час створення
+    """
+    sin_polar: float = field(init=False, compare=False)
+    cos_polar: float = field(init=False, compare=False)
+    unit_x: float = field(init=False, compare=False)   # sin(φ)·cos(θ)
+    unit_y: float = field(init=False, compare=False)   # sin(φ)·sin(θ)
+    
+    is_prepared: ClassVar[bool] = True
+    
+    def __post_init__(self):
+        sin_polar = math.sin(self.polar_angle)
+        object.__setattr__(self, 'sin_polar', sin_polar)
+        object.__setattr__(self, 'cos_polar', math.cos(self.polar_angle))
+        object.__setattr__(self, 'unit_x', sin_polar * math.cos(self.azimuth))
+        object.__setattr__(self, 'unit_y', sin_polar * math.sin(self.azimuth))
+    
+    @classmethod
+    def from_point(cls, point: SphericalPoint) -> 'PreparedSphericalPoint':
+        """Готує звичайну сферичну точку до повторних обчислень відстаней"""
+        return cls(point.radius, point.azimuth, point.polar_angle)
+    
+    def __repr__(self) -> str:
+        return "Prepared" + super().__repr__()
+
+
+class _PointArray:
+    """
+    Спільна поведінка колонкових (structure-of-arrays) наборів точок
+    Кожна координата зберігається окремою щільною колонкою float64 (або
+    float32 — див. PRECISIONS), імена колонок збігаються з іменами полів
+    відповідного класу точки
+    """
+    _point_type = None
+    # (розташування, memoryview) для наборів, створених from_buffer
+    _buffer: ClassVar[Optional[Tuple[str, memoryview]]] = None
+
+    def __post_init__(self):
+        lengths = {len(column) for column in self.columns()}
+        if len(lengths) > 1:
+            raise ValueError(
+                f"{type(self).__name__}: колонки мають різну довжину {sorted(lengths)}"
+            )
+
+    @classmethod
+    def field_names(cls) -> Tuple[str, ...]:
+        """Імена колонок у порядку полів класу точки"""
+        return tuple(f.name for f in fields(cls))
+
+    def columns(self) -> Tuple[Sequence[float], ...]:
+        """Колонки координат у порядку полів"""
+        return tuple(getattr(self, name) for name in self.field_names())
+
+    def typecode(self) -> str:
+        """Код типу колонок: 'f', якщо всі колонки float32, інакше 'd'"""
+        codes = {_column_typecode(column) for column in self.columns()}
+        return 'f' if codes == {'f'} else 'd'
+
+    @property
+    def precision(self) -> str:
+        """Точність зберігання: 'float64' або 'float32'"""
+        return _PRECISION_OF_TYPECODE[self.typecode()]
+
+    @classmethod
+    def from_points(cls, points: Iterable, precision: str = 'float64') -> '_PointArray':
+        """
+        Пакує список точок у колонки float64 (без втрати точності)
+        або float32 (precision='float32', з округленням)
+        """
+        typecode = _typecode_of(precision)
+        points = list(points)
+        return cls(*(array(typecode, map(attrgetter(name), points))
+                     for name in cls.field_names()))
+
+    def astype(self, precision: str) -> '_PointArray':
+        """Копія набору з точністю precision (той самий набір, якщо вона вже така)"""
+        typecode = _typecode_of(precision)
+        if all(_column_typecode(column) == typecode for column in self.columns()):
+            return self
+        return type(self)(*(array(typecode, column) for column in self.columns()))
+
+    @classmethod
+    def from_buffer(cls, buffer, layout: str = 'columns', precision: str = 'float64') -> '_PointArray':
+        """
+        Набір точок поверх суцільної пам'яті float64 (чи float32) без копіювання
+        Колонки стають memoryview над buffer (для 'interleaved' — з кроком),
+        тож зміни в buffer одразу видно в точках і навпаки
+        """
+        view = _float_view(buffer, _typecode_of(precision))
+        width = len(cls.field_names())
+        if len(view) % width:
+            raise ValueError(f"{cls.__name__}: {len(view)} значень не діляться на {width} координати")
+        n = len(view) // width
+        if layout == 'columns':
+            columns = [view[i * n:(i + 1) * n] for i in range(width)]
+        elif layout == 'interleaved':
+            columns = [view[i::width] for i in range(width)]
+        else:
+            raise ValueError(f"Невідоме розташування: {layout!r}; доступні: {list(LAYOUTS)}")
+        points = cls(*columns)
+        object.__setattr__(points, '_buffer', (layout, view))
+        return points
+
+    def to_buffer(self, layout: str = 'columns', out=None):
+        """
+        Координати одним суцільним буфером у розташуванні layout і точності набору
+        Набір з from_buffer у тому самому розташуванні віддає свою пам'ять
+        без копіювання; інакше значення копіюються в out (записуваний буфер
+        float64 чи float32 потрібної довжини) або в новий array
+        """
+        if layout not in LAYOUTS:
+            raise ValueError(f"Невідоме розташування: {layout!r}; доступні: {list(LAYOUTS)}")
+        if out is None and self._buffer is not None and self._buffer[0] == layout:
+            return self._buffer[1]
+        columns = self.columns()
+        width, n = len(columns), len(self)
+        typecode = self.typecode()
+        result = array(typecode, [0.0]) * (width * n) if out is None else out
+        view = _float_view(result, typecode, writable=True)
+        if len(view) != width * n:
+            raise ValueError(f"Буфер на {len(view)} значень, потрібно {width * n}")
+        for i, column in enumerate(columns):
+            if _column_typecode(column) != typecode or not isinstance(column, (array, memoryview)):
+                column = array(typecode, column)
+            if layout == 'columns':
+                view[i * n:(i + 1) * n] = column
+            else:
+                view[i::width] = column
+        return result
+
+    def to_points(self) -> List:
+        """Розпаковує колонки назад у список імутабельних точок"""
+        return list(map(self._point_type, *self.columns()))
+
+    def __len__(self) -> int:
+        return len(self.columns()[0])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return type(self)(*(column[index] for column in self.columns()))
+        return self._point_type(*(column[index] for column in self.columns()))
+
+    def __iter__(self) -> Iterator:
+        return map(self._point_type, *self.columns())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(n={len(self)})"
+
+
+@dataclass(frozen=True, repr=False)
+class CartesianArray2D(_PointArray):
+    """Колонковий набір точок у двовимірній декартовій системі"""
+    x: Sequence[float]
+    y: Sequence[float]
+
+    _point_type = CartesianPoint2D
+
+    @staticmethod
+    def from_polar(polar_array: 'PolarArray') -> 'CartesianArray2D':
+        """
+        Векторизоване перетворення всієї колонки з полярної системи у декартову
+        Дає ті самі значення, що й CartesianPoint2D.from_polar для кожної точки
+        """
+        radius, angle = polar_array.radius, polar_array.angle
+        typecode = polar_array.typecode()
+        x = array(typecode, map(mul, radius, map(math.cos, angle)))
+        y = array(typecode, map(mul, radius, map(math.sin, angle)))
+        return CartesianArray2D(x, y)
+
+
+@dataclass(frozen=True, repr=False)
+class PolarArray(_PointArray):
+    """Колонковий набір точок у полярній системі координат"""
+    radius: Sequence[float]
+    angle: Sequence[float]
+
+    _point_type = PolarPoint
+
+    @staticmethod
+    def from_cartesian(cartesian_array: CartesianArray2D) -> 'PolarArray':
+        """
+        Векторизоване перетворення всієї колонки з декартової системи у полярну
+        Дає ті самі значення, що й PolarPoint.from_cartesian для кожної точки
+        """
+        sqrt = math.sqrt
+        xs, ys = cartesian_array.x, cartesian_array.y
+        typecode = cartesian_array.typecode()
+        radius = array(typecode, [sqrt(x**2 + y**2) for x, y in zip(xs, ys)])
+        angle = array(typecode, map(math.atan2, ys, xs))
+        return PolarArray(radius, angle)
+
+
+@dataclass(frozen=True, repr=False)
+class CartesianArray3D(_PointArray):
+    """Колонковий набір точок у тривимірній декартовій системі"""
+    x: Sequence[float]
+    y: Sequence[float]
+    z: Sequence[float]
+
+    _point_type = CartesianPoint3D
+
+    @staticmethod
+    def from_spherical(spherical_array: 'SphericalArray') -> 'CartesianArray3D':
+        """
+        Векторизоване перетворення всієї колонки зі сферичної системи у декартову
+        Дає ті самі значення, що й CartesianPoint3D.from_spherical для кожної точки
+        """
+        radius = spherical_array.radius
+        azimuth = spherical_array.azimuth
+        polar_angle = spherical_array.polar_angle
+        typecode = spherical_array.typecode()
+        # ρ·sin(φ) спільний для x та y, рахуємо його один раз (завжди у float64)
+        projected = array('d', map(mul, radius, map(math.sin, polar_angle)))
+        x = array(typecode, map(mul, projected, map(math.cos, azimuth)))
+        y = array(typecode, map(mul, projected, map(math.sin, azimuth)))
+        z = array(typecode, map(mul, radius, map(math.cos, polar_angle)))
+        return CartesianArray3D(x, y, z)
+
+    @staticmethod
+    def from_cylindrical(cylindrical_array: 'CylindricalArray') -> 'CartesianArray3D':
+        """
+        Векторизоване перетворення всієї колонки з циліндричної системи у декартову
+        Дає ті самі значення, що й CartesianPoint3D.from_cylindrical для кожної точки
+        """
+        radius, azimuth = cylindrical_array.radius, cylindrical_array.azimuth
+        typecode = cylindrical_array.typecode()
+        x = array(typecode, map(mul, radius, map(math.cos, azimuth)))
+        y = array(typecode, map(mul, radius, map(math.sin, azimuth)))
+        return CartesianArray3D(x, y, array(typecode, cylindrical_array.height))
+
+
+@dataclass(frozen=True, repr=False)
+class SphericalArray(_PointArray):
+    """Колонковий набір точок у сферичній системі координат"""
+    radius: Sequence[float]
+    azimuth: Sequence[float]
+    polar_angle: Sequence[float]
+
+    _point_type = SphericalPoint
+
+    @staticmethod
+    def from_cartesian(cartesian_array: CartesianArray3D) -> 'SphericalArray':
+        """
+        Векторизоване перетворення всієї колонки з декартової системи у сферичну
+        Дає ті самі значення, що й SphericalPoint.from_cartesian для кожної точки
+        """
+        sqrt, acos = math.sqrt, math.acos
+        xs, ys, zs = cartesian_array.x, cartesian_array.y, cartesian_array.z
+        typecode = cartesian_array.typecode()
+        radius = array('d', [sqrt(x**2 + y**2 + z**2) for x, y, z in zip(xs, ys, zs)])
+        azimuth = array(typecode, map(math.atan2, ys, xs))
+        # Уникаємо ділення на нуль, як і у скалярній версії
+        polar_angle = array(typecode, [acos(z / r) if r != 0 else 0.0
+                                  for z, r in zip(zs, radius)])
+        if typecode != 'd':
+            radius = array(typecode, radius)
+        return SphericalArray(radius, azimuth, polar_angle)
+
+
+@dataclass(frozen=True, repr=False)
+class CylindricalArray(_PointArray):
+    """Колонковий набір точок у циліндричній системі координат"""
+    radius: Sequence[float]
+    azimuth: Sequence[float]
+    height: Sequence[float]
+
+    _point_type = CylindricalPoint
+
+    @staticmethod
+    def from_cartesian(cartesian_array: CartesianArray3D) -> 'CylindricalArray':
+        """
+        Векторизоване перетворення всієї колонки з декартової системи у циліндричну
+        Дає ті самі значення, що й CylindricalPoint.from_cartesian для кожної точки
+        """
+        sqrt = math.sqrt
+        xs, ys = cartesian_array.x, cartesian_array.y
+        typecode = cartesian_array.typecode()
+        radius = array(typecode, [sqrt(x**2 + y**2) for x, y in zip(xs, ys)])
+        azimuth = array(typecode, map(math.atan2, ys, xs))
+        return CylindricalArray(radius, azimuth, array(typecode, cartesian_array.z))
+
+
+# Перетворення -> (вхідний тип, вихідний тип, пакетна функція)
+CONVERSIONS = {
+    'polar_to_cartesian': (PolarArray, CartesianArray2D, CartesianArray2D.from_polar),
+    'cartesian_to_polar': (CartesianArray2D, PolarArray, PolarArray.from_cartesian),
+    'spherical_to_cartesian': (SphericalArray, CartesianArray3D, CartesianArray3D.from_spherical),
+    'cartesian_to_spherical': (CartesianArray3D, SphericalArray, SphericalArray.from_cartesian),
+}
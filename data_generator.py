@@ -0,0 +1,199 @@
+"""
+Відтворюваний генератор тестових наборів точок колонками та фрагментами
+
+Набір розбивається на фрагменти фіксованого розміру chunk_size, і кожен
+фрагмент має власний незалежний генератор, зерно якого виводиться з
+(seed, stream, номер фрагмента). Тому фрагмент k однаковий незалежно від
+того, хто і в якому порядку його згенерував: послідовний ітератор, пул із
+двох чи шістнадцяти процесів — результат побітово той самий (за однакових
+seed, stream та chunk_size).
+
+Розподіли (DISTRIBUTIONS):
+  uniform_2d          — рівномірно у квадраті [-extent, extent]²
+  uniform_polar       — рівномірно за радіусом і кутом
+  uniform_spherical   — рівномірно за радіусом, азимутом і полярним кутом
+  uniform_on_sphere   — рівномірно за площею сфери заданого радіуса
+  clustered_2d        — гаусові скупчення навколо випадкових центрів
+  clustered_on_sphere — скупчення на сфері навколо випадкових напрямків
+"""
+
+import math
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from operator import add, mul
+from typing import Iterator, Optional, Tuple
+from coordinate_systems import (
+    CartesianArray2D, PolarArray,
+    CartesianArray3D, SphericalArray
+)
+
+
+DEFAULT_SEED = 42
+
+DEFAULT_CHUNK_SIZE = 65_536
+
+
+def _uniform(rng: random.Random, n: int, low: float, high: float) -> array:
+    """Колонка з n рівномірних значень на [low, high)"""
+    draw = rng.random
+    span = high - low
+    return array('d', [low + span * draw() for _ in repeat(None, n)])
+
+
+def _normal(rng: random.Random, n: int, sigma: float) -> array:
+    """
+    Колонка з n нормальних значень N(0, sigma²) перетворенням Бокса-Мюллера:
+    дві рівномірні величини дають дві нормальні, що вдвічі дешевше за rng.gauss
+    """
+    draw = rng.random
+    log, sqrt, tau = math.log, math.sqrt, 2 * math.pi
+    half = (n + 1) // 2
+    rho = [sigma * sqrt(-2.0 * log(1.0 - draw())) for _ in repeat(None, half)]
+    theta = [tau * draw() for _ in repeat(None, half)]
+    values = array('d', map(mul, rho, map(math.cos, theta)))
+    values.extend(map(mul, rho, map(math.sin, theta)))
+    del values[n:]
+    return values
+
+
+def _uniform_2d(rng: random.Random, n: int, extent: float = 100.0) -> CartesianArray2D:
+    return CartesianArray2D(_uniform(rng, n, -extent, extent), _uniform(rng, n, -extent, extent))
+
+
+def _uniform_polar(rng: random.Random, n: int,
+                   radius: Tuple[float, float] = (1.0, 100.0)) -> PolarArray:
+    return PolarArray(_uniform(rng, n, *radius), _uniform(rng, n, 0.0, 2 * math.pi))
+
+
+def _uniform_spherical(rng: random.Random, n: int,
+                       radius: Tuple[float, float] = (10.0, 100.0)) -> SphericalArray:
+    return SphericalArray(_uniform(rng, n, *radius), _uniform(rng, n, 0.0, 2 * math.pi),
+                          _uniform(rng, n, 0.0, math.pi))
+
+
+def _uniform_on_sphere(rng: random.Random, n: int, radius: float = 1.0) -> SphericalArray:
+    # cos θ рівномірний на [-1, 1] — тоді точки рівномірні за площею
+    acos = math.acos
+    polar_angle = array('d', [acos(u) for u in _uniform(rng, n, -1.0, 1.0)])
+    return SphericalArray(array('d', [radius]) * n, _uniform(rng, n, 0.0, 2 * math.pi), polar_angle)
+
+
+def _centers(seed: int, stream: int, count: int) -> random.Random:
+    """Генератор центрів скупчень — спільний для всіх фрагментів потоку"""
+    return random.Random(f"{seed}/{stream}/centers/{count}")
+
+
+def _scatter(rng: random.Random, center_columns, members, spread: float) -> list:
+    """Координати членів скупчень: координата центру плюс гаусовий шум"""
+    return [array('d', map(add, map(column.__getitem__, members), _normal(rng, len(members), spread)))
+            for column in center_columns]
+
+
+def _clustered_2d(rng: random.Random, n: int, clusters: int = 16, spread: float = 2.0,
+                  extent: float = 100.0, *, seed: int, stream: int) -> CartesianArray2D:
+    centers = _uniform_2d(_centers(seed, stream, clusters), clusters, extent)
+    members = rng.choices(range(clusters), k=n)
+    return CartesianArray2D(*_scatter(rng, centers.columns(), members, spread))
+
+
+def _clustered_on_sphere(rng: random.Random, n: int, clusters: int = 16, spread: float = 0.05,
+                         radius: float = 1.0, *, seed: int, stream: int) -> SphericalArray:
+    # Одиничний напрямок центру плюс гаусовий шум (spread — приблизно кутовий
+    # розкид у радіанах); радіус потім замінюється на заданий
+    centers = CartesianArray3D.from_spherical(
+        _uniform_on_sphere(_centers(seed, stream, clusters), clusters))
+    members = rng.choices(range(clusters), k=n)
+    points = SphericalArray.from_cartesian(
+        CartesianArray3D(*_scatter(rng, centers.columns(), members, spread)))
+    return SphericalArray(array('d', [radius]) * n, points.azimuth, points.polar_angle)
+
+
+# Назва розподілу -> (функція (rng, n, **params), чи потрібні їй seed/stream)
+DISTRIBUTIONS = {
+    'uniform_2d': (_uniform_2d, False),
+    'uniform_polar': (_uniform_polar, False),
+    'uniform_spherical': (_uniform_spherical, False),
+    'uniform_on_sphere': (_uniform_on_sphere, False),
+    'clustered_2d': (_clustered_2d, True),
+    'clustered_on_sphere': (_clustered_on_sphere, True),
+}
+
+
+def _distribution(name: str):
+    try:
+        return DISTRIBUTIONS[name]
+    except KeyError:
+        raise ValueError(f"Невідомий розподіл: {name!r}; доступні: {sorted(DISTRIBUTIONS)}")
+
+
+def chunk_rng(seed: int, stream: int, index: int) -> random.Random:
+    """
+    Незалежний генератор фрагмента index потоку stream
+    Рядкове зерно хешується SHA-512, тож сусідні номери не корелюють
+    і результат не залежить від PYTHONHASHSEED
+    """
+    return random.Random(f"{seed}/{stream}/{index}")
+
+
+def generate_chunk(name: str, n: int, index: int, seed: int = DEFAULT_SEED, stream: int = 0,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE, precision: str = 'float64', **params):
+    """
+    Фрагмент index набору з n точок (останній може бути коротшим)
+    Значення генеруються у float64; precision='float32' округлює готовий фрагмент
+    """
+    func, needs_stream = _distribution(name)
+    if needs_stream:
+        params = dict(params, seed=seed, stream=stream)
+    size = max(0, min(chunk_size, n - index * chunk_size))
+    return func(chunk_rng(seed, stream, index), size, **params).astype(precision)
+
+
+def iter_chunks(name: str, n: int, seed: int = DEFAULT_SEED, stream: int = 0,
+                chunk_size: int = DEFAULT_CHUNK_SIZE, precision: str = 'float64',
+                **params) -> Iterator:
+    """Генерує набір з n точок послідовними колонковими фрагментами"""
+    _distribution(name)
+    if chunk_size < 1:
+        raise ValueError("chunk_size має бути додатним")
+    for index in range(math.ceil(n / chunk_size)):
+        yield generate_chunk(name, n, index, seed, stream, chunk_size, precision, **params)
+
+
+def _generate_task(task: tuple):
+    name, n, index, seed, stream, chunk_size, precision, params = task
+    return generate_chunk(name, n, index, seed, stream, chunk_size, precision, **params)
+
+
+def concatenate(chunks):
+    """Зшиває колонкові фрагменти одного типу в один набір точності першого фрагмента"""
+    chunks = list(chunks)
+    if not chunks:
+        raise ValueError("Немає фрагментів для зшивання")
+    typecode = chunks[0].typecode()
+    columns = [array(typecode) for _ in chunks[0].field_names()]
+    for chunk in chunks:
+        for column, values in zip(columns, chunk.columns()):
+            column.extend(values)
+    return type(chunks[0])(*columns)
+
+
+def generate(name: str, n: int, seed: int = DEFAULT_SEED, stream: int = 0,
+             chunk_size: int = DEFAULT_CHUNK_SIZE, workers: Optional[int] = None,
+             precision: str = 'float64', **params):
+    """
+    Увесь набір з n точок одним колонковим масивом точності precision
+    З workers > 1 фрагменти генеруються у пулі процесів; результат
+    побітово збігається з послідовним, бо залежить лише від номерів фрагментів
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size має бути додатним")
+    if n == 0:
+        return generate_chunk(name, 0, 0, seed, stream, chunk_size, precision, **params)
+    if not workers or workers == 1:
+        return concatenate(iter_chunks(name, n, seed, stream, chunk_size, precision, **params))
+    tasks = [(name, n, index, seed, stream, chunk_size, precision, params)
+             for index in range(math.ceil(n / chunk_size))]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return concatenate(executor.map(_generate_task, tasks))
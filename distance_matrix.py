@@ -0,0 +1,168 @@
+"""
+Обчислення повної матриці відстаней N×M між двома наборами точок
+блоками (тайлами) з обмеженим бюджетом пам'яті
+"""
+
+import mmap
+import os
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional, Tuple
+from distances import DISTANCE_KERNELS
+
+
+# Бюджет пам'яті на один тайл за замовчуванням (64 МіБ)
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+_ITEM_SIZE = array('d').itemsize
+
+# Тимчасова пам'ять пакетного ядра на одне значення рядка тайла: список
+# об'єктів float (8 байтів посилання + 24 байти об'єкта) і проміжний array
+# перед копіюванням в out (8 байтів)
+_KERNEL_BYTES_PER_VALUE = 40
+
+# Tile = (перший рядок, перший стовпець, кількість рядків, кількість стовпців, значення)
+Tile = Tuple[int, int, int, int, array]
+
+
+@dataclass(frozen=True)
+class MatrixStats:
+    """Підсумок обчислення матриці відстаней"""
+    rows: int
+    cols: int
+    tiles: int
+    seconds: float
+
+    @property
+    def pairs(self) -> int:
+        return self.rows * self.cols
+
+    @property
+    def pairs_per_second(self) -> float:
+        return self.pairs / self.seconds if self.seconds > 0 else float('inf')
+
+    def __repr__(self) -> str:
+        return (f"MatrixStats({self.rows}×{self.cols}, tiles={self.tiles}, "
+                f"{self.seconds:.3f} с, {self.pairs_per_second:,.0f} пар/с)")
+
+
+def tile_shape(rows: int, cols: int,
+               memory_budget: int = DEFAULT_MEMORY_BUDGET) -> Tuple[int, int]:
+    """
+    Розмір тайла (рядки, стовпці), за якого пікова пам'ять не перевищує memory_budget
+    Враховуються два тайли (наступний будується, поки попередній ще у споживача)
+    і тимчасові дані ядра для одного рядка. Спершу тайл розширюється по
+    стовпцях, щоб рядки записувались суцільно
+    """
+    tile_cols = max(1, min(cols, memory_budget // (2 * _ITEM_SIZE + _KERNEL_BYTES_PER_VALUE)))
+    tiles_budget = max(0, memory_budget - tile_cols * _KERNEL_BYTES_PER_VALUE)
+    tile_rows = max(1, min(rows, tiles_budget // (2 * _ITEM_SIZE * tile_cols)))
+    return tile_rows, tile_cols
+
+
+def iter_distance_tiles(points_a, points_b, metric: str,
+                        memory_budget: int = DEFAULT_MEMORY_BUDGET) -> Iterator[Tile]:
+    """
+    Генерує тайли матриці відстаней distance(a[i], b[j]) у порядку рядків
+    Кожен тайл — щільний масив float64 розміром rows×cols (row-major)
+    """
+    try:
+        _, batch = DISTANCE_KERNELS[metric]
+    except KeyError:
+        raise ValueError(f"Невідома метрика: {metric!r}; доступні: {sorted(DISTANCE_KERNELS)}")
+
+    rows, cols = len(points_a), len(points_b)
+    tile_rows, tile_cols = tile_shape(rows, cols, memory_budget)
+
+    # Зрізи другого набору однакові для всіх смуг рядків — готуємо їх один раз
+    column_blocks = [(start, _block(points_b, start, start + tile_cols))
+                     for start in range(0, cols, tile_cols)]
+
+    for row_start in range(0, rows, tile_rows):
+        row_count = min(tile_rows, rows - row_start)
+        for col_start, block in column_blocks:
+            width = len(block)
+            tile = array('d', [0.0]) * (row_count * width)
+            with memoryview(tile) as view:
+                for i in range(row_count):
+                    # Ядро пише рядок прямо у тайл; out float64 і для колонок float32
+                    batch(points_a[row_start + i], block, out=view[i * width:(i + 1) * width])
+            yield row_start, col_start, row_count, width, tile
+
+
+def _block(points, start: int, stop: int):
+    """
+    Зріз набору стовпців без копіювання: увесь набір або memoryview над
+    колонками-буферами (array, memoryview); інші колонки копіюються зрізом
+    """
+    if start == 0 and stop >= len(points):
+        return points
+    columns = points.columns()
+    if all(isinstance(column, (array, memoryview)) for column in columns):
+        return type(points)(*(memoryview(column)[start:stop] for column in columns))
+    return points[start:stop]
+
+
+def distance_matrix(points_a, points_b, metric: str,
+                    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                    callback: Optional[Callable[[int, int, int, int, array], None]] = None,
+                    out_path: Optional[str] = None) -> MatrixStats:
+    """
+    Обчислює матрицю відстаней N×M тайлами, не тримаючи її у пам'яті цілком
+
+    callback(row_start, col_start, rows, cols, tile) викликається для кожного тайла;
+    out_path — файл, у який матриця записується через mmap (float64, row-major).
+    Потрібен хоча б один із приймачів. Повертає MatrixStats з пропускною здатністю.
+    """
+    if callback is None and out_path is None:
+        raise ValueError("Потрібен callback або out_path для запису тайлів")
+
+    rows, cols = len(points_a), len(points_b)
+    output = _open_output(out_path, rows * cols) if out_path is not None else None
+
+    tiles = 0
+    start = time.perf_counter()
+    try:
+        for row_start, col_start, tile_rows, tile_cols, tile in iter_distance_tiles(
+                points_a, points_b, metric, memory_budget):
+            tiles += 1
+            if output is not None:
+                tile_view = memoryview(tile)
+                for i in range(tile_rows):
+                    offset = (row_start + i) * cols + col_start
+                    output[offset:offset + tile_cols] = tile_view[i * tile_cols:(i + 1) * tile_cols]
+            if callback is not None:
+                callback(row_start, col_start, tile_rows, tile_cols, tile)
+    finally:
+        if output is not None:
+            mapped = output.obj
+            output.release()
+            mapped.flush()
+            mapped.close()
+
+    return MatrixStats(rows, cols, tiles, time.perf_counter() - start)
+
+
+def open_distance_matrix(path: str, cols: int) -> memoryview:
+    """
+    Відкриває записану матрицю через mmap без копіювання
+    Повертає memoryview форми (rows, cols): значення читаються як view[i, j]
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return memoryview(array('d')).cast('B').cast('d', (0, cols))
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    rows = size // (_ITEM_SIZE * cols)
+    return memoryview(mapped).cast('d', (rows, cols))
+
+
+def _open_output(path: str, count: int) -> Optional[memoryview]:
+    """Створює файл потрібного розміру та відображає його у пам'ять"""
+    with open(path, 'w+b') as f:
+        f.truncate(count * _ITEM_SIZE)
+        if count == 0:
+            return None
+        mapped = mmap.mmap(f.fileno(), 0)
+    return memoryview(mapped).cast('d')
@@ -4,12 +4,32 @@
 """
 
 import math
+import os
+from array import array
+from itertools import repeat
+from typing import Callable, Optional, Tuple, Union
 from coordinate_systems import (
     CartesianPoint2D, PolarPoint,
-    CartesianPoint3D, SphericalPoint
+    CartesianPoint3D, SphericalPoint,
+    CartesianArray2D, PolarArray,
+    CartesianArray3D, SphericalArray, _PointArray, _column_typecode, _float_view
 )
 
 
+# Гаверсинусний режим (haversine=True) — вибір точності, а не швидкості:
+# полярна відстань, хорда та дуга рахуються через
+#   hav = sin²(Δφ/2)·cos²(Δθ/2) + sin²(Σφ/2)·sin²(Δθ/2)
+# замість теореми косинусів. Усі доданки невід'ємні, тож для близьких точок
+# немає віднімання майже рівних чисел: теорема косинусів там втрачає половину
+# розрядів (cos(...) біля 1, √ε ≈ 1.5e-8) і може дати √ від'ємного числа.
+# Швидкість приблизно та сама (дуга трохи швидша, пакетна хорда трохи повільніша).
+# Межа похибки обох форм відносно точного значення, перевірена тестами:
+#   |d - d_точне| ≤ HAVERSINE_MAX_ERROR · (r₁ + r₂)
+# (для дуги r₁ + r₂ = 2R); гаверсинусна форма для близьких точок дає ~1e-15,
+# а межу визначає теорема косинусів та arcsin(√hav) біля протилежних точок.
+HAVERSINE_MAX_ERROR = 1e-7
+
+
 def distance_2d_cartesian(p1: CartesianPoint2D, p2: CartesianPoint2D) -> float:
     """
     Евклідова відстань між двома точками у декартовій системі 2D
@@ -18,16 +38,30 @@ def distance_2d_cartesian(p1: CartesianPoint2D, p2: CartesianPoint2D) -> float:
     return math.sqrt((p2.x - p1.x)**2 + (p2.y - p1.y)**2)
 
 
-def distance_2d_polar(p1: PolarPoint, p2: PolarPoint) -> float:
+def distance_2d_polar(p1: PolarPoint, p2: PolarPoint, haversine: bool = False) -> float:
     """
     Відстань між двома точками у полярній системі координат
     Використовує теорему косинусів:
     d = √(r₁² + r₂² - 2·r₁·r₂·cos(θ₂ - θ₁))
+    
+    Якщо обидві точки підготовлені (PreparedPolarPoint), cos(θ₂ - θ₁)
+    розкладається через кешовані sin/cos без жодного виклику тригонометрії
+    
+    haversine=True: d = √((r₁ - r₂)² + 4·r₁·r₂·sin²((θ₂ - θ₁)/2)) — стійка
+    для близьких точок форма (див. HAVERSINE_MAX_ERROR); має пріоритет над
+    кешованими значеннями, бо cos(θ₂ - θ₁) з них втрачає точність біля нуля
     """
+    if haversine:
+        return math.sqrt((p1.radius - p2.radius)**2 +
+                         4 * p1.radius * p2.radius * math.sin((p2.angle - p1.angle) * 0.5)**2)
+    if p1.is_prepared and p2.is_prepared:
+        cos_angle_diff = p1.cos_angle * p2.cos_angle + p1.sin_angle * p2.sin_angle
+    else:
+        cos_angle_diff = math.cos(p2.angle - p1.angle)
     return math.sqrt(
         p1.radius**2 + 
         p2.radius**2 - 
-        2 * p1.radius * p2.radius * math.cos(p2.angle - p1.angle)
+        2 * p1.radius * p2.radius * cos_angle_diff
     )
 
 
@@ -43,17 +77,57 @@ def distance_3d_cartesian(p1: CartesianPoint3D, p2: CartesianPoint3D) -> float:
     )
 
 
-def distance_3d_spherical_chord(p1: SphericalPoint, p2: SphericalPoint) -> float:
+def _prepared_cos_arc(p1: SphericalPoint, p2: SphericalPoint) -> float:
+    """
+    Косинус центрального кута між точками, з яких хоча б одна підготовлена
+    
+    Обидві підготовлені: скалярний добуток одиничних векторів (без тригонометрії,
+    відрізняється від загальної формули лише в останніх бітах).
+    Одна підготовлена: загальна формула з кешованими sin/cos, результат побітово
+    збігається зі звичайними точками.
+    """
+    if p1.is_prepared and p2.is_prepared:
+        return (p1.unit_x * p2.unit_x + p1.unit_y * p2.unit_y +
+                p1.cos_polar * p2.cos_polar)
+    
+    sin1, cos1 = _sin_cos_polar(p1)
+    sin2, cos2 = _sin_cos_polar(p2)
+    return sin1 * sin2 * math.cos(p2.azimuth - p1.azimuth) + cos1 * cos2
+
+
+def _sin_cos_polar(point: SphericalPoint) -> Tuple[float, float]:
+    if point.is_prepared:
+        return point.sin_polar, point.cos_polar
+    return math.sin(point.polar_angle), math.cos(point.polar_angle)
+
+
+def distance_3d_spherical_chord(p1: SphericalPoint, p2: SphericalPoint,
+                                haversine: bool = False) -> float:
     """
     Пряма відстань (хорда) між двома точками у сферичній системі координат
     Застосовується для точок з різними радіусами
     
     d = √(ρ₁² + ρ₂² - 2·ρ₁·ρ₂·[sin(φ₁)·sin(φ₂)·cos(θ₂ - θ₁) + cos(φ₁)·cos(φ₂)])
-    """
-    cos_angle_diff = math.cos(p2.azimuth - p1.azimuth)
     
-    term = (math.sin(p1.polar_angle) * math.sin(p2.polar_angle) * cos_angle_diff +
-            math.cos(p1.polar_angle) * math.cos(p2.polar_angle))
+    Для підготовлених точок (PreparedSphericalPoint) використовуються кешовані значення
+    
+    haversine=True: d = √((ρ₁ - ρ₂)² + 4·ρ₁·ρ₂·hav) — стійка для близьких
+    точок форма (див. HAVERSINE_MAX_ERROR); діє й для підготовлених точок
+    (кешовані значення тоді не потрібні)
+    """
+    if haversine:
+        phi1, phi2 = p1.polar_angle, p2.polar_angle
+        weight = math.sin((p2.azimuth - p1.azimuth) * 0.5)**2
+        haversine = (math.sin((phi2 - phi1) * 0.5)**2 * (1 - weight) +
+                     math.sin((phi2 + phi1) * 0.5)**2 * weight)
+        return math.sqrt((p1.radius - p2.radius)**2 + 4 * p1.radius * p2.radius * haversine)
+    if p1.is_prepared or p2.is_prepared:
+        term = _prepared_cos_arc(p1, p2)
+    else:
+        cos_angle_diff = math.cos(p2.azimuth - p1.azimuth)
+        
+        term = (math.sin(p1.polar_angle) * math.sin(p2.polar_angle) * cos_angle_diff +
+                math.cos(p1.polar_angle) * math.cos(p2.polar_angle))
     
     return math.sqrt(
         p1.radius**2 + 
@@ -62,7 +136,8 @@ def distance_3d_spherical_chord(p1: SphericalPoint, p2: SphericalPoint) -> float
     )
 
 
-def distance_3d_spherical_arc(p1: SphericalPoint, p2: SphericalPoint) -> float:
+def distance_3d_spherical_arc(p1: SphericalPoint, p2: SphericalPoint,
+                              haversine: bool = False) -> float:
     """
     Дугова відстань (по поверхні сфери) між двома точками
     Використовує формулу великого кола (haversine-подібна)
@@ -70,16 +145,250 @@ def distance_3d_spherical_arc(p1: SphericalPoint, p2: SphericalPoint) -> float:
     Умова: p1.radius == p2.radius (точки на одній сфері)
     
     d = R · arccos(sin(φ₁)·sin(φ₂)·cos(θ₂ - θ₁) + cos(φ₁)·cos(φ₂))
+    
+    Для підготовлених точок (PreparedSphericalPoint) використовуються кешовані значення
+    
+    haversine=True: d = 2R · arcsin(√hav) — стійка для близьких точок форма
+    (див. HAVERSINE_MAX_ERROR); діє й для підготовлених точок (кешовані
+    значення тоді не потрібні)
     """
     # Використовуємо середнє значення радіусів для підвищення точності
     radius = (p1.radius + p2.radius) / 2
     
-    cos_angle_diff = math.cos(p2.azimuth - p1.azimuth)
-    
-    cos_arc = (math.sin(p1.polar_angle) * math.sin(p2.polar_angle) * cos_angle_diff +
-               math.cos(p1.polar_angle) * math.cos(p2.polar_angle))
+    if haversine:
+        phi1, phi2 = p1.polar_angle, p2.polar_angle
+        weight = math.sin((p2.azimuth - p1.azimuth) * 0.5)**2
+        haversine = (math.sin((phi2 - phi1) * 0.5)**2 * (1 - weight) +
+                     math.sin((phi2 + phi1) * 0.5)**2 * weight)
+        # Округлення може дати 1 + ε
+        return 2 * radius * math.asin(math.sqrt(haversine) if haversine < 1 else 1.0)
+    if p1.is_prepared or p2.is_prepared:
+        cos_arc = _prepared_cos_arc(p1, p2)
+    else:
+        cos_angle_diff = math.cos(p2.azimuth - p1.azimuth)
+        
+        cos_arc = (math.sin(p1.polar_angle) * math.sin(p2.polar_angle) * cos_angle_diff +
+                   math.cos(p1.polar_angle) * math.cos(p2.polar_angle))
     
     # Обмежуємо значення для уникнення помилок округлення
     cos_arc = max(-1, min(1, cos_arc))
     
     return radius * math.acos(cos_arc)
+
+
+# ---------------------------------------------------------------------------
+# Пакетні (batch) версії: дві колонки однакової довжини або колонка + точка.
+# Формули та порядок операцій повторюють скалярні функції, тому результати
+# збігаються з ними побітово.
+# ---------------------------------------------------------------------------
+
+_ARRAY_TYPES = (CartesianArray2D, PolarArray, CartesianArray3D, SphericalArray)
+
+
+def _batch_length(p1, p2, array_type) -> int:
+    """
+    Перевіряє операнди пакетної функції та повертає кількість пар
+    Одиночна точка транслюється (broadcast) на всю довжину колонки
+    """
+    arrays = [p for p in (p1, p2) if isinstance(p, array_type)]
+    if not arrays:
+        raise TypeError(f"Очікується хоча б один {array_type.__name__}")
+    if len(arrays) == 2 and len(p1) != len(p2):
+        raise ValueError(f"Колонки мають різну довжину: {len(p1)} та {len(p2)}")
+    return len(arrays[0])
+
+
+def _column(points, name: str, n: int,
+            func: Optional[Callable[[float], float]] = None):
+    """
+    Ітератор значень координати name (за потреби після func)
+    Для одиночної точки func обчислюється лише один раз
+    """
+    if isinstance(points, _ARRAY_TYPES):
+        column = getattr(points, name)
+        return column if func is None else map(func, column)
+    value = getattr(points, name)
+    return repeat(value if func is None else func(value), n)
+
+
+def _batch_typecode(p1, p2) -> str:
+    """
+    Точність результату пакетної функції: float32 ('f'), лише якщо всі
+    колонкові операнди зберігаються у float32, інакше float64 ('d')
+    """
+    arrays = [p for p in (p1, p2) if isinstance(p, _PointArray)]
+    return 'f' if all(p.typecode() == 'f' for p in arrays) else 'd'
+
+
+def _result(values, out, typecode: str = 'd'):
+    """
+    Результат пакетної функції: новий array(typecode) або запис у out —
+    будь-який записуваний буфер float64 чи float32 довжиною n (array,
+    memoryview, mmap, масив numpy); тоді повертається сам out
+    Значення обчислюються у float64 і округлюються лише під час запису
+    """
+    if out is None:
+        return array(typecode, values)
+    result = array(_column_typecode(out), values)
+    view = _float_view(out, result.typecode, writable=True)
+    if len(view) != len(result):
+        raise ValueError(f"Буфер out на {len(view)} значень, потрібно {len(result)}")
+    view[:] = result
+    return out
+
+
+def distance_2d_cartesian_batch(
+        p1: Union[CartesianArray2D, CartesianPoint2D],
+        p2: Union[CartesianArray2D, CartesianPoint2D], out=None) -> array:
+    """
+    Пакетна евклідова відстань 2D для колонок точок
+    Повертає щільний масив float64 (float32 для колонок float32) довжиною n
+    (або out, якщо його передано)
+    """
+    n = _batch_length(p1, p2, CartesianArray2D)
+    typecode = _batch_typecode(p1, p2)
+    sqrt = math.sqrt
+    return _result([
+        sqrt((x2 - x1)**2 + (y2 - y1)**2)
+        for x1, y1, x2, y2 in zip(_column(p1, 'x', n), _column(p1, 'y', n),
+                                  _column(p2, 'x', n), _column(p2, 'y', n))
+    ], out, typecode)
+
+
+def distance_2d_polar_batch(p1: Union[PolarArray, PolarPoint],
+                            p2: Union[PolarArray, PolarPoint],
+                            haversine: bool = False, out=None) -> array:
+    """
+    Пакетна відстань за теоремою косинусів для колонок полярних точок
+    haversine=True — формула з sin² половинного кута (див. distance_2d_polar)
+    Повертає щільний масив float64 (float32 для колонок float32) довжиною n
+    (або out, якщо його передано)
+    """
+    n = _batch_length(p1, p2, PolarArray)
+    typecode = _batch_typecode(p1, p2)
+    sqrt, cos, sin = math.sqrt, math.cos, math.sin
+    columns = zip(_column(p1, 'radius', n), _column(p1, 'angle', n),
+                  _column(p2, 'radius', n), _column(p2, 'angle', n))
+    if haversine:
+        return _result([sqrt((r1 - r2)**2 + 4 * r1 * r2 * sin((a2 - a1) * 0.5)**2)
+                        for r1, a1, r2, a2 in columns], out, typecode)
+    return _result([
+        sqrt(r1**2 + r2**2 - 2 * r1 * r2 * cos(a2 - a1))
+        for r1, a1, r2, a2 in columns
+    ], out, typecode)
+
+
+def distance_3d_cartesian_batch(
+        p1: Union[CartesianArray3D, CartesianPoint3D],
+        p2: Union[CartesianArray3D, CartesianPoint3D], out=None) -> array:
+    """
+    Пакетна евклідова відстань 3D для колонок точок
+    Повертає щільний масив float64 (float32 для колонок float32) довжиною n
+    (або out, якщо його передано)
+    """
+    n = _batch_length(p1, p2, CartesianArray3D)
+    typecode = _batch_typecode(p1, p2)
+    sqrt = math.sqrt
+    return _result([
+        sqrt((x2 - x1)**2 + (y2 - y1)**2 + (z2 - z1)**2)
+        for x1, y1, z1, x2, y2, z2 in zip(
+            _column(p1, 'x', n), _column(p1, 'y', n), _column(p1, 'z', n),
+            _column(p2, 'x', n), _column(p2, 'y', n), _column(p2, 'z', n))
+    ], out, typecode)
+
+
+def _spherical_columns(p1, p2, n: int):
+    """Колонки (ρ, θ, sin φ, cos φ) обох операндів для сферичних формул"""
+    return zip(
+        _column(p1, 'radius', n), _column(p1, 'azimuth', n),
+        _column(p1, 'polar_angle', n, math.sin), _column(p1, 'polar_angle', n, math.cos),
+        _column(p2, 'radius', n), _column(p2, 'azimuth', n),
+        _column(p2, 'polar_angle', n, math.sin), _column(p2, 'polar_angle', n, math.cos),
+    )
+
+
+def _haversine_columns(p1, p2, n: int):
+    """Пари (ρ₁, ρ₂, hav) для гаверсинусного режиму сферичних формул"""
+    sin = math.sin
+    for r1, t1, f1, r2, t2, f2 in zip(
+            _column(p1, 'radius', n), _column(p1, 'azimuth', n), _column(p1, 'polar_angle', n),
+            _column(p2, 'radius', n), _column(p2, 'azimuth', n), _column(p2, 'polar_angle', n)):
+        weight = sin((t2 - t1) * 0.5)**2
+        yield r1, r2, sin((f2 - f1) * 0.5)**2 * (1 - weight) + sin((f2 + f1) * 0.5)**2 * weight
+
+
+def distance_3d_spherical_chord_batch(
+        p1: Union[SphericalArray, SphericalPoint],
+        p2: Union[SphericalArray, SphericalPoint],
+        haversine: bool = False, out=None) -> array:
+    """
+    Пакетна пряма відстань (хорда) для колонок сферичних точок
+    haversine=True — гаверсинусна формула (див. distance_3d_spherical_chord)
+    Повертає щільний масив float64 (float32 для колонок float32) довжиною n
+    (або out, якщо його передано)
+    """
+    n = _batch_length(p1, p2, SphericalArray)
+    typecode = _batch_typecode(p1, p2)
+    if haversine:
+        sqrt = math.sqrt
+        return _result([sqrt((r1 - r2)**2 + 4 * r1 * r2 * hav)
+                        for r1, r2, hav in _haversine_columns(p1, p2, n)], out, typecode)
+    sqrt, cos = math.sqrt, math.cos
+    return _result([
+        sqrt(r1**2 + r2**2 - 2 * r1 * r2 * (s1 * s2 * cos(t2 - t1) + c1 * c2))
+        for r1, t1, s1, c1, r2, t2, s2, c2 in _spherical_columns(p1, p2, n)
+    ], out, typecode)
+
+
+def distance_3d_spherical_arc_batch(
+        p1: Union[SphericalArray, SphericalPoint],
+        p2: Union[SphericalArray, SphericalPoint],
+        haversine: bool = False, out=None) -> array:
+    """
+    Пакетна дугова відстань для колонок сферичних точок
+    Косинус дуги обмежується діапазоном [-1, 1], як і у скалярній версії
+    haversine=True — гаверсинусна формула (див. distance_3d_spherical_arc)
+    Повертає щільний масив float64 (float32 для колонок float32) довжиною n
+    (або out, якщо його передано)
+    """
+    n = _batch_length(p1, p2, SphericalArray)
+    typecode = _batch_typecode(p1, p2)
+    if haversine:
+        sqrt, asin = math.sqrt, math.asin
+        return _result([(r1 + r2) * asin(sqrt(hav) if hav < 1 else 1.0)
+                        for r1, r2, hav in _haversine_columns(p1, p2, n)], out, typecode)
+    cos, acos = math.cos, math.acos
+    return _result([
+        (r1 + r2) / 2 * acos(max(-1, min(1, s1 * s2 * cos(t2 - t1) + c1 * c2)))
+        for r1, t1, s1, c1, r2, t2, s2, c2 in _spherical_columns(p1, p2, n)
+    ], out, typecode)
+
+
+# Метрика -> (тип колонок, пакетна функція)
+DISTANCE_KERNELS = {
+    'cartesian_2d': (CartesianArray2D, distance_2d_cartesian_batch),
+    'polar_2d': (PolarArray, distance_2d_polar_batch),
+    'cartesian_3d': (CartesianArray3D, distance_3d_cartesian_batch),
+    'spherical_chord': (SphericalArray, distance_3d_spherical_chord_batch),
+    'spherical_arc': (SphericalArray, distance_3d_spherical_arc_batch),
+}
+
+# Метрики, пакетні функції яких приймають haversine=True
+HAVERSINE_METRICS = ('polar_2d', 'spherical_chord', 'spherical_arc')
+
+
+def enable_from_environment() -> None:
+    """
+    Необов'язковий вибір бекендів зі змінної COORDINATES_BACKEND (backends.py),
+    потім інструментування зі змінної COORDINATES_INSTRUMENT (instrumentation.py),
+    щоб обгортки рахували виклики вибраних бекендів. Без змінних модулі не
+    імпортуються і працюють еталонні функції без обгорток. Викликається точками
+    входу (main.py, service.py, benchmark.py) після імпорту, а не під час нього:
+    обидва модулі самі імпортують distances
+    """
+    if os.environ.get('COORDINATES_BACKEND', '').strip() not in ('', '0'):
+        import backends
+        backends.enable_from_environment()
+    if os.environ.get('COORDINATES_INSTRUMENT', '').strip() not in ('', '0'):
+        import instrumentation
+        instrumentation.enable_from_environment()
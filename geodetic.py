@@ -0,0 +1,284 @@
+"""
+Геодезичні координати на еліпсоїді WGS84
+
+GeodeticPoint — широта φ, довгота λ (радіани) та висота h над еліпсоїдом (метри).
+Декартові координати — ECEF (центр Землі, вісь z — до північного полюса,
+вісь x — до перетину екватора з нульовим меридіаном), тобто звичайні
+CartesianPoint3D / CartesianArray3D у метрах.
+
+  геодезичні -> ECEF: замкнені формули
+      N = a / √(1 - e²·sin²φ)
+      x = (N + h)·cos φ·cos λ,  y = (N + h)·cos φ·sin λ,  z = (N·(1 - e²) + h)·sin φ
+  ECEF -> геодезичні: неітераційний розв'язок Хейккінена (1982), похибка
+      порядку нанометрів для точок від ~50 км від центру Землі до орбіт супутників
+  геодезична відстань: обернена задача Вінсенті (1975) на поверхні еліпсоїда,
+      висоти не враховуються; для майже антиподальних пар, де ітерація
+      Вінсенті не збігається, — бісекція за азимутом (Карні, 2013)
+"""
+
+import math
+from array import array
+from dataclasses import dataclass
+from itertools import repeat
+from typing import Sequence, Tuple, Union
+from coordinate_systems import CartesianPoint3D, CartesianArray3D, _PointArray
+from distances import _batch_length, _batch_typecode, _result
+
+
+# Параметри еліпсоїда WGS84
+WGS84_A = 6378137.0                          # велика піввісь, м
+WGS84_F = 1 / 298.257223563                  # стиснення
+WGS84_B = WGS84_A * (1 - WGS84_F)            # мала піввісь, м
+WGS84_E2 = WGS84_F * (2 - WGS84_F)           # квадрат першого ексцентриситету
+WGS84_EP2 = WGS84_E2 / (1 - WGS84_E2)        # квадрат другого ексцентриситету
+
+# Середній радіус Землі (IUGG) — для порівняння зі сферичною дуговою відстанню
+MEAN_EARTH_RADIUS = 6371008.8
+
+# Збіжність ітерації Вінсенті за λ (радіани) та межа кількості ітерацій
+VINCENTY_TOLERANCE = 1e-12
+VINCENTY_MAX_ITERATIONS = 1000
+# Після стількох ітерацій крок λ згладжується (середнє з попереднім значенням):
+# майже антиподальні пари інакше осцилюють і не збігаються
+_VINCENTY_DAMPING_AFTER = 20
+
+_A2 = WGS84_A * WGS84_A
+_B2 = WGS84_B * WGS84_B
+_E4 = WGS84_E2 * WGS84_E2
+_AB_DIFF = _A2 - _B2
+
+
+@dataclass(frozen=True)
+class GeodeticPoint:
+    """Точка на еліпсоїді WGS84: широта та довгота в радіанах, висота в метрах"""
+    latitude: float      # φ - геодезична широта у радіанах
+    longitude: float     # λ - довгота у радіанах
+    height: float = 0.0  # h - висота над еліпсоїдом у метрах
+
+    @staticmethod
+    def from_degrees(latitude: float, longitude: float, height: float = 0.0) -> 'GeodeticPoint':
+        """Створення точки з широти й довготи в градусах"""
+        return GeodeticPoint(math.radians(latitude), math.radians(longitude), height)
+
+    @staticmethod
+    def from_cartesian(cartesian_point: CartesianPoint3D) -> 'GeodeticPoint':
+        """Перетворення з ECEF (метри) у геодезичні координати (Хейккінен)"""
+        return GeodeticPoint(*_ecef_to_geodetic(cartesian_point.x, cartesian_point.y,
+                                                 cartesian_point.z))
+
+    def __repr__(self) -> str:
+        return (f"GeodeticPoint(φ={math.degrees(self.latitude):.6f}°, "
+                f"λ={math.degrees(self.longitude):.6f}°, h={self.height:.3f} м)")
+
+
+@dataclass(frozen=True, repr=False)
+class GeodeticArray(_PointArray):
+    """Колонковий набір геодезичних точок WGS84"""
+    latitude: Sequence[float]
+    longitude: Sequence[float]
+    height: Sequence[float]
+
+    _point_type = GeodeticPoint
+
+    @staticmethod
+    def from_cartesian(cartesian_array: CartesianArray3D) -> 'GeodeticArray':
+        """
+        Пакетне перетворення ECEF -> геодезичні координати
+        Дає ті самі значення, що й GeodeticPoint.from_cartesian для кожної точки
+        """
+        converted = list(map(_ecef_to_geodetic, cartesian_array.x, cartesian_array.y,
+                             cartesian_array.z))
+        typecode = cartesian_array.typecode()
+        return GeodeticArray(array(typecode, [c[0] for c in converted]),
+                             array(typecode, [c[1] for c in converted]),
+                             array(typecode, [c[2] for c in converted]))
+
+
+# Геодезичні -> ECEF. Як і решта перетворень пакета, напрямок задає ціль:
+# GeodeticPoint.from_cartesian / cartesian_from_geodetic. CartesianPoint3D
+# визначено в coordinate_systems, який не залежить від еліпсоїда, тому
+# перетворення у ECEF — функції цього модуля, а не методи класу
+
+def cartesian_from_geodetic(geodetic_point: GeodeticPoint) -> CartesianPoint3D:
+    """Перетворення геодезичної точки у ECEF (метри); обернене — GeodeticPoint.from_cartesian"""
+    sin_lat = math.sin(geodetic_point.latitude)
+    cos_lat = math.cos(geodetic_point.latitude)
+    n = WGS84_A / math.sqrt(1 - WGS84_E2 * sin_lat * sin_lat)
+    height, longitude = geodetic_point.height, geodetic_point.longitude
+    return CartesianPoint3D((n + height) * cos_lat * math.cos(longitude),
+                            (n + height) * cos_lat * math.sin(longitude),
+                            (n * (1 - WGS84_E2) + height) * sin_lat)
+
+
+def cartesian_array_from_geodetic(geodetic_array: GeodeticArray) -> CartesianArray3D:
+    """
+    Пакетне перетворення у ECEF; обернене — GeodeticArray.from_cartesian
+    Дає ті самі значення, що й cartesian_from_geodetic для кожної точки
+    """
+    sqrt, sin, cos = math.sqrt, math.sin, math.cos
+    sin_lat = list(map(sin, geodetic_array.latitude))
+    cos_lat = list(map(cos, geodetic_array.latitude))
+    n = [WGS84_A / sqrt(1 - WGS84_E2 * s * s) for s in sin_lat]
+    height, longitude = geodetic_array.height, geodetic_array.longitude
+    typecode = geodetic_array.typecode()
+    x = array(typecode, [(ni + h) * c * cos(lon) for ni, h, c, lon
+                         in zip(n, height, cos_lat, longitude)])
+    y = array(typecode, [(ni + h) * c * sin(lon) for ni, h, c, lon
+                         in zip(n, height, cos_lat, longitude)])
+    z = array(typecode, [(ni * (1 - WGS84_E2) + h) * s for ni, h, s
+                         in zip(n, height, sin_lat)])
+    return CartesianArray3D(x, y, z)
+
+
+def _ecef_to_geodetic(x: float, y: float, z: float) -> Tuple[float, float, float]:
+    """
+    Замкнений розв'язок Хейккінена для ECEF -> (φ, λ, h)
+    Не визначений поблизу центру Землі, де G ≤ 0 (ближче ~50 км)
+    """
+    p2 = x * x + y * y
+    z2 = z * z
+    p = math.sqrt(p2)
+    f = 54 * _B2 * z2
+    g = p2 + (1 - WGS84_E2) * z2 - WGS84_E2 * _AB_DIFF
+    if g <= 0:
+        raise ValueError("Точка надто близько до центру Землі для перетворення у геодезичні")
+    c = _E4 * f * p2 / (g * g * g)
+    s = (1 + c + math.sqrt(c * c + 2 * c)) ** (1 / 3)
+    k = s + 1 + 1 / s
+    big_p = f / (3 * k * k * g * g)
+    q = math.sqrt(1 + 2 * _E4 * big_p)
+    r0 = (-big_p * WGS84_E2 * p / (1 + q)
+          + math.sqrt(_A2 / 2 * (1 + 1 / q) - big_p * (1 - WGS84_E2) * z2 / (q * (1 + q))
+                      - big_p * p2 / 2))
+    t = p - WGS84_E2 * r0
+    u = math.sqrt(t * t + z2)
+    v = math.sqrt(t * t + (1 - WGS84_E2) * z2)
+    z0 = _B2 * z / (WGS84_A * v)
+    height = u * (1 - _B2 / (WGS84_A * v))
+    return math.atan2(z + WGS84_EP2 * z0, p), math.atan2(y, x), height
+
+
+def _vincenty(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Обернена задача Вінсенті: довжина геодезичної між двома точками еліпсоїда, м"""
+    sin, cos, sqrt, atan2 = math.sin, math.cos, math.sqrt, math.atan2
+    f = WGS84_F
+    lon_diff = lon2 - lon1
+    # Зведені широти
+    u1 = math.atan((1 - f) * math.tan(lat1))
+    u2 = math.atan((1 - f) * math.tan(lat2))
+    sin_u1, cos_u1 = sin(u1), cos(u1)
+    sin_u2, cos_u2 = sin(u2), cos(u2)
+
+    lam = lon_diff
+    for iteration in range(VINCENTY_MAX_ITERATIONS):
+        sin_lam, cos_lam = sin(lam), cos(lam)
+        sin_sigma = sqrt((cos_u2 * sin_lam)**2 + (cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam)**2)
+        if sin_sigma == 0:
+            return 0.0  # точки збігаються
+        cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+        sigma = atan2(sin_sigma, cos_sigma)
+        sin_alpha = cos_u1 * cos_u2 * sin_lam / sin_sigma
+        cos2_alpha = 1 - sin_alpha * sin_alpha
+        # На екваторі cos²α = 0 і cos 2σm не визначений (береться 0)
+        cos_2sm = cos_sigma - 2 * sin_u1 * sin_u2 / cos2_alpha if cos2_alpha != 0 else 0.0
+        c = f / 16 * cos2_alpha * (4 + f * (4 - 3 * cos2_alpha))
+        previous = lam
+        lam = lon_diff + (1 - c) * f * sin_alpha * (
+            sigma + c * sin_sigma * (cos_2sm + c * cos_sigma * (-1 + 2 * cos_2sm * cos_2sm)))
+        if abs(lam - previous) < VINCENTY_TOLERANCE:
+            break
+        if iteration >= _VINCENTY_DAMPING_AFTER:
+            lam = 0.5 * (lam + previous)
+    else:
+        # Майже антиподальні точки: ітерація за λ не збігається
+        return _vincenty_antipodal(lat1, lon1, lat2, lon2)
+    return _geodesic_length(sigma, sin_sigma, cos_sigma, cos_2sm, cos2_alpha)
+
+
+def _geodesic_length(sigma: float, sin_sigma: float, cos_sigma: float,
+                     cos_2sm: float, cos2_alpha: float) -> float:
+    """Довжина геодезичної за дугою σ допоміжної сфери (ряди Вінсенті), м"""
+    u_sq = cos2_alpha * _AB_DIFF / _B2
+    big_a = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+    big_b = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+    delta_sigma = big_b * sin_sigma * (
+        cos_2sm + big_b / 4 * (cos_sigma * (-1 + 2 * cos_2sm * cos_2sm)
+                               - big_b / 6 * cos_2sm * (-3 + 4 * sin_sigma * sin_sigma)
+                               * (-3 + 4 * cos_2sm * cos_2sm)))
+    return WGS84_B * big_a * (sigma - delta_sigma)
+
+
+def _vincenty_antipodal(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Обернена задача для майже антиподальних точок: бісекція за азимутом α₁
+    замість ітерації за λ (підхід Карні, 2013) з тими самими рядами Вінсенті
+    Точки зводяться до канонічного вигляду β₁ ≤ 0, |β₂| ≤ |β₁|, Δλ ∈ [0, π];
+    тоді різниця довгот λ₁₂(α₁) зростає від 0 (α₁ = 0) до π (α₁ = π)
+    """
+    sin, cos, sqrt, atan2 = math.sin, math.cos, math.sqrt, math.atan2
+    f = WGS84_F
+    lon_diff = abs(math.remainder(lon2 - lon1, 2 * math.pi))
+    beta1 = math.atan((1 - f) * math.tan(lat1))
+    beta2 = math.atan((1 - f) * math.tan(lat2))
+    if abs(beta2) > abs(beta1):
+        beta1, beta2 = beta2, beta1
+    if beta1 > 0:
+        beta1, beta2 = -beta1, -beta2
+    # -0.0 для точки на екваторі: початок вважається щойно південніше екватора
+    sin_b1, cos_b1 = -abs(sin(beta1)), cos(beta1)
+    sin_b2, cos_b2 = sin(beta2), cos(beta2)
+
+    def solve(alpha1: float):
+        sin_a1, cos_a1 = sin(alpha1), cos(alpha1)
+        sin_a0 = sin_a1 * cos_b1
+        cos2_a0 = 1 - sin_a0 * sin_a0
+        # cos α₂·cos β₂ ≥ 0: другу точку геодезична перетинає, рухаючись на північ
+        x2 = sqrt(max(0.0, (cos_a1 * cos_b1)**2 + (cos_b2 * cos_b2 - cos_b1 * cos_b1)))
+        sigma1 = atan2(sin_b1, cos_a1 * cos_b1)
+        sigma2 = atan2(sin_b2, x2)
+        omega = atan2(sin_a0 * sin_b2, x2) - atan2(sin_a0 * sin_b1, cos_a1 * cos_b1)
+        sigma = sigma2 - sigma1
+        cos_2sm = cos(sigma1 + sigma2)
+        c = f / 16 * cos2_a0 * (4 + f * (4 - 3 * cos2_a0))
+        lam = omega - (1 - c) * f * sin_a0 * (
+            sigma + c * sin(sigma) * (cos_2sm + c * cos(sigma) * (-1 + 2 * cos_2sm * cos_2sm)))
+        return lam, sigma, cos_2sm, cos2_a0
+
+    low, high = 0.0, math.pi
+    while True:
+        middle = 0.5 * (low + high)
+        if not low < middle < high:
+            break
+        if solve(middle)[0] < lon_diff:
+            low = middle
+        else:
+            high = middle
+    _, sigma, cos_2sm, cos2_a0 = solve(middle)
+    return _geodesic_length(sigma, sin(sigma), cos(sigma), cos_2sm, cos2_a0)
+
+
+def geodesic_distance(p1: GeodeticPoint, p2: GeodeticPoint) -> float:
+    """
+    Довжина найкоротшої лінії на еліпсоїді WGS84 між проєкціями точок, м
+    (метод Вінсенті, точність ~0.1 мм; висоти не враховуються)
+    """
+    return _vincenty(p1.latitude, p1.longitude, p2.latitude, p2.longitude)
+
+
+def _coordinates(points, n: int):
+    if isinstance(points, GeodeticArray):
+        return points.latitude, points.longitude
+    return repeat(points.latitude, n), repeat(points.longitude, n)
+
+
+def geodesic_distance_batch(p1: Union[GeodeticArray, GeodeticPoint],
+                            p2: Union[GeodeticArray, GeodeticPoint], out=None) -> array:
+    """
+    Пакетна геодезична відстань (одиночна точка транслюється на всю колонку)
+    Дає ті самі значення, що й geodesic_distance для кожної пари;
+    out — записуваний буфер float64 чи float32 для результату (див. distances._result)
+    """
+    n = _batch_length(p1, p2, GeodeticArray)
+    lat1, lon1 = _coordinates(p1, n)
+    lat2, lon2 = _coordinates(p2, n)
+    return _result(map(_vincenty, lat1, lon1, lat2, lon2), out, _batch_typecode(p1, p2))
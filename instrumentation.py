@@ -0,0 +1,286 @@
+"""
+Необов'язкове інструментування гарячих шляхів: кількість викликів, сумарний
+час і розміри пакетів для перетворень coordinate_systems та відстаней distances
+
+Вимкнене інструментування нічого не коштує: оригінальні функції лишаються
+на місці. Увімкнення підміняє їх обгортками — статичні методи класів точок,
+атрибути модуля distances і записи реєстрів DISPATCH_TABLES (на кшталт
+distances.DISTANCE_KERNELS). Імпорти «from distances import ...» в інших
+модулях не підміняються: код, що має бачити підміну, звертається до
+distances.<функція> або до реєстру. Вимкнення повертає оригінали скрізь.
+
+Способи увімкнення:
+  with instrumented():
+      ...
+  print(format_report())
+
+  COORDINATES_INSTRUMENT=1 python3 main.py benchmark          # звіт у stderr при виході
+  COORDINATES_INSTRUMENT=stats.json python3 main.py benchmark # JSON-файл при виході
+  python3 main.py benchmark --instrument                      # звіт після бенчмарків
+
+Змінну середовища застосовують точки входу (main.py, service.py, benchmark.py)
+через distances.enable_from_environment() після імпорту модулів.
+
+Виклики в інших процесах (parallel.py) не враховуються.
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import types
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterator, Optional
+import distances
+from coordinate_systems import (
+    CartesianPoint2D, PolarPoint,
+    CartesianPoint3D, SphericalPoint, CylindricalPoint,
+    CartesianArray2D, PolarArray,
+    CartesianArray3D, SphericalArray, CylindricalArray
+)
+
+
+ENV_VAR = 'COORDINATES_INSTRUMENT'
+
+# Ім'я у звіті -> (власник, атрибут); власник — клас зі статичним методом або модуль
+TARGETS = {
+    'CartesianPoint2D.from_polar': (CartesianPoint2D, 'from_polar'),
+    'PolarPoint.from_cartesian': (PolarPoint, 'from_cartesian'),
+    'CartesianPoint3D.from_spherical': (CartesianPoint3D, 'from_spherical'),
+    'SphericalPoint.from_cartesian': (SphericalPoint, 'from_cartesian'),
+    'CartesianPoint3D.from_cylindrical': (CartesianPoint3D, 'from_cylindrical'),
+    'CylindricalPoint.from_cartesian': (CylindricalPoint, 'from_cartesian'),
+    'CartesianArray2D.from_polar': (CartesianArray2D, 'from_polar'),
+    'PolarArray.from_cartesian': (PolarArray, 'from_cartesian'),
+    'CartesianArray3D.from_spherical': (CartesianArray3D, 'from_spherical'),
+    'SphericalArray.from_cartesian': (SphericalArray, 'from_cartesian'),
+    'CartesianArray3D.from_cylindrical': (CartesianArray3D, 'from_cylindrical'),
+    'CylindricalArray.from_cartesian': (CylindricalArray, 'from_cartesian'),
+}
+TARGETS.update({name: (distances, name) for name in vars(distances)
+                if name.startswith('distance_') and callable(getattr(distances, name))})
+
+_ARRAY_TYPES = frozenset((CartesianArray2D, PolarArray, CartesianArray3D, SphericalArray,
+                          CylindricalArray))
+
+_ARRAY_NAMES = frozenset(t.__name__ for t in _ARRAY_TYPES)
+
+# Реєстри (модуль, ім'я словника), значення яких — функції з TARGETS або кортежі з ними;
+# _rebind оновлює лише їх і лише в уже завантажених модулях
+DISPATCH_TABLES = (
+    ('distances', 'DISTANCE_KERNELS'),
+    ('coordinate_systems', 'CONVERSIONS'),
+    ('point_io', 'CONVERSIONS'),
+)
+
+
+@dataclass(frozen=True)
+class FunctionStats:
+    """Знімок лічильників однієї функції"""
+    calls: int
+    seconds: float
+    items: int
+    max_batch: int
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.seconds / self.calls if self.calls else 0.0
+
+    @property
+    def mean_batch(self) -> float:
+        return self.items / self.calls if self.calls else 0.0
+
+
+class _Counter:
+    """Лічильники однієї функції: [виклики, наносекунди, точки, макс. пакет] під замком"""
+
+    __slots__ = ('state', 'lock')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.state = [0, 0, 0, 0]
+
+    def reset(self) -> None:
+        with self.lock:
+            self.state[:] = [0, 0, 0, 0]
+
+    def snapshot(self) -> FunctionStats:
+        with self.lock:
+            calls, nanoseconds, items, max_batch = self.state
+        return FunctionStats(calls, nanoseconds / 1e9, items, max_batch)
+
+
+def _wrap(func: Callable, counter: _Counter, batch: bool) -> Callable:
+    """
+    Обгортка з лічильниками; для пакетних функцій розмір пакета — довжина
+    першого колонкового аргументу, для скалярних — 1
+    """
+    clock = time.perf_counter_ns
+    state, lock = counter.state, counter.lock
+    array_types = _ARRAY_TYPES
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = clock() - start
+            items = 1
+            if batch:
+                for arg in args[:2]:
+                    if type(arg) in array_types:
+                        items = len(arg)
+                        break
+            with lock:
+                state[0] += 1
+                state[1] += elapsed
+                state[2] += items
+                if items > state[3]:
+                    state[3] = items
+    return wrapper
+
+
+_counters: Dict[str, _Counter] = {name: _Counter() for name in TARGETS}
+# Оригінал -> обгортка для увімкнених функцій
+_wrappers: Dict[Callable, Callable] = {}
+_lock = threading.Lock()
+
+
+def _swapped(value, mapping: Dict[Callable, Callable]):
+    if isinstance(value, types.FunctionType):
+        return mapping.get(value, value)
+    if isinstance(value, tuple) and any(isinstance(v, types.FunctionType) and v in mapping
+                                        for v in value):
+        return tuple(_swapped(v, mapping) for v in value)
+    return value
+
+
+def _rebind(mapping: Dict[Callable, Callable]) -> None:
+    """Замінює функції з mapping у реєстрах DISPATCH_TABLES (атрибути власників змінює _install)"""
+    for module_name, table_name in DISPATCH_TABLES:
+        module = sys.modules.get(module_name)
+        table = getattr(module, table_name, None)
+        if table is None:
+            continue
+        for key, item in list(table.items()):
+            new = _swapped(item, mapping)
+            if new is not item:
+                table[key] = new
+
+
+def _current(owner, attribute: str) -> Callable:
+    value = vars(owner)[attribute]
+    return value.__func__ if isinstance(value, staticmethod) else value
+
+
+def _install(owner, attribute: str, func: Callable) -> None:
+    setattr(owner, attribute, staticmethod(func) if isinstance(owner, type) else func)
+
+
+# Еталонні функції TARGETS, зняті під час імпорту цього модуля. Усі підміни
+# (інструментування, backends, conversion_cache) йдуть через _install звідси,
+# тож тут завжди оригінали, а не обгортки чи диспетчери
+_ORIGINALS: Dict[str, Callable] = {name: _current(owner, attribute)
+                                   for name, (owner, attribute) in TARGETS.items()}
+
+
+def enable_instrumentation() -> None:
+    """Підміняє всі функції з TARGETS обгортками з лічильниками (повторний виклик нічого не робить)"""
+    with _lock:
+        if _wrappers:
+            return
+        for name, (owner, attribute) in TARGETS.items():
+            original = _current(owner, attribute)
+            batch = name.endswith('_batch') or name.split('.')[0] in _ARRAY_NAMES
+            wrapper = _wrap(original, _counters[name], batch)
+            _install(owner, attribute, wrapper)
+            _wrappers[original] = wrapper
+        _rebind(_wrappers)
+
+
+def disable_instrumentation() -> None:
+    """Повертає оригінальні функції; лічильники зберігаються до reset_instrumentation()"""
+    with _lock:
+        if not _wrappers:
+            return
+        originals = {wrapper: original for original, wrapper in _wrappers.items()}
+        for owner, attribute in TARGETS.values():
+            current = _current(owner, attribute)
+            if current in originals:
+                _install(owner, attribute, originals[current])
+        _rebind(originals)
+        _wrappers.clear()
+
+
+def is_enabled() -> bool:
+    return bool(_wrappers)
+
+
+def reset_instrumentation() -> None:
+    """Обнуляє всі лічильники"""
+    for counter in _counters.values():
+        counter.reset()
+
+
+def instrumentation_stats(include_idle: bool = False) -> Dict[str, FunctionStats]:
+    """Лічильники функцій (без жодного виклику — лише з include_idle)"""
+    stats = {name: counter.snapshot() for name, counter in _counters.items()}
+    return {name: s for name, s in stats.items() if s.calls or include_idle}
+
+
+@contextmanager
+def instrumented(reset: bool = True) -> Iterator[None]:
+    """Інструментування на час блоку with (з обнуленням лічильників на вході)"""
+    if reset:
+        reset_instrumentation()
+    enable_instrumentation()
+    try:
+        yield
+    finally:
+        disable_instrumentation()
+
+
+def format_report(stats: Optional[Dict[str, FunctionStats]] = None) -> str:
+    """Текстова таблиця, відсортована за сумарним часом"""
+    stats = instrumentation_stats() if stats is None else stats
+    if not stats:
+        return "Інструментування: викликів не зафіксовано"
+    lines = [f"{'Функція':<36} {'виклики':>10} {'час, с':>10} {'мкс/виклик':>11} "
+             f"{'точок':>12} {'сер. пакет':>11} {'макс. пакет':>12}"]
+    for name, s in sorted(stats.items(), key=lambda item: -item[1].seconds):
+        lines.append(f"{name:<36} {s.calls:>10,} {s.seconds:>10.4f} {s.mean_seconds * 1e6:>11.2f} "
+                     f"{s.items:>12,} {s.mean_batch:>11.1f} {s.max_batch:>12,}")
+    return "\n".join(lines)
+
+
+def to_json(stats: Optional[Dict[str, FunctionStats]] = None) -> str:
+    """Лічильники у JSON: ім'я -> {calls, seconds, items, max_batch}"""
+    stats = instrumentation_stats() if stats is None else stats
+    return json.dumps({name: asdict(s) for name, s in stats.items()}, indent=2, ensure_ascii=False)
+
+
+def _write_json(path: str) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(to_json())
+
+
+def enable_from_environment() -> bool:
+    """
+    Вмикає інструментування, якщо задано змінну COORDINATES_INSTRUMENT:
+    шлях *.json — записати JSON при виході, інше непорожнє значення (крім 0) —
+    надрукувати текстовий звіт у stderr при виході
+    """
+    value = os.environ.get(ENV_VAR, '').strip()
+    if value in ('', '0'):
+        return False
+    enable_instrumentation()
+    if value.lower().endswith('.json'):
+        atexit.register(_write_json, value)
+    else:
+        atexit.register(lambda: print(format_report(), file=sys.stderr))
+    return True
@@ -0,0 +1,147 @@
+"""
+Генератор навантаження для service.py: перцентилі затримки та пропускна здатність
+
+Без адреси сервісу запускає його в цьому ж процесі на вільному порту
+(клієнти та сервер тоді ділять один цикл подій і одне ядро):
+  python3 load_generator.py --requests 20000 --concurrency 256 --window-ms 2
+Проти окремо запущеного сервісу:
+  python3 service.py --port 8765 &
+  python3 load_generator.py --port 8765
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import sys
+import time
+from typing import List, Optional, Sequence
+from service import DistanceService, ServiceClient, DEFAULT_HOST, DEFAULT_MAX_BATCH, DEFAULT_WINDOW
+from coordinate_systems import CONVERSIONS
+from distances import DISTANCE_KERNELS
+
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def _random_point(rng: random.Random, array_type) -> List[float]:
+    """Випадкові координати у порядку полів колонкового типу"""
+    ranges = {
+        'x': (-1000, 1000), 'y': (-1000, 1000), 'z': (-1000, 1000),
+        'radius': (1, 1000), 'angle': (-math.pi, math.pi),
+        'azimuth': (-math.pi, math.pi), 'polar_angle': (0, math.pi),
+    }
+    return [rng.uniform(*ranges[name]) for name in array_type.field_names()]
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Перцентиль q (0..100) відсортованого списку (найближчий ранг)"""
+    index = max(0, math.ceil(q / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+async def run_load(requests: int, concurrency: int, connections: int, operation: str,
+                   host: str = DEFAULT_HOST, port: int = 0, path: Optional[str] = None,
+                   seed: int = 42) -> dict:
+    """
+    concurrency співпрограм по черзі надсилають запити через connections з'єднань,
+    поки не буде виконано requests запитів; повертає затримки та пропускну здатність
+    """
+    if operation in DISTANCE_KERNELS:
+        array_type = DISTANCE_KERNELS[operation][0]
+    elif operation in CONVERSIONS:
+        array_type = CONVERSIONS[operation][0]
+    else:
+        raise ValueError(f"Невідома операція: {operation!r}; доступні: "
+                         f"{sorted(DISTANCE_KERNELS) + sorted(CONVERSIONS)}")
+
+    clients = [await ServiceClient.connect(host, port, path) for _ in range(connections)]
+    latencies: List[float] = []
+    remaining = iter(range(requests))
+
+    async def worker(index: int) -> None:
+        rng = random.Random(seed + index)
+        client = clients[index % connections]
+        for _ in remaining:
+            a = _random_point(rng, array_type)
+            start = time.perf_counter()
+            if operation in DISTANCE_KERNELS:
+                await client.distance(operation, a, _random_point(rng, array_type))
+            else:
+                await client.convert(operation, a)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    finally:
+        elapsed = time.perf_counter() - start
+        for client in clients:
+            await client.close()
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'seconds': elapsed,
+        'throughput': len(latencies) / elapsed,
+        'latency': {q: percentile(latencies, q) for q in PERCENTILES},
+        'max_latency': latencies[-1],
+    }
+
+
+async def _run(args) -> dict:
+    if args.port is None and args.unix is None:
+        async with DistanceService(args.window_ms / 1000, args.max_batch) as service:
+            await service.start(args.host, 0)
+            host, port = service.address[:2]
+            results = await run_load(args.requests, args.concurrency, args.connections,
+                                     args.operation, host, port)
+            results['server'] = service.stats()
+            return results
+    return await run_load(args.requests, args.concurrency, args.connections, args.operation,
+                          args.host, args.port or 0, args.unix)
+
+
+def print_report(results: dict) -> None:
+    print(f"\n  Запитів:              {results['requests']:,}")
+    print(f"  Час:                  {results['seconds']:.3f} с")
+    print(f"  Пропускна здатність:  {results['throughput']:,.0f} запитів/с")
+    print("  Затримка:")
+    for q, value in results['latency'].items():
+        print(f"    p{q:<6} {value * 1e3:>9.3f} мс")
+    print(f"    max     {results['max_latency'] * 1e3:>9.3f} мс")
+    if 'server' in results:
+        server = results['server']
+        print(f"  Пакетів на сервері:   {server['batches']:,} "
+              f"(у середньому {server['mean_batch']:.1f} запитів)")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Навантаження на service.py")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, help="порт запущеного сервісу")
+    parser.add_argument('--unix', metavar='PATH', help="Unix-сокет запущеного сервісу")
+    parser.add_argument('--operation', default='spherical_arc',
+                        help="метрика або перетворення, наприклад polar_to_cartesian")
+    parser.add_argument('--requests', type=int, default=20_000)
+    parser.add_argument('--concurrency', type=int, default=256,
+                        help="кількість одночасних запитів")
+    parser.add_argument('--connections', type=int, default=8)
+    parser.add_argument('--window-ms', type=float, default=DEFAULT_WINDOW * 1000,
+                        help="вікно пакетування для вбудованого сервісу")
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH)
+    args = parser.parse_args(argv)
+
+    if args.concurrency < 1 or args.connections < 1:
+        parser.error("concurrency та connections мають бути додатними")
+    where = (f"{args.unix}" if args.unix else
+             f"{args.host}:{args.port}" if args.port else
+             f"вбудований сервіс, вікно {args.window_ms} мс")
+    print(f"Навантаження: {args.operation}, {args.concurrency} одночасних запитів, "
+          f"{args.connections} з'єднань ({where})")
+    print_report(asyncio.run(_run(args)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
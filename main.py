@@ -3,13 +3,26 @@
 Лабораторна робота №1: Програмні моделі систем координат
 """
 
+import argparse
 import sys
-from test_conversions import (
-    test_2d_conversions,
-    test_3d_conversions,
-    test_distance_equivalence
-)
-from benchmark import benchmark_2d, benchmark_3d
+from typing import Iterable, List, Optional, Sequence
+
+# Важкі модулі (тести, бенчмарки, перетворення) імпортуються лише тією
+# командою, якій вони потрібні: разовий виклик convert/distance не платить
+# за завантаження тестів, бенчмарків і multiprocessing
+
+# Метрика -> система координат, у якій її рахує пакетне ядро
+METRIC_SYSTEMS = {
+    'cartesian_2d': 'cartesian_2d',
+    'polar_2d': 'polar',
+    'cartesian_3d': 'cartesian_3d',
+    'spherical_chord': 'spherical',
+    'spherical_arc': 'spherical',
+}
+
+SYSTEM_NAMES = ('cartesian_2d', 'polar', 'cartesian_3d', 'spherical', 'cylindrical')
+
+FORMATS = ('csv', 'binary')
 
 
 def print_menu():
@@ -27,10 +40,63 @@ def print_menu():
 
 def run_tests():
     """Запуск всіх тестів коректності"""
+    from test_conversions import (
+        test_2d_conversions,
+        test_3d_conversions,
+        test_distance_equivalence,
+        test_batch_conversions,
+        test_batch_distances,
+        test_distance_matrix,
+        test_prepared_points,
+        test_compact_points,
+        test_conversion_cache,
+        test_streaming_aggregates,
+        test_fused_conversions,
+        test_parallel_engine,
+        test_streaming_io,
+        test_point_store,
+        test_buffer_interop,
+        test_data_generator,
+        test_instrumentation,
+        test_backends,
+        test_batch_cli,
+        test_storage_precision
+    )
+    from test_spatial_index import (
+        test_kdtree_matches_brute_force,
+        test_spherical_index_matches_brute_force,
+        test_spatial_join_matches_brute_force
+    )
+    from test_service import test_service_matches_direct_calls
+    from test_geodetic import test_geodetic_conversions, test_geodesic_distance
+
     print("\nЗАПУСК ТЕСТІВ КОРЕКТНОСТІ\n")
     test_2d_conversions()
     test_3d_conversions()
     test_distance_equivalence()
+    test_batch_conversions()
+    test_batch_distances()
+    test_distance_matrix()
+    test_prepared_points()
+    test_compact_points()
+    test_conversion_cache()
+    test_streaming_aggregates()
+    test_fused_conversions()
+    test_parallel_engine()
+    test_streaming_io()
+    test_point_store()
+    test_buffer_interop()
+    test_data_generator()
+    test_instrumentation()
+    test_backends()
+    test_batch_cli()
+    test_storage_precision()
+    test_kdtree_matches_brute_force()
+    test_spherical_index_matches_brute_force()
+    test_spatial_join_matches_brute_force()
+    test_service_matches_direct_calls()
+    test_geodetic_conversions()
+    test_geodesic_distance()
     print("\n" + "=" * 70)
     print("ТЕСТУВАННЯ ЗАВЕРШЕНО")
     print("=" * 70)
@@ -38,6 +104,8 @@ def run_tests():
 
 def run_benchmarks():
     """Запуск бенчмарків продуктивності"""
+    from benchmark import benchmark_2d, benchmark_3d
+
     print("\nЗАПУСК БЕНЧМАРКІВ ПРОДУКТИВНОСТІ\n")
     results_2d = benchmark_2d(100_000)
     results_3d = benchmark_3d(100_000)
@@ -61,6 +129,24 @@ def run_benchmarks():
     print("=" * 70)
 
 
+def run_instrumented_benchmarks(report: bool = True, json_path: Optional[str] = None):
+    """Бенчмарки з інструментуванням перетворень і відстаней"""
+    from instrumentation import format_report, instrumented, to_json
+
+    with instrumented():
+        run_benchmarks()
+
+    if report:
+        print("\n" + "=" * 70)
+        print("ІНСТРУМЕНТУВАННЯ: ВИКЛИКИ, ЧАС ТА РОЗМІРИ ПАКЕТІВ")
+        print("=" * 70)
+        print(format_report())
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            f.write(to_json())
+        print(f"\nЛічильники записано у {json_path}")
+
+
 def run_all():
     """Запуск всього: тести + бенчмарки"""
     run_tests()
@@ -90,26 +176,206 @@ def interactive_mode():
             input("\nНатисніть Enter для продовження...")
 
 
-def main():
+def _stream(path: str, mode: str):
+    """'-' означає стандартний потік (текстовий для CSV, байтовий для binary)"""
+    if path != '-':
+        return path
+    stream = sys.stdin if 'r' in mode else sys.stdout
+    return stream.buffer if 'b' in mode else stream
+
+
+def _parse_point(text: str, width: int) -> List[float]:
+    values = [float(value) for value in text.split(',')]
+    if len(values) != width:
+        raise ValueError(f"Очікується {width} координат через кому, отримано {len(values)}")
+    return values
+
+
+def run_convert(args) -> int:
+    """Потокове перетворення набору точок між системами координат"""
+    import point_io
+
+    source = _stream(args.input, 'rb' if args.input_format == 'binary' else 'r')
+    target = _stream(args.output, 'wb' if args.output_format == 'binary' else 'w')
+    chunks = point_io.iter_chunks(source, args.source_system, args.input_format, args.chunk_size)
+    converted = point_io.convert_stream(chunks, args.target_system)
+    if args.output_format == 'csv':
+        point_io.write_csv_chunks(target, converted, header=not args.no_header)
+    else:
+        point_io.write_binary_chunks(target, converted)
+    return 0
+
+
+def _distance_chunks(args) -> Iterable:
+    """Фрагменти відстаней для записів вхідного потоку"""
+    import point_io
+    from array import array
+    from distances import DISTANCE_KERNELS
+
+    _, batch = DISTANCE_KERNELS[args.metric]
+    options = {'haversine': True} if args.haversine else {}
+    metric_system = METRIC_SYSTEMS[args.metric]
+    system = args.system or metric_system
+    array_type = point_io.SYSTEMS[system]
+    width = len(array_type.field_names())
+    source = _stream(args.input, 'rb' if args.input_format == 'binary' else 'r')
+
+    if args.reference is None:
+        # Кожен запис — пара точок: 2 * width координат
+        for columns in point_io.iter_columns(source, 2 * width, args.input_format, args.chunk_size):
+            points_a = point_io.convert_points(array_type(*columns[:width]), metric_system)
+            points_b = point_io.convert_points(array_type(*columns[width:]), metric_system)
+            yield batch(points_a, points_b, **options)
+        return
+
+    # Кожен запис — одна точка, відстань рахується до --reference
+    reference = array_type(*([value] for value in _parse_point(args.reference, width)))
+    reference = point_io.convert_points(reference, metric_system)
+    reference_values = [getattr(reference, name)[0] for name in reference.field_names()]
+    for chunk in point_io.iter_chunks(source, system, args.input_format, args.chunk_size):
+        points = point_io.convert_points(chunk, metric_system)
+        n = len(points)
+        others = type(points)(*(array('d', [value]) * n for value in reference_values))
+        yield batch(points, others, **options)
+
+
+def run_distance(args) -> int:
+    """Потоковий розрахунок відстаней: одне значення на вхідний запис"""
+    import point_io
+
+    target = _stream(args.output, 'wb' if args.output_format == 'binary' else 'w')
+    header = None if args.no_header else 'distance'
+    point_io.write_values(target, _distance_chunks(args), args.output_format, header)
+    return 0
+
+
+def run_calibrate(args) -> int:
+    """Калібрування бекендів (або показ збереженого вибору з --show)"""
+    import backends
+
+    path = args.cache or backends.DEFAULT_CACHE_PATH
+    if args.show:
+        calibration = backends.Calibration.load(path)
+    else:
+        print("Калібрування бекендів...", file=sys.stderr)
+        calibration = backends.calibrate()
+        calibration.save(path)
+    print(backends.format_calibration(calibration))
+    print(f"\nФайл вибору: {path}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='main.py',
+        description="Тести, бенчмарки та неінтерактивна пакетна обробка точок. "
+                    "Без аргументів запускає інтерактивне меню.")
+    commands = parser.add_subparsers(dest='command', metavar='КОМАНДА')
+    commands.add_parser('test', aliases=['tests'], help="тести коректності")
+    benchmark = commands.add_parser('benchmark', aliases=['bench'], help="бенчмарки продуктивності")
+    benchmark.add_argument('--instrument', action='store_true',
+                           help="надрукувати виклики, час і розміри пакетів по функціях")
+    benchmark.add_argument('--instrument-json', metavar='PATH',
+                           help="записати лічильники інструментування у JSON")
+    benchmark.add_argument('--sweep', action='store_true',
+                           help="розгортка за розміром набору (10^2..10^8) та кількістю процесів")
+    benchmark.add_argument('--sweep-csv', metavar='PATH',
+                           help="записати результати розгортки у CSV")
+    benchmark.add_argument('--max-n', type=int, default=10**8,
+                           help="найбільший розмір розгортки (за замовчуванням 10^8, якщо вистачає пам'яті)")
+    commands.add_parser('all', help="тести та бенчмарки")
+    calibrate = commands.add_parser(
+        'calibrate', help="вибір найшвидших бекендів відстаней і перетворень")
+    calibrate.add_argument('--cache', metavar='PATH',
+                           help="файл вибору (за замовчуванням ~/.cache/coordinate_systems/backends.json)")
+    calibrate.add_argument('--show', action='store_true',
+                           help="показати збережений вибір без нового заміру")
+
+    def add_io_options(command):
+        command.add_argument('--input', '-i', default='-',
+                             help="вхідний файл ('-' — стандартний вхід, за замовчуванням)")
+        command.add_argument('--output', '-o', default='-',
+                             help="вихідний файл ('-' — стандартний вихід, за замовчуванням)")
+        command.add_argument('--input-format', choices=FORMATS, default='csv')
+        command.add_argument('--output-format', choices=FORMATS, default='csv')
+        command.add_argument('--chunk-size', type=int, default=65_536,
+                             help="кількість записів у фрагменті")
+        command.add_argument('--no-header', action='store_true',
+                             help="не писати рядок заголовка у вихідний CSV")
+
+    convert = commands.add_parser('convert', help="перетворення точок між системами координат")
+    convert.add_argument('--from', dest='source_system', choices=SYSTEM_NAMES, required=True)
+    convert.add_argument('--to', dest='target_system', choices=SYSTEM_NAMES, required=True)
+    add_io_options(convert)
+
+    distance = commands.add_parser(
+        'distance', help="відстані для пар точок або до опорної точки")
+    distance.add_argument('--metric', choices=sorted(METRIC_SYSTEMS), required=True)
+    distance.add_argument('--system', choices=SYSTEM_NAMES,
+                          help="система координат вхідних точок (за замовчуванням — метрики)")
+    distance.add_argument('--reference', metavar='C1,C2[,C3]',
+                          help="опорна точка; тоді кожен запис — одна точка, а не пара")
+    distance.add_argument('--haversine', action='store_true',
+                          help="гаверсинусна форма: стійка точність для близьких точок")
+    add_io_options(distance)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
     """Головна функція"""
-    if len(sys.argv) > 1:
-        arg = sys.argv[1].lower()
-        if arg == 'test' or arg == 'tests':
-            run_tests()
-        elif arg == 'bench' or arg == 'benchmark':
-            run_benchmarks()
-        elif arg == 'all':
-            run_all()
+    from distances import HAVERSINE_METRICS, enable_from_environment
+
+    enable_from_environment()
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv:
+        interactive_mode()
+        return 0
+    if argv[0].lower() in ('test', 'tests', 'bench', 'benchmark', 'all'):
+        argv[0] = argv[0].lower()
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command in ('test', 'tests'):
+        run_tests()
+    elif args.command in ('benchmark', 'bench'):
+        if args.sweep or args.sweep_csv:
+            from benchmark import benchmark_scaling, sweep_sizes
+            benchmark_scaling(sweep_sizes(stop=args.max_n), csv_path=args.sweep_csv)
+        elif args.instrument or args.instrument_json:
+            run_instrumented_benchmarks(args.instrument, args.instrument_json)
         else:
-            print(f"Невідома команда: {sys.argv[1]}")
-            print("Використання:")
-            print("  python3 main.py            # Інтерактивний режим")
-            print("  python3 main.py test       # Тільки тести")
-            print("  python3 main.py benchmark  # Тільки бенчмарки")
-            print("  python3 main.py all        # Все разом")
+            run_benchmarks()
+    elif args.command == 'all':
+        run_all()
+    elif args.command == 'calibrate':
+        try:
+            return run_calibrate(args)
+        except (ValueError, OSError) as e:
+            print(f"Помилка: {e}", file=sys.stderr)
+            return 1
+    elif args.command is None:
+        parser.print_help()
+        return 2
     else:
-        interactive_mode()
+        if args.chunk_size < 1:
+            parser.error("--chunk-size має бути додатним")
+        if args.command == 'distance' and args.haversine \
+                and args.metric not in HAVERSINE_METRICS:
+            parser.error(f"Гаверсинусний режим доступний лише для {', '.join(HAVERSINE_METRICS)}")
+        command = run_convert if args.command == 'convert' else run_distance
+        try:
+            return command(args)
+        except BrokenPipeError:
+            # Споживач (наприклад, head) закрив канал — це не помилка;
+            # решту виводу перенаправляємо в нікуди, щоб не впасти при закритті
+            import os
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 0
+        except (ValueError, OSError) as e:
+            print(f"Помилка: {e}", file=sys.stderr)
+            return 1
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+Паралельне виконання пакетних перетворень та обчислень відстаней
+у пулі процесів зі спільною пам'яттю (multiprocessing.shared_memory)
+
+Вхідні колонки копіюються у блок спільної пам'яті один раз, кожен процес
+отримує лише ім'я блоку та межі свого фрагмента, тож жодна точка не
+серіалізується (pickle) окремо.
+"""
+
+import math
+import os
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Optional, Sequence, Tuple
+from coordinate_systems import (
+    CartesianPoint2D, PolarPoint,
+    CartesianPoint3D, SphericalPoint,
+    CartesianArray2D, PolarArray,
+    CartesianArray3D, SphericalArray, CONVERSIONS
+)
+from distances import DISTANCE_KERNELS, _batch_typecode
+
+
+# Менші фрагменти не окуплюють передачу задачі іншому процесу
+MIN_CHUNK_SIZE = 50_000
+# Скільки фрагментів на процес: запас для вирівнювання навантаження
+CHUNKS_PER_WORKER = 4
+
+_POINT_TYPES = {
+    CartesianArray2D: CartesianPoint2D,
+    PolarArray: PolarPoint,
+    CartesianArray3D: CartesianPoint3D,
+    SphericalArray: SphericalPoint,
+}
+
+
+def default_workers() -> int:
+    """Кількість процесів за замовчуванням — усі доступні ядра"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def chunk_size_for(n: int, workers: int, min_chunk: int = MIN_CHUNK_SIZE) -> int:
+    """
+    Евристика розміру фрагмента: близько CHUNKS_PER_WORKER фрагментів на процес,
+    але не менше min_chunk точок, щоб накладні витрати були непомітні
+    """
+    target = math.ceil(n / max(1, workers * CHUNKS_PER_WORKER))
+    return max(1, min(n, max(min_chunk, target)))
+
+
+def parallel_distances(p1, p2, metric: str, workers: Optional[int] = None,
+                       chunk_size: Optional[int] = None) -> array:
+    """
+    Паралельна версія пакетних відстаней з distances.py
+    p1 / p2 — колонки однакової довжини або колонка та одиночна точка
+    Повертає той самий масив (float64 або float32), що й відповідна *_batch функція
+    """
+    try:
+        array_type, kernel = DISTANCE_KERNELS[metric]
+    except KeyError:
+        raise ValueError(f"Невідома метрика: {metric!r}; доступні: {sorted(DISTANCE_KERNELS)}")
+
+    operands = [p for p in (p1, p2) if isinstance(p, array_type)]
+    if not operands:
+        raise TypeError(f"Очікується хоча б один {array_type.__name__}")
+    n = len(operands[0])
+    workers, chunk_size = _plan(n, workers, chunk_size)
+    if workers == 1 or n <= chunk_size:
+        return kernel(p1, p2)
+
+    inputs = [p.columns() if isinstance(p, array_type) else None for p in (p1, p2)]
+    # Одиночна точка передається процесам як кортеж координат
+    points = [None if side is not None else
+              tuple(getattr(p, name) for name in array_type.field_names())
+              for p, side in zip((p1, p2), inputs)]
+    columns = [column for side in inputs if side is not None for column in side]
+
+    with _SharedColumns(columns, n, outputs=1, typecode=_batch_typecode(p1, p2)) as shared:
+        tasks = []
+        for start in range(0, n, chunk_size):
+            stop = min(n, start + chunk_size)
+            tasks.append(('distance', shared.name, shared.typecode, n, metric, points,
+                          start, stop))
+        _run(tasks, workers)
+        return shared.output(0)
+
+
+def parallel_convert(points, conversion: str, workers: Optional[int] = None,
+                     chunk_size: Optional[int] = None):
+    """
+    Паралельна версія колонкових перетворень з coordinate_systems.py
+    conversion — ключ CONVERSIONS, наприклад 'spherical_to_cartesian'
+    """
+    try:
+        source_type, target_type, convert = CONVERSIONS[conversion]
+    except KeyError:
+        raise ValueError(f"Невідоме перетворення: {conversion!r}; доступні: {sorted(CONVERSIONS)}")
+    if not isinstance(points, source_type):
+        raise TypeError(f"Очікується {source_type.__name__}")
+
+    n = len(points)
+    workers, chunk_size = _plan(n, workers, chunk_size)
+    if workers == 1 or n <= chunk_size:
+        return convert(points)
+
+    outputs = len(target_type.field_names())
+    with _SharedColumns(points.columns(), n, outputs=outputs,
+                        typecode=points.typecode()) as shared:
+        tasks = [('convert', shared.name, shared.typecode, n, conversion, None,
+                  start, min(n, start + chunk_size))
+                 for start in range(0, n, chunk_size)]
+        _run(tasks, workers)
+        return target_type(*(shared.output(i) for i in range(outputs)))
+
+
+def _plan(n: int, workers: Optional[int], chunk_size: Optional[int]) -> Tuple[int, int]:
+    workers = default_workers() if workers is None else workers
+    if workers < 1:
+        raise ValueError("workers має бути додатним")
+    chunk_size = chunk_size_for(n, workers) if chunk_size is None else chunk_size
+    if chunk_size < 1:
+        raise ValueError("chunk_size має бути додатним")
+    return workers, chunk_size
+
+
+def _run(tasks: List[tuple], workers: int) -> None:
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                             initializer=_init_worker) as pool:
+        # list() пробрасує винятки з процесів-виконавців
+        list(pool.map(_worker, tasks))
+
+
+class _SharedColumns:
+    """
+    Блок спільної пам'яті: спочатку вхідні колонки, потім вихідні,
+    кожна по n значень float64 ('d') або float32 ('f')
+    """
+
+    def __init__(self, columns: Sequence[Sequence[float]], n: int, outputs: int,
+                 typecode: str = 'd'):
+        self.n = n
+        self.inputs = len(columns)
+        self.typecode = typecode
+        self._item_size = array(typecode).itemsize
+        size = max(1, (self.inputs + outputs) * n * self._item_size)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self.name = self._shm.name
+        view = self._shm.buf.cast(typecode)
+        try:
+            for i, column in enumerate(columns):
+                view[i * n:(i + 1) * n] = _as_typecode(column, typecode)
+        finally:
+            view.release()
+
+    def output(self, index: int) -> array:
+        """Копіює вихідну колонку index у звичайний масив точності блоку"""
+        start = (self.inputs + index) * self.n * self._item_size
+        result = array(self.typecode)
+        result.frombytes(self._shm.buf[start:start + self.n * self._item_size])
+        return result
+
+    def __enter__(self) -> '_SharedColumns':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._shm.close()
+        self._shm.unlink()
+
+
+def _as_typecode(column: Sequence[float], typecode: str):
+    """Колонка у вигляді буфера з кодом типу typecode (без копії, якщо вона вже такою є)"""
+    if isinstance(column, (array, memoryview)) and memoryview(column).format == typecode:
+        return column
+    return array(typecode, column)
+
+
+def _init_worker() -> None:
+    """
+    Процес, запущений через spawn, не успадковує вибраних у батьківському
+    бекендів — застосовуємо COORDINATES_BACKEND заново (після fork модуль
+    backends уже завантажений і вибір діє). Інструментування в пулі не ведеться
+    """
+    selected = os.environ.get('COORDINATES_BACKEND', '').strip() not in ('', '0')
+    if selected and 'backends' not in sys.modules:
+        import backends
+        backends.enable_from_environment()
+
+
+def _worker(task: tuple) -> None:
+    """Підключається до спільної пам'яті та обробляє свій фрагмент"""
+    kind, name, typecode, n, key, points, start, stop = task
+    # Процеси пулу ділять resource_tracker з батьківським, тому блок
+    # видаляє лише власник (_SharedColumns.__exit__)
+    shm = shared_memory.SharedMemory(name=name)
+    view = shm.buf.cast(typecode)
+    failure = None
+    try:
+        if kind == 'distance':
+            _distance_chunk(view, n, key, points, start, stop)
+        else:
+            _convert_chunk(view, n, key, start, stop)
+    except Exception as error:
+        # Кадри трасування тримають зрізи спільної пам'яті і не дають її закрити
+        failure = error.with_traceback(None)
+    view.release()
+    shm.close()
+    if failure is not None:
+        raise failure
+
+
+def _distance_chunk(view: memoryview, n: int, metric: str, points, start: int, stop: int):
+    """Відстані для фрагмента [start, stop); колонки читаються без копіювання"""
+    array_type, kernel = DISTANCE_KERNELS[metric]
+    width = len(array_type.field_names())
+    operands, next_column = [], 0
+    for values in points:
+        if values is None:
+            operands.append(array_type(*(view[(next_column + j) * n + start:
+                                              (next_column + j) * n + stop]
+                                         for j in range(width))))
+            next_column += width
+        else:
+            operands.append(_POINT_TYPES[array_type](*values))
+    offset = next_column * n
+    # Результат пишеться прямо у вихідну колонку спільної пам'яті
+    kernel(*operands, out=view[offset + start:offset + stop])
+
+
+def _convert_chunk(view: memoryview, n: int, conversion: str, start: int, stop: int):
+    """Перетворення фрагмента [start, stop); результат пишеться у вихідні колонки"""
+    source_type, target_type, convert = CONVERSIONS[conversion]
+    width = len(source_type.field_names())
+    source = source_type(*(view[j * n + start:j * n + stop] for j in range(width)))
+    for j, values in enumerate(convert(source).columns()):
+        offset = (width + j) * n
+        view[offset + start:offset + stop] = values
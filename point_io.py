@@ -0,0 +1,263 @@
+"""
+Потокове читання та запис наборів точок фрагментами фіксованого розміру
+
+Підтримувані формати:
+  csv    — текстові рядки з координатами у порядку полів класу точки
+           (необов'язковий рядок заголовка з іменами полів)
+  binary — суцільні записи float64 little-endian, координати кожної точки
+           йдуть поспіль (x, y, x, y, ...)
+
+Файли обробляються фрагментами по chunk_size точок, тому пам'ять не
+залежить від розміру файлу.
+"""
+
+import csv
+import os
+import sys
+from array import array
+from contextlib import contextmanager
+from typing import IO, Iterable, Iterator, List, Optional, Sequence, Union
+from coordinate_systems import (
+    CartesianArray2D, PolarArray,
+    CartesianArray3D, SphericalArray, CylindricalArray
+)
+
+
+# Назва системи координат -> колонковий тип
+SYSTEMS = {
+    'cartesian_2d': CartesianArray2D,
+    'polar': PolarArray,
+    'cartesian_3d': CartesianArray3D,
+    'spherical': SphericalArray,
+    'cylindrical': CylindricalArray,
+}
+
+# (звідки, куди) -> колонкове перетворення
+CONVERSIONS = {
+    ('polar', 'cartesian_2d'): CartesianArray2D.from_polar,
+    ('cartesian_2d', 'polar'): PolarArray.from_cartesian,
+    ('spherical', 'cartesian_3d'): CartesianArray3D.from_spherical,
+    ('cartesian_3d', 'spherical'): SphericalArray.from_cartesian,
+    ('cylindrical', 'cartesian_3d'): CartesianArray3D.from_cylindrical,
+    ('cartesian_3d', 'cylindrical'): CylindricalArray.from_cartesian,
+}
+
+FORMATS = ('csv', 'binary')
+
+DEFAULT_CHUNK_SIZE = 65_536
+
+_ITEM_SIZE = array('d').itemsize
+
+FileLike = Union[str, os.PathLike, IO]
+
+
+def system_of(points) -> str:
+    """Назва системи координат для колонкового набору"""
+    for name, array_type in SYSTEMS.items():
+        if isinstance(points, array_type):
+            return name
+    raise TypeError(f"Невідомий тип набору точок: {type(points).__name__}")
+
+
+def convert_points(points, target: str):
+    """Перетворює колонковий набір у систему target (або повертає як є)"""
+    source = system_of(points)
+    if source == target:
+        return points
+    if (source, target) in CONVERSIONS:
+        return CONVERSIONS[(source, target)](points)
+    # Багатокрокові перетворення — злитим ядром з реєстру
+    from conversion_registry import compile_conversion
+    return compile_conversion(source, target).batch(points)
+
+
+@contextmanager
+def _opened(target: FileLike, mode: str):
+    """Відкриває шлях або використовує вже відкритий файловий об'єкт"""
+    if isinstance(target, (str, os.PathLike)):
+        newline = '' if 'b' not in mode else None
+        with open(target, mode, newline=newline) as f:
+            yield f
+    else:
+        yield target
+
+
+def _array_type(system: str):
+    try:
+        return SYSTEMS[system]
+    except KeyError:
+        raise ValueError(f"Невідома система координат: {system!r}; доступні: {sorted(SYSTEMS)}")
+
+
+def iter_csv_columns(source: FileLike, width: int,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[array]]:
+    """
+    Генерує фрагменти CSV-файлу як списки з width колонок float64
+    Перший рядок, що не розбирається як числа, вважається заголовком і пропускається
+    """
+    with _opened(source, 'r') as f:
+        columns = [array('d') for _ in range(width)]
+        for line_number, row in enumerate(csv.reader(f), 1):
+            if not row:
+                continue
+            if len(row) != width:
+                raise ValueError(f"Рядок {line_number}: очікується {width} значень, отримано {len(row)}")
+            try:
+                values = [float(value) for value in row]
+            except ValueError:
+                if line_number == 1:
+                    continue  # заголовок
+                raise
+            for column, value in zip(columns, values):
+                column.append(value)
+            if len(columns[0]) == chunk_size:
+                yield columns
+                columns = [array('d') for _ in range(width)]
+        if columns[0]:
+            yield columns
+
+
+def iter_binary_columns(source: FileLike, width: int,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[array]]:
+    """Генерує фрагменти бінарного файлу записів по width значень float64"""
+    record_size = width * _ITEM_SIZE
+    with _opened(source, 'rb') as f:
+        while True:
+            data = f.read(chunk_size * record_size)
+            if not data:
+                break
+            if len(data) % record_size:
+                raise ValueError("Файл обрізано посеред запису точки")
+            values = array('d')
+            values.frombytes(data)
+            if sys.byteorder != 'little':
+                values.byteswap()
+            yield [values[i::width] for i in range(width)]
+
+
+def iter_columns(source: FileLike, width: int, fmt: str = 'csv',
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[array]]:
+    """
+    Генерує фрагменти записів по width чисел як списки колонок
+    Підходить для записів, що не є однією точкою (наприклад, пари точок)
+    """
+    if fmt == 'csv':
+        return iter_csv_columns(source, width, chunk_size)
+    if fmt == 'binary':
+        return iter_binary_columns(source, width, chunk_size)
+    raise ValueError(f"Невідомий формат: {fmt!r}; доступні: {FORMATS}")
+
+
+def iter_csv_chunks(source: FileLike, system: str,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator:
+    """
+    Генерує колонкові фрагменти з CSV-файлу
+    Рядок заголовка (з іменами полів) розпізнається та пропускається автоматично
+    """
+    array_type = _array_type(system)
+    for columns in iter_csv_columns(source, len(array_type.field_names()), chunk_size):
+        yield array_type(*columns)
+
+
+def iter_binary_chunks(source: FileLike, system: str,
+                       chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator:
+    """Генерує колонкові фрагменти з бінарного файлу записів float64"""
+    array_type = _array_type(system)
+    for columns in iter_binary_columns(source, len(array_type.field_names()), chunk_size):
+        yield array_type(*columns)
+
+
+def iter_chunks(source: FileLike, system: str, fmt: str = 'csv',
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator:
+    """Генерує колонкові фрагменти з файлу формату fmt ('csv' або 'binary')"""
+    if fmt == 'csv':
+        return iter_csv_chunks(source, system, chunk_size)
+    if fmt == 'binary':
+        return iter_binary_chunks(source, system, chunk_size)
+    raise ValueError(f"Невідомий формат: {fmt!r}; доступні: {FORMATS}")
+
+
+def write_csv_chunks(target: FileLike, chunks: Iterable, header: bool = True) -> int:
+    """Записує фрагменти у CSV; повертає кількість записаних точок"""
+    count = 0
+    with _opened(target, 'w') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        for chunk in chunks:
+            if header:
+                writer.writerow(chunk.field_names())
+                header = False
+            # repr(float) відновлює те саме число при читанні
+            writer.writerows(zip(*(map(repr, column) for column in chunk.columns())))
+            count += len(chunk)
+    return count
+
+
+def write_binary_chunks(target: FileLike, chunks: Iterable) -> int:
+    """Записує фрагменти у бінарний формат; повертає кількість записаних точок"""
+    count = 0
+    with _opened(target, 'wb') as f:
+        for chunk in chunks:
+            columns = chunk.columns()
+            width = len(columns)
+            records = array('d', bytes(len(chunk) * width * _ITEM_SIZE))
+            for i, column in enumerate(columns):
+                # Формат файлу — завжди float64, колонки float32 розширюються без втрат
+                records[i::width] = (column if isinstance(column, array) and column.typecode == 'd'
+                                     else array('d', column))
+            if sys.byteorder != 'little':
+                records.byteswap()
+            f.write(records.tobytes())
+            count += len(chunk)
+    return count
+
+
+def write_values(target: FileLike, chunks: Iterable[Sequence[float]], fmt: str = 'csv',
+                 header: Optional[str] = None) -> int:
+    """
+    Записує потік фрагментів чисел (наприклад, відстаней) по одному на запис:
+    рядки CSV (з необов'язковим заголовком) або float64 little-endian;
+    повертає кількість записаних значень
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Невідомий формат: {fmt!r}; доступні: {FORMATS}")
+    count = 0
+    with _opened(target, 'w' if fmt == 'csv' else 'wb') as f:
+        if fmt == 'csv' and header is not None:
+            f.write(header + '\n')
+        for chunk in chunks:
+            if fmt == 'csv':
+                f.write(''.join([repr(value) + '\n' for value in chunk]))
+            else:
+                values = chunk if isinstance(chunk, array) and chunk.typecode == 'd' else array('d', chunk)
+                if sys.byteorder != 'little':
+                    values = array('d', values)
+                    values.byteswap()
+                f.write(values.tobytes())
+            count += len(chunk)
+    return count
+
+
+def write_chunks(target: FileLike, chunks: Iterable, fmt: str = 'csv') -> int:
+    """Записує фрагменти у файл формату fmt ('csv' або 'binary')"""
+    if fmt == 'csv':
+        return write_csv_chunks(target, chunks)
+    if fmt == 'binary':
+        return write_binary_chunks(target, chunks)
+    raise ValueError(f"Невідомий формат: {fmt!r}; доступні: {FORMATS}")
+
+
+def convert_stream(chunks: Iterable, target: str) -> Iterator:
+    """Перетворює кожен фрагмент потоку у систему target"""
+    for chunk in chunks:
+        yield convert_points(chunk, target)
+
+
+def convert_file(source: FileLike, target: FileLike, source_system: str, target_system: str,
+                 source_format: str = 'csv', target_format: str = 'csv',
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Потоково перетворює файл точок з однієї системи координат в іншу
+    У пам'яті одночасно знаходиться лише один фрагмент; повертає кількість точок
+    """
+    chunks = iter_chunks(source, source_system, source_format, chunk_size)
+    return write_chunks(target, convert_stream(chunks, target_system), target_format)
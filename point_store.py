@@ -0,0 +1,198 @@
+"""
+Компактний бінарний формат зберігання наборів точок з відображенням у пам'ять
+
+Структура файлу (little-endian):
+  заголовок 64 байти:
+    8 байт   сигнатура b'PTSTORE\\0'
+    u16      версія формату
+    u8       код системи координат (див. SYSTEM_CODES)
+    u8       тип значень: ord('d') — float64, ord('f') — float32
+    u8       кількість колонок
+    3 байти  вирівнювання
+    u64      кількість точок
+    ...      нулі до 64 байт
+  далі колонки одна за одною (structure-of-arrays), кожна — count значень
+
+Читання через mmap не копіює дані: колонки набору точок є memoryview
+над відображеним файлом, тож файл відкривається миттєво, а кілька процесів
+ділять ті самі сторінки пам'яті. Такі набори напряму приймаються
+пакетними функціями distances.py, parallel.py та перетвореннями.
+"""
+
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Iterable, Optional
+from coordinate_systems import (
+    CartesianArray2D, PolarArray,
+    CartesianArray3D, SphericalArray
+)
+
+
+MAGIC = b'PTSTORE\0'
+VERSION = 1
+HEADER_SIZE = 64
+
+_HEADER = struct.Struct('<8sHBBB3xQ')
+
+# Код системи координат у заголовку -> (назва, колонковий тип)
+SYSTEM_CODES = {
+    1: ('cartesian_2d', CartesianArray2D),
+    2: ('polar', PolarArray),
+    3: ('cartesian_3d', CartesianArray3D),
+    4: ('spherical', SphericalArray),
+}
+
+_CODE_OF_TYPE = {array_type: code for code, (_, array_type) in SYSTEM_CODES.items()}
+
+
+def _header(array_type, count: int, typecode: str = 'd') -> bytes:
+    code = _CODE_OF_TYPE[array_type]
+    width = len(array_type.field_names())
+    header = _HEADER.pack(MAGIC, VERSION, code, ord(typecode), width, count)
+    return header.ljust(HEADER_SIZE, b'\0')
+
+
+def _column_bytes(column, typecode: str = 'd') -> bytes:
+    """Колонка у вигляді байтів little-endian"""
+    if isinstance(column, memoryview) and column.format == typecode and sys.byteorder == 'little':
+        return column.tobytes()
+    values = column if isinstance(column, array) and column.typecode == typecode else array(typecode, column)
+    if sys.byteorder != 'little':
+        values = array(typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def write_store(path: str, points) -> int:
+    """Записує колонковий набір точок у файл; повертає кількість точок"""
+    array_type = type(points)
+    if array_type not in _CODE_OF_TYPE:
+        raise TypeError(f"Невідомий тип набору точок: {array_type.__name__}")
+    typecode = points.typecode()
+    with open(path, 'wb') as f:
+        f.write(_header(array_type, len(points), typecode))
+        for column in points.columns():
+            f.write(_column_bytes(column, typecode))
+    return len(points)
+
+
+def write_store_chunks(path: str, chunks: Iterable) -> int:
+    """
+    Записує потік фрагментів (наприклад, з point_io.iter_chunks) у файл
+    Кожна колонка спершу накопичується у тимчасовому файлі, тому пам'ять
+    не залежить від кількості точок; точність файлу визначає перший
+    фрагмент; повертає кількість точок
+    """
+    array_type, typecode, count, spools = None, 'd', 0, []
+    try:
+        for chunk in chunks:
+            if array_type is None:
+                array_type = type(chunk)
+                if array_type not in _CODE_OF_TYPE:
+                    raise TypeError(f"Невідомий тип набору точок: {array_type.__name__}")
+                typecode = chunk.typecode()
+                spools = [tempfile.TemporaryFile() for _ in array_type.field_names()]
+            elif type(chunk) is not array_type:
+                raise TypeError("Усі фрагменти мають бути одного типу")
+            for spool, column in zip(spools, chunk.columns()):
+                spool.write(_column_bytes(column, typecode))
+            count += len(chunk)
+        if array_type is None:
+            raise ValueError("Порожній потік: невідома система координат")
+
+        with open(path, 'wb') as f:
+            f.write(_header(array_type, count, typecode))
+            for spool in spools:
+                spool.seek(0)
+                shutil.copyfileobj(spool, f)
+    finally:
+        for spool in spools:
+            spool.close()
+    return count
+
+
+class PointStore:
+    """
+    Відкритий файл точок, відображений у пам'ять (лише для читання)
+
+    store.points — колонковий набір (CartesianArray2D, PolarArray, ...),
+    колонки якого є memoryview над файлом без копіювання.
+    Перед close() треба звільнити всі похідні view (зрізи, ітератори).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+            if len(header) < HEADER_SIZE:
+                raise ValueError(f"{path}: файл закороткий для заголовка")
+            magic, version, code, typecode, width, count = _HEADER.unpack_from(header)
+            if magic != MAGIC:
+                raise ValueError(f"{path}: це не файл точок (сигнатура {magic!r})")
+            if version != VERSION:
+                raise ValueError(f"{path}: непідтримувана версія формату {version}")
+            if code not in SYSTEM_CODES:
+                raise ValueError(f"{path}: невідомий код системи координат {code}")
+            self.system, array_type = SYSTEM_CODES[code]
+            self.typecode = chr(typecode)
+            self.count = count
+            if width != len(array_type.field_names()):
+                raise ValueError(f"{path}: {width} колонок не відповідає {self.system}")
+
+            itemsize = array(self.typecode).itemsize
+            expected = HEADER_SIZE + width * count * itemsize
+            size = os.fstat(f.fileno()).st_size
+            if size < expected:
+                raise ValueError(f"{path}: файл обрізано ({size} < {expected} байт)")
+            self._mmap: Optional[mmap.mmap] = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if count else None)
+
+        self._views = []
+        columns = []
+        for i in range(width):
+            start = HEADER_SIZE + i * count * itemsize
+            if self._mmap is None:
+                columns.append(array(self.typecode))
+            elif sys.byteorder == 'little':
+                view = memoryview(self._mmap)[start:start + count * itemsize].cast(self.typecode)
+                self._views.append(view)
+                columns.append(view)
+            else:
+                # На big-endian без копії не обійтися
+                values = array(self.typecode)
+                values.frombytes(self._mmap[start:start + count * itemsize])
+                values.byteswap()
+                columns.append(values)
+        self.points = array_type(*columns)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __repr__(self) -> str:
+        return f"PointStore({self.path!r}, system={self.system}, n={self.count})"
+
+    def close(self) -> None:
+        """Звільняє view та закриває відображення файлу"""
+        self.points = None
+        for view in self._views:
+            view.release()
+        self._views = []
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> 'PointStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def open_store(path: str) -> PointStore:
+    """Відкриває файл точок через mmap без читання даних у пам'ять"""
+    return PointStore(path)
@@ -0,0 +1,356 @@
+"""
+Локальний сервіс перетворень та відстаней з мікропакетуванням (asyncio)
+
+Протокол — рядки JSON через TCP на localhost або Unix-сокет, один запит
+на рядок, відповіді приходять у довільному порядку з тим самим id:
+  {"id": 1, "op": "distance", "metric": "spherical_arc", "a": [ρ, θ, φ], "b": [ρ, θ, φ]}
+  {"id": 2, "op": "distance", "metric": "polar_2d", "a": [r, θ], "b": [r, θ],
+   "haversine": true}
+  {"id": 3, "op": "convert", "conversion": "polar_to_cartesian", "point": [r, θ]}
+  ->
+  {"id": 1, "result": 12.5}
+  {"id": 3, "result": [x, y]}
+  {"id": 4, "error": "..."}
+
+Метрики та перетворення — ключі distances.DISTANCE_KERNELS та coordinate_systems.CONVERSIONS.
+Одиночні запити з однаковою метрикою (перетворенням), що надійшли впродовж
+вікна window секунд від усіх клієнтів, об'єднуються в один виклик пакетної
+функції; результати розсилаються назад кожному запиту.
+
+Запуск:  python3 service.py --port 8765 --window-ms 2
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import sys
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+from coordinate_systems import CONVERSIONS
+from distances import DISTANCE_KERNELS, HAVERSINE_METRICS, enable_from_environment
+
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# Вікно накопичення пакета, с: компроміс між затримкою та розміром пакета
+DEFAULT_WINDOW = 0.002
+# Пакет такого розміру обробляється одразу, не чекаючи кінця вікна
+DEFAULT_MAX_BATCH = 4096
+
+
+def _coordinates(values, width: int, name: str) -> Tuple[float, ...]:
+    if not isinstance(values, list) or len(values) != width:
+        raise ValueError(f"{name}: очікується список з {width} координат")
+    coordinates = tuple(float(value) for value in values)
+    if not all(math.isfinite(value) for value in coordinates):
+        raise ValueError(f"{name}: координати мають бути скінченними числами")
+    return coordinates
+
+
+def parse_request(request: dict) -> Tuple[tuple, tuple]:
+    """
+    Перевіряє запит і повертає (ключ пакета, операнди)
+    Ключ: ('distance', метрика, haversine) або ('convert', перетворення, False)
+    """
+    if not isinstance(request, dict):
+        raise ValueError("Запит має бути об'єктом JSON")
+    op = request.get('op')
+    if op == 'distance':
+        metric = request.get('metric')
+        if metric not in DISTANCE_KERNELS:
+            raise ValueError(f"Невідома метрика: {metric!r}; доступні: {sorted(DISTANCE_KERNELS)}")
+        width = len(DISTANCE_KERNELS[metric][0].field_names())
+        haversine = bool(request.get('haversine', False))
+        if haversine and metric not in HAVERSINE_METRICS:
+            raise ValueError(f"Гаверсинусний режим доступний лише для {', '.join(HAVERSINE_METRICS)}")
+        operands = (_coordinates(request.get('a'), width, 'a'),
+                    _coordinates(request.get('b'), width, 'b'))
+        return ('distance', metric, haversine), operands
+    if op == 'convert':
+        conversion = request.get('conversion')
+        if conversion not in CONVERSIONS:
+            raise ValueError(f"Невідоме перетворення: {conversion!r}; доступні: {sorted(CONVERSIONS)}")
+        width = len(CONVERSIONS[conversion][0].field_names())
+        return ('convert', conversion, False), (_coordinates(request.get('point'), width, 'point'),)
+    raise ValueError(f"Невідома операція: {op!r}; доступні: ['convert', 'distance']")
+
+
+def run_batch(key: tuple, operands: Sequence[tuple]) -> list:
+    """Виконує пакет однотипних запитів одним викликом пакетної функції"""
+    kind, name, haversine = key
+    if kind == 'distance':
+        array_type, kernel = DISTANCE_KERNELS[name]
+        width = len(array_type.field_names())
+        sides = [array_type(*(array('d', [ops[side][i] for ops in operands]) for i in range(width)))
+                 for side in (0, 1)]
+        if haversine:
+            return list(kernel(*sides, haversine=True))
+        return list(kernel(*sides))
+    source_type, _, convert = CONVERSIONS[name]
+    width = len(source_type.field_names())
+    source = source_type(*(array('d', [ops[0][i] for ops in operands]) for i in range(width)))
+    return [list(values) for values in zip(*convert(source).columns())]
+
+
+class MicroBatcher:
+    """
+    Накопичує одиночні запити за ключем і обробляє їх пакетами
+    Пакет виконується після window секунд від першого запиту або одразу,
+    щойно в ньому max_batch запитів
+    """
+
+    def __init__(self, window: float = DEFAULT_WINDOW, max_batch: int = DEFAULT_MAX_BATCH):
+        if window < 0:
+            raise ValueError("window не може бути від'ємним")
+        if max_batch < 1:
+            raise ValueError("max_batch має бути додатним")
+        self.window = window
+        self.max_batch = max_batch
+        self.requests = 0
+        self.batches = 0
+        self._pending: Dict[tuple, List[Tuple[tuple, asyncio.Future]]] = {}
+        self._timers: Dict[tuple, asyncio.Handle] = {}
+
+    def submit(self, key: tuple, operands: tuple) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(key, [])
+        pending.append((operands, future))
+        self.requests += 1
+        if len(pending) >= self.max_batch:
+            self._flush(key)
+        elif len(pending) == 1:
+            # Навіть з нульовим вікном об'єднуються запити однієї ітерації циклу
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+        return future
+
+    def _flush(self, key: tuple) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, [])
+        if not batch:
+            return
+        self.batches += 1
+        try:
+            results = run_batch(key, [operands for operands, _ in batch])
+        except Exception:
+            # Помилка одного запиту не має зачіпати решту пакета
+            results = []
+            for operands, _ in batch:
+                try:
+                    results.extend(run_batch(key, [operands]))
+                except Exception as error:
+                    results.append(error)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    @property
+    def mean_batch(self) -> float:
+        return self.requests / self.batches if self.batches else 0.0
+
+
+class DistanceService:
+    """Сервер протоколу рядків JSON поверх MicroBatcher"""
+
+    def __init__(self, window: float = DEFAULT_WINDOW, max_batch: int = DEFAULT_MAX_BATCH):
+        self.batcher = MicroBatcher(window, max_batch)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                    path: Optional[str] = None) -> 'DistanceService':
+        """Починає приймати з'єднання (Unix-сокет, якщо задано path); port=0 — вільний порт"""
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path=path)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port)
+        return self
+
+    @property
+    def address(self):
+        """Адреса першого сокета: (host, port) або шлях Unix-сокета"""
+        return self._server.sockets[0].getsockname()
+
+    async def serve_forever(self) -> None:
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def stats(self) -> dict:
+        return {'requests': self.batcher.requests, 'batches': self.batcher.batches,
+                'mean_batch': self.batcher.mean_batch}
+
+    async def __aenter__(self) -> 'DistanceService':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        responses = set()
+        # До Python 3.10 одночасні drain() одного writer не підтримуються
+        drain_lock = asyncio.Lock()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request_id = None
+                try:
+                    request = json.loads(line)
+                    request_id = request.get('id') if isinstance(request, dict) else None
+                    key, operands = parse_request(request)
+                except (ValueError, TypeError) as error:
+                    self._write(writer, {'id': request_id, 'error': str(error)})
+                    continue
+                task = asyncio.ensure_future(
+                    self._respond(writer, drain_lock, request_id,
+                                  self.batcher.submit(key, operands)))
+                responses.add(task)
+                task.add_done_callback(responses.discard)
+            if responses:
+                await asyncio.gather(*responses)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, drain_lock: asyncio.Lock,
+                       request_id, future) -> None:
+        try:
+            response = {'id': request_id, 'result': await future}
+        except Exception as error:
+            response = {'id': request_id, 'error': f"{type(error).__name__}: {error}"}
+        self._write(writer, response)
+        async with drain_lock:
+            await writer.drain()
+
+    @staticmethod
+    def _write(writer: asyncio.StreamWriter, response: dict) -> None:
+        if writer.is_closing():
+            return
+        try:
+            payload = json.dumps(response, allow_nan=False)
+        except ValueError:
+            # NaN та ±inf не мають подання в JSON: замість токена NaN — помилка
+            payload = json.dumps({'id': response.get('id'),
+                                  'error': "Результат не є скінченним числом"})
+        writer.write(payload.encode() + b'\n')
+
+
+class ServiceClient:
+    """
+    Асинхронний клієнт: багато запитів одночасно в одному з'єднанні
+    (відповіді зіставляються за id)
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._waiting: Dict[int, asyncio.Future] = {}
+        self._drain_lock = asyncio.Lock()
+        self._listener = asyncio.ensure_future(self._listen())
+
+    @classmethod
+    async def connect(cls, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                      path: Optional[str] = None) -> 'ServiceClient':
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, request: dict):
+        """Надсилає запит і повертає result; відповідь з error стає ValueError"""
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[request_id] = future
+        self._writer.write(json.dumps(dict(request, id=request_id)).encode() + b'\n')
+        async with self._drain_lock:
+            await self._writer.drain()
+        return await future
+
+    async def distance(self, metric: str, a: Sequence[float], b: Sequence[float],
+                       haversine: bool = False) -> float:
+        request = {'op': 'distance', 'metric': metric, 'a': list(a), 'b': list(b)}
+        if haversine:
+            request['haversine'] = True
+        return await self.request(request)
+
+    async def convert(self, conversion: str, point: Sequence[float]) -> List[float]:
+        return await self.request({'op': 'convert', 'conversion': conversion,
+                                   'point': list(point)})
+
+    async def close(self) -> None:
+        self._writer.close()
+        await self._writer.wait_closed()
+        await asyncio.gather(self._listener, return_exceptions=True)
+
+    async def __aenter__(self) -> 'ServiceClient':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _listen(self) -> None:
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self._waiting.pop(response.get('id'), None)
+                if future is None or future.done():
+                    continue
+                if 'error' in response:
+                    future.set_exception(ValueError(response['error']))
+                else:
+                    future.set_result(response['result'])
+        finally:
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("З'єднання з сервісом закрито"))
+            self._waiting.clear()
+
+
+async def _serve(args) -> None:
+    service = DistanceService(args.window_ms / 1000, args.max_batch)
+    await service.start(args.host, args.port, args.unix)
+    print(f"Сервіс слухає {service.address} (вікно {args.window_ms} мс, "
+          f"пакет до {args.max_batch})", flush=True)
+    try:
+        await service.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Сервіс перетворень та відстаней")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', metavar='PATH', help="слухати Unix-сокет замість TCP")
+    parser.add_argument('--window-ms', type=float, default=DEFAULT_WINDOW * 1000)
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH)
+    args = parser.parse_args(argv)
+    enable_from_environment()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+"""
+Просторовий індекс (KD-дерево) для наборів декартових точок 2D та 3D
+Пошук k найближчих сусідів, точок у радіусі та у прямокутній області
+"""
+
+import heapq
+import math
+from array import array
+from typing import Iterable, List, Sequence, Tuple, Union
+import distances
+from coordinate_systems import (
+    CartesianPoint2D, CartesianPoint3D, SphericalPoint,
+    CartesianArray2D, CartesianArray3D, SphericalArray
+)
+
+
+# Кількість точок у листку, нижче якої вузол більше не ділиться
+DEFAULT_LEAF_SIZE = 16
+
+Neighbor = Tuple[float, int]  # (відстань, індекс точки у вихідному наборі)
+CartesianPoint = Union[CartesianPoint2D, CartesianPoint3D]
+
+
+class KDTree:
+    """
+    KD-дерево над набором точок CartesianPoint2D або CartesianPoint3D
+
+    Дерево будується одним проходом по всьому набору (bulk loading):
+    кожен вузол ділиться за медіаною вздовж осі з найбільшим розкидом.
+    Відстані рахуються тією ж формулою, що й distance_2d_cartesian /
+    distance_3d_cartesian, тому результати збігаються з повним перебором.
+    """
+
+    def __init__(self, points: Union[CartesianArray2D, CartesianArray3D,
+                                     Iterable[CartesianPoint]],
+                 leaf_size: int = DEFAULT_LEAF_SIZE):
+        if not isinstance(points, (CartesianArray2D, CartesianArray3D)):
+            points = list(points)
+            if points and isinstance(points[0], CartesianPoint3D):
+                points = CartesianArray3D.from_points(points)
+            else:
+                points = CartesianArray2D.from_points(points)
+        if leaf_size < 1:
+            raise ValueError("leaf_size має бути додатним")
+
+        self.dims = len(points.columns())
+        self._fields = points.field_names()
+        self._size = len(points)
+        self._leaf_size = leaf_size
+
+        # Вузли зберігаються паралельними списками; dim == -1 означає листок
+        self._lo: List[int] = []
+        self._hi: List[int] = []
+        self._dim: List[int] = []
+        self._split: List[float] = []
+        self._left: List[int] = []
+        self._right: List[int] = []
+
+        columns = points.columns()
+        order = list(range(self._size))
+        if self._size:
+            self._build(columns, order, 0, self._size)
+
+        # Точки листків лежать суцільно у порядку обходу дерева
+        self._index = array('q', order)
+        self._points = [tuple(column[i] for column in columns) for i in order]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __repr__(self) -> str:
+        return f"KDTree(n={self._size}, dims={self.dims}, nodes={len(self._lo)})"
+
+    def _build(self, columns, order: List[int], lo: int, hi: int) -> int:
+        """Рекурсивно будує вузол для order[lo:hi] і повертає його номер"""
+        node = len(self._lo)
+        self._lo.append(lo)
+        self._hi.append(hi)
+        self._dim.append(-1)
+        self._split.append(0.0)
+        self._left.append(-1)
+        self._right.append(-1)
+        if hi - lo <= self._leaf_size:
+            return node
+
+        # Вісь з найбільшим розкидом координат
+        best_dim, best_spread = 0, -1.0
+        for dim, column in enumerate(columns):
+            values = [column[i] for i in order[lo:hi]]
+            spread = max(values) - min(values)
+            if spread > best_spread:
+                best_dim, best_spread = dim, spread
+
+        column = columns[best_dim]
+        order[lo:hi] = sorted(order[lo:hi], key=column.__getitem__)
+        mid = (lo + hi) // 2
+        self._dim[node] = best_dim
+        self._split[node] = column[order[mid]]
+        self._left[node] = self._build(columns, order, lo, mid)
+        self._right[node] = self._build(columns, order, mid, hi)
+        return node
+
+    def _coords(self, point) -> Tuple[float, ...]:
+        return tuple(getattr(point, name) for name in self._fields)
+
+    def _distance(self, p: Tuple[float, ...], q: Tuple[float, ...]) -> float:
+        """Відстань від запиту q до точки p (як distance_*_cartesian(q, p))"""
+        if self.dims == 2:
+            return math.sqrt((p[0] - q[0])**2 + (p[1] - q[1])**2)
+        return math.sqrt((p[0] - q[0])**2 + (p[1] - q[1])**2 + (p[2] - q[2])**2)
+
+    def knn(self, point: CartesianPoint, k: int) -> List[Neighbor]:
+        """
+        k найближчих сусідів точки point
+        Повертає список (відстань, індекс), впорядкований за (відстань, індекс)
+        """
+        if k <= 0 or not self._size:
+            return []
+        q = self._coords(point)
+        sqrt, distance = math.sqrt, self._distance
+        points, index = self._points, self._index
+        heap: List[Tuple[float, int]] = []  # (-відстань, -індекс): на вершині найгірший
+
+        stack = [(0, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if len(heap) == k and bound > -heap[0][0]:
+                continue
+            dim = self._dim[node]
+            if dim < 0:
+                for j in range(self._lo[node], self._hi[node]):
+                    d = distance(points[j], q)
+                    i = index[j]
+                    if len(heap) < k:
+                        heapq.heappush(heap, (-d, -i))
+                    elif (d, i) < (-heap[0][0], -heap[0][1]):
+                        heapq.heapreplace(heap, (-d, -i))
+                continue
+            diff = q[dim] - self._split[node]
+            # Будь-яка точка з іншого боку площини не ближча за |diff|
+            far_bound = max(bound, sqrt(diff**2))
+            if diff < 0:
+                stack.append((self._right[node], far_bound))
+                stack.append((self._left[node], bound))
+            else:
+                stack.append((self._left[node], far_bound))
+                stack.append((self._right[node], bound))
+
+        return sorted((-d, -i) for d, i in heap)
+
+    def query_radius(self, point: CartesianPoint, radius: float) -> List[int]:
+        """Індекси всіх точок на відстані <= radius від point (за зростанням)"""
+        if not self._size:
+            return []
+        q = self._coords(point)
+        sqrt, distance = math.sqrt, self._distance
+        points, index = self._points, self._index
+        found = []
+
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            dim = self._dim[node]
+            if dim < 0:
+                found.extend(index[j] for j in range(self._lo[node], self._hi[node])
+                             if distance(points[j], q) <= radius)
+                continue
+            diff = q[dim] - self._split[node]
+            near, far = ((self._left[node], self._right[node]) if diff < 0
+                         else (self._right[node], self._left[node]))
+            stack.append(near)
+            if sqrt(diff**2) <= radius:
+                stack.append(far)
+
+        found.sort()
+        return found
+
+    def query_box(self, lower: CartesianPoint, upper: CartesianPoint) -> List[int]:
+        """Індекси всіх точок у прямокутній області [lower, upper] (за зростанням)"""
+        if not self._size:
+            return []
+        low, high = self._coords(lower), self._coords(upper)
+        dims = range(self.dims)
+        points, index = self._points, self._index
+        found = []
+
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            dim = self._dim[node]
+            if dim < 0:
+                for j in range(self._lo[node], self._hi[node]):
+                    p = points[j]
+                    if all(low[d] <= p[d] <= high[d] for d in dims):
+                        found.append(index[j])
+                continue
+            split = self._split[node]
+            if low[dim] <= split:
+                stack.append(self._left[node])
+            if high[dim] >= split:
+                stack.append(self._right[node])
+
+        found.sort()
+        return found
+
+    def knn_batch(self, points: Iterable[CartesianPoint], k: int) -> List[List[Neighbor]]:
+        """k найближчих сусідів для кожної точки запиту за один виклик"""
+        return [self.knn(point, k) for point in points]
+
+    def query_radius_batch(self, points: Iterable[CartesianPoint],
+                           radius: float) -> List[List[int]]:
+        """Пошук у радіусі для кожної точки запиту за один виклик"""
+        return [self.query_radius(point, radius) for point in points]
+
+    def query_box_batch(self, boxes: Iterable[Tuple[CartesianPoint, CartesianPoint]]
+                        ) -> List[List[int]]:
+        """Пошук у прямокутних областях (lower, upper) за один виклик"""
+        return [self.query_box(lower, upper) for lower, upper in boxes]
+
+
+# Запас для кандидатів сферичного індексу: acos поблизу 1 втрачає ~1e-8 рад,
+# а спільний радіус допускає відносну різницю до RADIUS_TOLERANCE
+_ANGLE_MARGIN = 1e-7
+_RELATIVE_MARGIN = 1e-6
+RADIUS_TOLERANCE = 1e-9
+
+
+class SphericalIndex:
+    """
+    Індекс найближчих сусідів за дуговою відстанню для точок SphericalPoint
+    зі спільним радіусом
+
+    Точки проєктуються на одиничні вектори і впорядковуються KD-деревом:
+    хорда на одиничній сфері монотонна відносно кута великого кола. Дерево
+    відбирає лише кандидатів поблизу запиту (з невеликим запасом на похибку
+    округлення), а остаточні відстані рахує distance_3d_spherical_arc, тому
+    результати точно збігаються з повним перебором.
+    """
+
+    def __init__(self, points: Union[SphericalArray, Iterable[SphericalPoint]],
+                 leaf_size: int = DEFAULT_LEAF_SIZE):
+        if not isinstance(points, SphericalArray):
+            points = SphericalArray.from_points(points)
+        self._points = points
+        self.radius = points.radius[0] if len(points) else 0.0
+        for r in points.radius:
+            if abs(r - self.radius) > RADIUS_TOLERANCE * abs(self.radius):
+                raise ValueError(
+                    f"Точки мають різні радіуси ({self.radius} та {r}); "
+                    f"SphericalIndex потребує спільного радіуса")
+        self._tree = KDTree(_unit_vectors(points), leaf_size)
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __repr__(self) -> str:
+        return f"SphericalIndex(n={len(self)}, radius={self.radius:.4f})"
+
+    def _arc(self, query: SphericalPoint, i: int) -> float:
+        return distances.distance_3d_spherical_arc(query, self._points[i])
+
+    def _chord_bound(self, query: SphericalPoint, arc_length: float) -> float:
+        """Хорда на одиничній сфері, що гарантовано покриває дугу arc_length"""
+        return _chord_for_arc((query.radius + self.radius) / 2, arc_length)
+
+    def knn(self, query: SphericalPoint, k: int) -> List[Neighbor]:
+        """
+        k найближчих точок за дуговою відстанню
+        Повертає список (дуга, індекс), впорядкований за (дуга, індекс)
+        """
+        if k <= 0 or not len(self):
+            return []
+        unit = _unit_vector(query)
+        # Перші k за хордою дають верхню межу k-ї дуги
+        worst = max(self._arc(query, i) for _, i in self._tree.knn(unit, k))
+        candidates = self._tree.query_radius(unit, self._chord_bound(query, worst))
+        return sorted((self._arc(query, i), i) for i in candidates)[:k]
+
+    def within_arc(self, query: SphericalPoint, arc_length: float) -> List[int]:
+        """Індекси точок з дуговою відстанню <= arc_length (за зростанням)"""
+        if arc_length < 0 or not len(self):
+            return []
+        candidates = self._tree.query_radius(_unit_vector(query),
+                                             self._chord_bound(query, arc_length))
+        return [i for i in candidates if self._arc(query, i) <= arc_length]
+
+    def knn_batch(self, queries: Iterable[SphericalPoint], k: int) -> List[List[Neighbor]]:
+        """k найближчих за дугою для кожної точки запиту за один виклик"""
+        return [self.knn(query, k) for query in queries]
+
+    def within_arc_batch(self, queries: Iterable[SphericalPoint],
+                         arc_length: float) -> List[List[int]]:
+        """Пошук у межах дуги для кожної точки запиту за один виклик"""
+        return [self.within_arc(query, arc_length) for query in queries]
+
+
+def _chord_for_arc(scale: float, arc_length: float) -> float:
+    """Хорда на одиничній сфері, що гарантовано покриває дугу arc_length сфери радіуса scale"""
+    if scale <= 0 or arc_length >= math.pi * scale:
+        return 2.0 + _ANGLE_MARGIN
+    angle = arc_length / scale * (1 + _RELATIVE_MARGIN) + _ANGLE_MARGIN
+    return 2 * math.sin(min(angle, math.pi) / 2) + _ANGLE_MARGIN
+
+
+def _unit_vector(point: SphericalPoint) -> CartesianPoint3D:
+    """Одиничний вектор напрямку сферичної точки"""
+    sin_polar = math.sin(point.polar_angle)
+    return CartesianPoint3D(sin_polar * math.cos(point.azimuth),
+                            sin_polar * math.sin(point.azimuth),
+                            math.cos(point.polar_angle))
+
+
+def _unit_vectors(points: SphericalArray) -> CartesianArray3D:
+    """Одиничні вектори для всієї колонки сферичних точок"""
+    ones = array('d', [1.0]) * len(points)
+    return CartesianArray3D.from_spherical(
+        SphericalArray(ones, points.azimuth, points.polar_angle))
+
+
+def brute_force_knn(points: Sequence[CartesianPoint], query: CartesianPoint,
+                    k: int) -> List[Neighbor]:
+    """Еталонний пошук k найближчих сусідів повним перебором"""
+    if isinstance(points, (CartesianArray2D, CartesianArray3D)):
+        columns = points
+    elif isinstance(query, CartesianPoint3D):
+        columns = CartesianArray3D.from_points(points)
+    else:
+        columns = CartesianArray2D.from_points(points)
+    batch = (distances.distance_3d_cartesian_batch if isinstance(columns, CartesianArray3D)
+             else distances.distance_2d_cartesian_batch)
+    return heapq.nsmallest(k, zip(batch(query, columns), range(len(columns))))
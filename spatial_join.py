@@ -0,0 +1,209 @@
+"""
+Просторове з'єднання двох наборів точок за відстанню (radius join)
+
+Знаходить усі пари (i, j), для яких distance(a[i], b[j]) <= radius, без
+перебору N×M пар. Точки обох наборів розкладаються по комірках рівномірної
+сітки зі стороною, не меншою за radius (зберігаються лише непорожні комірки,
+ключ — цілочисельні координати комірки). Пара може збігтися лише тоді, коли
+комірки сусідні, тож кожна комірка першого набору порівнюється лише з 3^d
+сусідніми комірками другого.
+
+  for left, right in radius_join(stations, vehicles, 50.0):
+      ...  # left[k], right[k] — індекси k-ї пари у stations та vehicles
+
+Пари видаються фрагментами по chunk_size (два масиви індексів 'q'), тому
+пам'ять не залежить від кількості знайдених пар. Порядок пар не визначений
+(пари групуються за комірками). Остаточна перевірка використовує ту саму
+формулу, що й distance_2d_cartesian / distance_3d_cartesian /
+distance_3d_spherical_arc, тож результат точно збігається з повним перебором.
+
+Для сферичних точок зі спільним радіусом arc_join шукає пари з дуговою
+відстанню <= arc_length: сітка будується над одиничними векторами, а поріг —
+хорда, що покриває цю дугу (як у spatial_index.SphericalIndex).
+"""
+
+import math
+from array import array
+from itertools import product, repeat
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Union
+from coordinate_systems import (
+    CartesianPoint2D, CartesianPoint3D, SphericalPoint,
+    CartesianArray2D, CartesianArray3D, SphericalArray
+)
+from spatial_index import RADIUS_TOLERANCE, _chord_for_arc, _unit_vectors
+
+
+# Кількість пар в одному фрагменті за замовчуванням
+DEFAULT_CHUNK_SIZE = 65_536
+
+# Комірка трохи більша за поріг: округлення x / cell не розводить точки
+# на відстані порогу далі, ніж у сусідні комірки
+_CELL_MARGIN = 1e-6
+
+# PairChunk = (індекси першого набору, індекси другого набору)
+PairChunk = Tuple[array, array]
+
+CartesianPoints = Union[CartesianArray2D, CartesianArray3D,
+                        Iterable[Union[CartesianPoint2D, CartesianPoint3D]]]
+
+
+def _cartesian_columns(points: CartesianPoints) -> Union[CartesianArray2D, CartesianArray3D]:
+    if isinstance(points, (CartesianArray2D, CartesianArray3D)):
+        return points
+    points = list(points)
+    if points and isinstance(points[0], CartesianPoint3D):
+        return CartesianArray3D.from_points(points)
+    return CartesianArray2D.from_points(points)
+
+
+def _spherical_columns(points: Union[SphericalArray, Iterable[SphericalPoint]]) -> SphericalArray:
+    return points if isinstance(points, SphericalArray) else SphericalArray.from_points(points)
+
+
+def _grid(columns, cell: float) -> Dict[Tuple[int, ...], List[int]]:
+    """Непорожні комірки сітки: ключ комірки -> індекси точок (за зростанням)"""
+    floor = math.floor
+    grid: Dict[Tuple[int, ...], List[int]] = {}
+    keys = zip(*([floor(v / cell) for v in column] for column in columns))
+    for i, key in enumerate(keys):
+        bucket = grid.get(key)
+        if bucket is None:
+            grid[key] = [i]
+        else:
+            bucket.append(i)
+    return grid
+
+
+def _cell_groups(columns_a, columns_b, cell: float) -> Iterator[Tuple[List[int], List[int]]]:
+    """
+    Для кожної непорожньої комірки першого набору — (її точки, точки другого
+    набору в сусідніх комірках); пари поза цими групами свідомо далі за cell
+    """
+    grid_a = _grid(columns_a, cell)
+    grid_b = _grid(columns_b, cell)
+    offsets = list(product((-1, 0, 1), repeat=len(columns_a)))
+    for key, rows in grid_a.items():
+        candidates: List[int] = []
+        for offset in offsets:
+            bucket = grid_b.get(tuple(k + o for k, o in zip(key, offset)))
+            if bucket is not None:
+                candidates.extend(bucket)
+        if candidates:
+            yield rows, candidates
+
+
+def _join(groups: Iterable[Tuple[List[int], List[int]]],
+          match: Callable[[List[int], List[int], array, array], None],
+          chunk_size: int) -> Iterator[PairChunk]:
+    """Збирає пари від match(rows, candidates, left, right) у фрагменти по chunk_size"""
+    left, right = array('q'), array('q')
+    for rows, candidates in groups:
+        match(rows, candidates, left, right)
+        while len(left) >= chunk_size:
+            yield left[:chunk_size], right[:chunk_size]
+            del left[:chunk_size]
+            del right[:chunk_size]
+    if left:
+        yield left, right
+
+
+def radius_join(points_a: CartesianPoints, points_b: CartesianPoints, radius: float,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[PairChunk]:
+    """
+    Усі пари (i, j) з distance_*_cartesian(a[i], b[j]) <= radius для двох
+    наборів декартових точок однакової розмірності (2D або 3D)
+    Генерує фрагменти (left, right) по chunk_size пар (останній — коротший)
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size має бути додатним")
+    columns_a, columns_b = _cartesian_columns(points_a), _cartesian_columns(points_b)
+    if len(columns_a) and len(columns_b) and type(columns_a) is not type(columns_b):
+        raise ValueError("Набори точок мають різну розмірність")
+    if radius < 0 or not len(columns_a) or not len(columns_b):
+        return _join((), None, chunk_size)
+
+    cell = radius * (1 + _CELL_MARGIN) if radius > 0 else 1.0
+    sqrt = math.sqrt
+
+    if isinstance(columns_a, CartesianArray2D):
+        ax, ay = columns_a.x, columns_a.y
+        bx, by = columns_b.x, columns_b.y
+
+        def match(rows, candidates, left, right):
+            block = [(j, bx[j], by[j]) for j in candidates]
+            for i in rows:
+                x1, y1 = ax[i], ay[i]
+                found = [j for j, x2, y2 in block if sqrt((x2 - x1)**2 + (y2 - y1)**2) <= radius]
+                if found:
+                    left.extend(repeat(i, len(found)))
+                    right.extend(found)
+    else:
+        ax, ay, az = columns_a.x, columns_a.y, columns_a.z
+        bx, by, bz = columns_b.x, columns_b.y, columns_b.z
+
+        def match(rows, candidates, left, right):
+            block = [(j, bx[j], by[j], bz[j]) for j in candidates]
+            for i in rows:
+                x1, y1, z1 = ax[i], ay[i], az[i]
+                found = [j for j, x2, y2, z2 in block
+                         if sqrt((x2 - x1)**2 + (y2 - y1)**2 + (z2 - z1)**2) <= radius]
+                if found:
+                    left.extend(repeat(i, len(found)))
+                    right.extend(found)
+
+    return _join(_cell_groups(columns_a.columns(), columns_b.columns(), cell), match, chunk_size)
+
+
+def arc_join(points_a: Union[SphericalArray, Iterable[SphericalPoint]],
+             points_b: Union[SphericalArray, Iterable[SphericalPoint]], arc_length: float,
+             chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[PairChunk]:
+    """
+    Усі пари (i, j) з distance_3d_spherical_arc(a[i], b[j]) <= arc_length для
+    двох наборів сферичних точок зі спільним радіусом
+    Генерує фрагменти (left, right) по chunk_size пар (останній — коротший)
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size має бути додатним")
+    columns_a, columns_b = _spherical_columns(points_a), _spherical_columns(points_b)
+    if arc_length < 0 or not len(columns_a) or not len(columns_b):
+        return _join((), None, chunk_size)
+    radius = columns_a.radius[0]
+    for r in (*columns_a.radius, *columns_b.radius):
+        if abs(r - radius) > RADIUS_TOLERANCE * abs(radius):
+            raise ValueError(f"Точки мають різні радіуси ({radius} та {r}); "
+                             f"arc_join потребує спільного радіуса")
+
+    # Хорда на одиничній сфері з запасом на округлення: відбір кандидатів,
+    # остаточна перевірка — формулою distance_3d_spherical_arc
+    chord = _chord_for_arc(radius, arc_length)
+    chord2 = chord * chord
+    units_a, units_b = _unit_vectors(columns_a), _unit_vectors(columns_b)
+    sin, cos, acos = math.sin, math.cos, math.acos
+    ux, uy, uz = units_a.x, units_a.y, units_a.z
+    vx, vy, vz = units_b.x, units_b.y, units_b.z
+    ra, ta = columns_a.radius, columns_a.azimuth
+    sa = list(map(sin, columns_a.polar_angle))
+    ca = list(map(cos, columns_a.polar_angle))
+    rb, tb = columns_b.radius, columns_b.azimuth
+    sb = list(map(sin, columns_b.polar_angle))
+    cb = list(map(cos, columns_b.polar_angle))
+
+    def match(rows, candidates, left, right):
+        block = [(j, vx[j], vy[j], vz[j]) for j in candidates]
+        for i in rows:
+            x1, y1, z1 = ux[i], uy[i], uz[i]
+            r1, t1, s1, c1 = ra[i], ta[i], sa[i], ca[i]
+            found = [j for j, x2, y2, z2 in block
+                     if (x2 - x1)**2 + (y2 - y1)**2 + (z2 - z1)**2 <= chord2
+                     and (r1 + rb[j]) / 2 * acos(max(-1, min(1, s1 * sb[j] * cos(tb[j] - t1)
+                                                             + c1 * cb[j]))) <= arc_length]
+            if found:
+                left.extend(repeat(i, len(found)))
+                right.extend(found)
+
+    return _join(_cell_groups(units_a.columns(), units_b.columns(), chord), match, chunk_size)
+
+
+def count_pairs(chunks: Iterable[PairChunk]) -> int:
+    """Кількість пар у потоці фрагментів"""
+    return sum(len(left) for left, _ in chunks)
@@ -3,12 +3,37 @@
 """
 
 import math
+import os
+import random
+import tempfile
+from array import array
 from coordinate_systems import (
     CartesianPoint2D, PolarPoint,
-    CartesianPoint3D, SphericalPoint
+    CartesianPoint3D, SphericalPoint, CylindricalPoint,
+    CartesianArray2D, PolarArray,
+    CartesianArray3D, SphericalArray, CylindricalArray,
+    PreparedPolarPoint, PreparedSphericalPoint
 )
 
 
+# Допустима похибка відносно масштабу точок для кожної точності зберігання:
+# float64 — лише обчислювальний шум, float32 — округлення кожного збереженого
+# значення (відносно ~6e-8) із запасом на кілька таких округлень
+PRECISION_TOLERANCE = {'float64': 1e-10, 'float32': 1e-6}
+
+
+def _round_trip_error(originals, back) -> float:
+    """Найбільша похибка координат після перетворення туди й назад відносно max(1, |p|)"""
+    names = type(back).field_names()
+    error = 0.0
+    for original, returned in zip(originals, back):
+        values = [getattr(original, name) for name in names]
+        scale = max(1.0, math.hypot(*values))
+        error = max(error, max(abs(v - getattr(returned, name))
+                               for v, name in zip(values, names)) / scale)
+    return error
+
+
 def test_2d_conversions():
     """Тестування перетворень між декартовою та полярною системами (2D)"""
     print("=" * 70)
@@ -43,10 +68,26 @@ def test_2d_conversions():
         
         print(f"  Похибка: x={error_x:.2e}, y={error_y:.2e}, max={max_error:.2e}")
         
-        if max_error < 1e-10:
+        if max_error < PRECISION_TOLERANCE['float64']:
             print("  ✓ Перетворення КОРЕКТНЕ")
         else:
             print("  ✗ Перетворення НЕКОРЕКТНЕ")
+    
+    # Пакетне перетворення туди й назад в обох точностях зберігання
+    rng = random.Random(11)
+    originals = test_cases_2d + [CartesianPoint2D(rng.uniform(-1e3, 1e3), rng.uniform(-1e3, 1e3))
+                                 for _ in range(2000)]
+    print("\nПакетно туди й назад (похибка відносно max(1, |p|)):")
+    all_passed = True
+    for precision, tolerance in PRECISION_TOLERANCE.items():
+        points = CartesianArray2D.from_points(originals, precision)
+        back = CartesianArray2D.from_polar(PolarArray.from_cartesian(points))
+        error = _round_trip_error(originals, back)
+        passed = error < tolerance and back.precision == precision
+        all_passed = all_passed and passed
+        print(f"  {'✓' if passed else '✗'} {precision}: {error:.2e} (допуск {tolerance:.0e})")
+    
+    assert all_passed
 
 
 def test_3d_conversions():
@@ -85,10 +126,33 @@ def test_3d_conversions():
         
         print(f"  Похибка: x={error_x:.2e}, y={error_y:.2e}, z={error_z:.2e}, max={max_error:.2e}")
         
-        if max_error < 1e-10:
+        if max_error < PRECISION_TOLERANCE['float64']:
             print("  ✓ Перетворення КОРЕКТНЕ")
         else:
             print("  ✗ Перетворення НЕКОРЕКТНЕ")
+    
+    # Пакетне перетворення туди й назад в обох точностях зберігання
+    rng = random.Random(13)
+    originals = test_cases_3d + [CartesianPoint3D(*(rng.uniform(-1e3, 1e3) for _ in range(3)))
+                                 for _ in range(2000)]
+    round_trips = [
+        ("сферична", lambda c: CartesianArray3D.from_spherical(SphericalArray.from_cartesian(c))),
+        ("циліндрична",
+         lambda c: CartesianArray3D.from_cylindrical(CylindricalArray.from_cartesian(c))),
+    ]
+    print("\nПакетно туди й назад (похибка відносно max(1, |p|)):")
+    all_passed = True
+    for precision, tolerance in PRECISION_TOLERANCE.items():
+        points = CartesianArray3D.from_points(originals, precision)
+        for name, round_trip in round_trips:
+            back = round_trip(points)
+            error = _round_trip_error(originals, back)
+            passed = error < tolerance and back.precision == precision
+            all_passed = all_passed and passed
+            print(f"  {'✓' if passed else '✗'} {precision}, {name}: {error:.2e} "
+                  f"(допуск {tolerance:.0e})")
+    
+    assert all_passed
 
 
 def test_distance_equivalence():
@@ -118,7 +182,7 @@ def test_distance_equivalence():
     print(f"  Відстань (полярна):   {dist_polar:.6f}")
     print(f"  Різниця: {abs(dist_cart - dist_polar):.2e}")
     
-    if abs(dist_cart - dist_polar) < 1e-10:
+    if abs(dist_cart - dist_polar) < PRECISION_TOLERANCE['float64']:
         print("  ✓ Відстані СПІВПАДАЮТЬ")
     else:
         print("  ✗ Відстані НЕ СПІВПАДАЮТЬ")
@@ -139,16 +203,1409 @@ def test_distance_equivalence():
     print(f"  Відстань (сферична-хорда): {dist_spher_chord:.6f}")
     print(f"  Різниця: {abs(dist_cart_3d - dist_spher_chord):.2e}")
     
-    if abs(dist_cart_3d - dist_spher_chord) < 1e-10:
+    if abs(dist_cart_3d - dist_spher_chord) < PRECISION_TOLERANCE['float64']:
         print("  ✓ Відстані СПІВПАДАЮТЬ")
     else:
         print("  ✗ Відстані НЕ СПІВПАДАЮТЬ")
+    
+    # Гаверсинусний режим: межа похибки на випадкових та граничних входах
+    from distances import (
+        HAVERSINE_MAX_ERROR, distance_3d_spherical_arc,
+        distance_2d_polar_batch, distance_3d_spherical_chord_batch,
+        distance_3d_spherical_arc_batch
+    )
+    
+    print(f"\nГаверсинусний режим: межа {HAVERSINE_MAX_ERROR:.0e} · (r₁ + r₂)")
+    rng = random.Random(99)
+    polar_pairs, spherical_pairs, sphere_pairs = [], [], []
+    for _ in range(3000):
+        p = PolarPoint(rng.uniform(0, 100), rng.uniform(-4 * math.pi, 4 * math.pi))
+        s = SphericalPoint(rng.uniform(0, 100), rng.uniform(-math.pi, math.pi),
+                           rng.uniform(0, math.pi))
+        # Граничні випадки: майже однакові, протилежні, біля полюсів
+        kind = rng.randrange(4)
+        if kind == 0:
+            q = PolarPoint(p.radius * (1 + rng.uniform(-1e-9, 1e-9)),
+                           p.angle + rng.uniform(-1e-9, 1e-9))
+            t = SphericalPoint(s.radius, s.azimuth + rng.uniform(-1e-9, 1e-9),
+                               s.polar_angle + rng.uniform(-1e-9, 1e-9))
+        elif kind == 1:
+            q = PolarPoint(rng.uniform(0, 100), p.angle + math.pi)
+            t = SphericalPoint(s.radius, s.azimuth + math.pi, math.pi - s.polar_angle)
+        elif kind == 2:
+            q = PolarPoint(rng.uniform(0, 100), rng.uniform(-math.pi, math.pi))
+            s = SphericalPoint(s.radius, s.azimuth, rng.uniform(0, 1e-6))
+            t = SphericalPoint(rng.uniform(0, 100), rng.uniform(-math.pi, math.pi),
+                               math.pi - rng.uniform(0, 1e-6))
+        else:
+            q = PolarPoint(rng.uniform(0, 100), rng.uniform(-4 * math.pi, 4 * math.pi))
+            t = SphericalPoint(rng.uniform(0, 100), rng.uniform(-math.pi, math.pi),
+                               rng.uniform(0, math.pi))
+        polar_pairs.append((p, q))
+        spherical_pairs.append((s, t))
+        sphere_pairs.append((s, SphericalPoint(s.radius, t.azimuth, t.polar_angle)))
+    
+    def reference_chord(a, b):
+        return distance_3d_cartesian(CartesianPoint3D.from_spherical(a),
+                                     CartesianPoint3D.from_spherical(b))
+    
+    def reference_arc(a, b):
+        # Хорда одиничної сфери -> кут, добре обумовлено біля 0
+        unit = distance_3d_cartesian(
+            CartesianPoint3D.from_spherical(SphericalPoint(1, a.azimuth, a.polar_angle)),
+            CartesianPoint3D.from_spherical(SphericalPoint(1, b.azimuth, b.polar_angle)))
+        return a.radius * 2 * math.asin(min(1, unit / 2))
+    
+    cases = [
+        ("2D полярна", polar_pairs, distance_2d_polar, distance_2d_polar_batch, PolarArray,
+         lambda a, b: distance_2d_cartesian(CartesianPoint2D.from_polar(a),
+                                            CartesianPoint2D.from_polar(b))),
+        ("3D хорда", spherical_pairs, distance_3d_spherical_chord,
+         distance_3d_spherical_chord_batch, SphericalArray, reference_chord),
+        ("3D дуга", sphere_pairs, distance_3d_spherical_arc,
+         distance_3d_spherical_arc_batch, SphericalArray, reference_arc),
+    ]
+    def exact_or_none(func, a, b):
+        # Точна формула для майже однакових точок може дати √ від'ємного
+        try:
+            return func(a, b)
+        except ValueError:
+            return None
+    
+    within_bound = True
+    for name, pairs, func, batch, array_type, reference in cases:
+        approx = [func(a, b, haversine=True) for a, b in pairs]
+        scale = [a.radius + b.radius or 1.0 for a, b in pairs]
+        exact = [exact_or_none(func, a, b) for a, b in pairs]
+        error_exact = max(abs(d - e) / w for d, e, w in zip(approx, exact, scale) if e is not None)
+        error_reference = max(abs(d - reference(a, b)) / w
+                              for d, (a, b), w in zip(approx, pairs, scale))
+        batched = batch(array_type.from_points([a for a, _ in pairs]),
+                        array_type.from_points([b for _, b in pairs]), haversine=True)
+        # Підготовлені точки (одна чи обидві) не скасовують гаверсинусний режим
+        prepare = (PreparedPolarPoint if array_type is PolarArray
+                   else PreparedSphericalPoint).from_point
+        mixed = [func(prepare(a), b, haversine=True) for a, b in pairs]
+        both = [func(prepare(a), prepare(b), haversine=True) for a, b in pairs]
+        passed = (max(error_exact, error_reference) <= HAVERSINE_MAX_ERROR
+                  and list(batched) == approx and mixed == approx and both == approx)
+        within_bound = within_bound and passed
+        undefined = exact.count(None)
+        print(f"  {'✓' if passed else '✗'} {name}: відносно точної {error_exact:.1e}, "
+              f"відносно декартової {error_reference:.1e}, пакетна та з підготовленими "
+              f"точками збігаються побітово"
+              + (f" (точна не визначена для {undefined} пар)" if undefined else ""))
+    
+    # Точність зберігання: ті самі пари в колонках float64 і float32,
+    # еталон — пакетна функція на вихідних даних float64
+    from distances import distance_2d_cartesian_batch, distance_3d_cartesian_batch
+    from data_generator import generate
+    
+    n = 5000
+    planar = [generate('uniform_2d', n, stream=s, extent=1000.0) for s in (0, 1)]
+    polar = [PolarArray.from_cartesian(c) for c in planar]
+    spherical = [generate('uniform_spherical', n, stream=s, radius=(0.0, 1000.0)) for s in (0, 1)]
+    spatial = [CartesianArray3D.from_spherical(s) for s in spherical]
+    sphere = [generate('uniform_on_sphere', n, stream=s, radius=6371.0) for s in (0, 1)]
+    
+    def radii(arrays):
+        return [r1 + r2 for r1, r2 in zip(arrays[0].radius, arrays[1].radius)]
+    
+    precision_cases = [
+        ("2D декартова", distance_2d_cartesian_batch, planar, radii(polar)),
+        ("2D полярна", distance_2d_polar_batch, polar, radii(polar)),
+        ("3D декартова", distance_3d_cartesian_batch, spatial, radii(spherical)),
+        ("3D хорда", distance_3d_spherical_chord_batch, spherical, radii(spherical)),
+        ("3D дуга", distance_3d_spherical_arc_batch, sphere, radii(sphere)),
+    ]
+    
+    print("\nТочність зберігання: похибка пакетних відстаней відносно max(1, |p₁| + |p₂|)")
+    precision_passed = True
+    for name, batch, (first, second), scale in precision_cases:
+        reference = batch(first, second)
+        errors, passed = {}, True
+        for precision, tolerance in PRECISION_TOLERANCE.items():
+            stored = (first.astype(precision), second.astype(precision))
+            measured = batch(*stored)
+            errors[precision] = max(abs(d - e) / max(1.0, w)
+                                    for d, e, w in zip(measured, reference, scale))
+            passed = (passed and errors[precision] < tolerance
+                      and measured.typecode == stored[0].typecode())
+        precision_passed = precision_passed and passed
+        print(f"  {'✓' if passed else '✗'} {name}: "
+              + ", ".join(f"{p} {e:.1e}" for p, e in errors.items()))
+    print("  Допуски: " + ", ".join(f"{p} {t:.0e}" for p, t in PRECISION_TOLERANCE.items()))
+    
+    assert within_bound and precision_passed
+
+
+def test_batch_conversions():
+    """Перевірка колонкових перетворень: збіг зі скалярними та зворотне пакування"""
+    print("\n" + "=" * 70)
+    print("ТЕСТУВАННЯ КОЛОНКОВИХ (BATCH) ПЕРЕТВОРЕНЬ")
+    print("=" * 70)
+    
+    rng = random.Random(7)
+    polar_points = [PolarPoint(rng.uniform(0, 100), rng.uniform(-math.pi, math.pi))
+                    for _ in range(1000)]
+    spherical_points = [SphericalPoint(rng.uniform(0, 100),
+                                       rng.uniform(-math.pi, math.pi),
+                                       rng.uniform(0, math.pi))
+                        for _ in range(1000)]
+    spherical_points.append(SphericalPoint(0, 0, 0))
+    
+    polar_array = PolarArray.from_points(polar_points)
+    spherical_array = SphericalArray.from_points(spherical_points)
+    cartesian_2d = CartesianArray2D.from_polar(polar_array)
+    cartesian_3d = CartesianArray3D.from_spherical(spherical_array)
+    
+    checks = [
+        ("Пакування PolarArray без втрат",
+         polar_array.to_points() == polar_points),
+        ("Пакування SphericalArray без втрат",
+         spherical_array.to_points() == spherical_points),
+        ("CartesianArray2D.from_polar == скалярна версія",
+         cartesian_2d.to_points() ==
+         [CartesianPoint2D.from_polar(p) for p in polar_points]),
+        ("PolarArray.from_cartesian == скалярна версія",
+         PolarArray.from_cartesian(cartesian_2d).to_points() ==
+         [PolarPoint.from_cartesian(c) for c in cartesian_2d]),
+        ("CartesianArray3D.from_spherical == скалярна версія",
+         cartesian_3d.to_points() ==
+         [CartesianPoint3D.from_spherical(s) for s in spherical_points]),
+        ("SphericalArray.from_cartesian == скалярна версія",
+         SphericalArray.from_cartesian(cartesian_3d).to_points() ==
+         [SphericalPoint.from_cartesian(c) for c in cartesian_3d]),
+    ]
+    
+    for name, passed in checks:
+        print(f"  {'✓' if passed else '✗'} {name}")
+    
+    assert all(passed for _, passed in checks)
+
+
+def test_batch_distances():
+    """Перевірка пакетних відстаней: побітовий збіг зі скалярними функціями"""
+    print("\n" + "=" * 70)
+    print("ПЕРЕВІРКА ПАКЕТНИХ ВІДСТАНЕЙ")
+    print("=" * 70)
+    
+    from distances import (
+        distance_2d_cartesian, distance_2d_polar,
+        distance_3d_cartesian, distance_3d_spherical_chord,
+        distance_3d_spherical_arc,
+        distance_2d_cartesian_batch, distance_2d_polar_batch,
+        distance_3d_cartesian_batch, distance_3d_spherical_chord_batch,
+        distance_3d_spherical_arc_batch
+    )
+    
+    rng = random.Random(11)
+    n = 1000
+    polar_a = [PolarPoint(rng.uniform(1, 100), rng.uniform(0, 2 * math.pi)) for _ in range(n)]
+    polar_b = [PolarPoint(rng.uniform(1, 100), rng.uniform(0, 2 * math.pi)) for _ in range(n)]
+    spherical_a = [SphericalPoint(rng.uniform(10, 100), rng.uniform(0, 2 * math.pi),
+                                  rng.uniform(0, math.pi)) for _ in range(n)]
+    spherical_b = [SphericalPoint(s.radius, rng.uniform(0, 2 * math.pi),
+                                  rng.uniform(0, math.pi)) for s in spherical_a]
+    # Однакові точки: косинус дуги може вийти за 1 через округлення
+    spherical_b[0] = spherical_a[0]
+    cartesian_2d_a = [CartesianPoint2D.from_polar(p) for p in polar_a]
+    cartesian_2d_b = [CartesianPoint2D.from_polar(p) for p in polar_b]
+    cartesian_3d_a = [CartesianPoint3D.from_spherical(s) for s in spherical_a]
+    cartesian_3d_b = [CartesianPoint3D.from_spherical(s) for s in spherical_b]
+    
+    cases = [
+        ("2D декартова", distance_2d_cartesian, distance_2d_cartesian_batch,
+         CartesianArray2D, cartesian_2d_a, cartesian_2d_b),
+        ("2D полярна", distance_2d_polar, distance_2d_polar_batch,
+         PolarArray, polar_a, polar_b),
+        ("3D декартова", distance_3d_cartesian, distance_3d_cartesian_batch,
+         CartesianArray3D, cartesian_3d_a, cartesian_3d_b),
+        ("3D хорда", distance_3d_spherical_chord, distance_3d_spherical_chord_batch,
+         SphericalArray, spherical_a, spherical_b),
+        ("3D дуга", distance_3d_spherical_arc, distance_3d_spherical_arc_batch,
+         SphericalArray, spherical_a, spherical_b),
+    ]
+    
+    all_passed = True
+    for name, scalar, batch, array_type, points_a, points_b in cases:
+        column_a = array_type.from_points(points_a)
+        column_b = array_type.from_points(points_b)
+        pairwise = list(batch(column_a, column_b)) == [
+            scalar(p1, p2) for p1, p2 in zip(points_a, points_b)]
+        broadcast = list(batch(column_a, points_b[0])) == [
+            scalar(p1, points_b[0]) for p1 in points_a]
+        passed = pairwise and broadcast
+        all_passed = all_passed and passed
+        print(f"  {'✓' if passed else '✗'} {name}: попарно={pairwise}, з точкою={broadcast}")
+    
+    assert all_passed
+
+
+def test_distance_matrix():
+    """Перевірка тайлової матриці відстаней: callback, mmap-файл та збіг зі скалярною"""
+    print("\n" + "=" * 70)
+    print("ПЕРЕВІРКА ТАЙЛОВОЇ МАТРИЦІ ВІДСТАНЕЙ")
+    print("=" * 70)
+    
+    from distances import distance_3d_spherical_arc, distance_3d_spherical_arc_batch
+    from distance_matrix import distance_matrix, open_distance_matrix
+    
+    rng = random.Random(3)
+    set_a = SphericalArray.from_points([
+        SphericalPoint(10, rng.uniform(0, 2 * math.pi), rng.uniform(0, math.pi))
+        for _ in range(37)])
+    set_b = SphericalArray.from_points([
+        SphericalPoint(10, rng.uniform(0, 2 * math.pi), rng.uniform(0, math.pi))
+        for _ in range(23)])
+    
+    covered = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "matrix.bin")
+        # Бюджет на 50 значень змушує розбити матрицю на кілька тайлів
+        stats = distance_matrix(set_a, set_b, 'spherical_arc', memory_budget=8 * 50,
+                                callback=lambda r, c, rows, cols, tile: covered.append(rows * cols),
+                                out_path=path)
+        matrix = open_distance_matrix(path, len(set_b))
+        matches = all(matrix[i, j] == distance_3d_spherical_arc(set_a[i], set_b[j])
+                      for i in range(len(set_a)) for j in range(len(set_b)))
+        matrix.release()
+        
+        # Колонки float32: матриця лишається float64, ядро пише в неї без округлення до float32
+        path_32 = os.path.join(tmp, "matrix32.bin")
+        set_a_32, set_b_32 = set_a.astype('float32'), set_b.astype('float32')
+        distance_matrix(set_a_32, set_b_32, 'spherical_arc', memory_budget=8 * 50,
+                        out_path=path_32)
+        matrix = open_distance_matrix(path_32, len(set_b))
+        matches_32 = all(
+            matrix[i, j] == distance_3d_spherical_arc_batch(
+                set_a_32[i], set_b_32, out=array('d', [0.0]) * len(set_b))[j]
+            for i in range(len(set_a)) for j in range(len(set_b)))
+        matrix.release()
+    
+    print(f"  {stats}")
+    print(f"  {'✓' if stats.tiles > 1 else '✗'} Матрицю розбито на {stats.tiles} тайлів")
+    print(f"  {'✓' if sum(covered) == stats.pairs else '✗'} Тайли покривають усі пари")
+    print(f"  {'✓' if matches else '✗'} Файл збігається зі скалярною дуговою відстанню")
+    print(f"  {'✓' if matches_32 else '✗'} Колонки float32: файл збігається з пакетною відстанню")
+    
+    # Пікова пам'ять: тайли разом із тимчасовими даними ядра в межах бюджету
+    import tracemalloc
+    from distance_matrix import iter_distance_tiles
+    budget = 1024 * 1024
+    rows_a = CartesianArray2D.from_points([CartesianPoint2D(rng.uniform(-1, 1), rng.uniform(-1, 1))
+                                           for _ in range(200)])
+    rows_b = CartesianArray2D.from_points([CartesianPoint2D(rng.uniform(-1, 1), rng.uniform(-1, 1))
+                                           for _ in range(2000)])
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        for _ in iter_distance_tiles(rows_a, rows_b, 'cartesian_2d', memory_budget=budget):
+            pass
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    # Запас на накладні витрати інтерпретатора (вільні списки кортежів тощо)
+    within_budget = peak <= budget * 1.25
+    print(f"  {'✓' if within_budget else '✗'} Пік {peak / 1024:.0f} КіБ при бюджеті {budget // 1024} КіБ")
+    
+    assert stats.tiles > 1 and sum(covered) == stats.pairs and matches and matches_32
+    assert within_budget
+
+
+def test_prepared_points():
+    """Перевірка підготовлених точок: швидкий шлях дає ті самі відстані"""
+    print("\n" + "=" * 70)
+    print("ПЕРЕВІРКА ПІДГОТОВЛЕНИХ ТОЧОК (КЕШОВАНІ sin/cos)")
+    print("=" * 70)
+    
+    from distances import (
+        distance_2d_polar, distance_3d_spherical_chord, distance_3d_spherical_arc
+    )
+    
+    rng = random.Random(13)
+    polar = [PolarPoint(rng.uniform(1, 100), rng.uniform(0, 2 * math.pi)) for _ in range(500)]
+    spherical = [SphericalPoint(50, rng.uniform(0, 2 * math.pi), rng.uniform(0, math.pi))
+                 for _ in range(500)]
+    prepared_polar = [PreparedPolarPoint.from_point(p) for p in polar]
+    prepared_spherical = [PreparedSphericalPoint.from_point(s) for s in spherical]
+    
+    def max_error(func, raw, prepared_a, prepared_b):
+        return max(abs(func(raw[i], raw[i - 1]) - func(prepared_a[i], prepared_b[i - 1]))
+                   for i in range(len(raw)))
+    
+    # Одна підготовлена точка проти звичайних: побітовий збіг
+    mixed_exact = all(
+        func(prepared_spherical[0], s) == func(spherical[0], s)
+        for func in (distance_3d_spherical_chord, distance_3d_spherical_arc)
+        for s in spherical)
+    # Обидві підготовлені: формула без тригонометрії, похибка на рівні округлення
+    errors = {
+        "2D полярна": max_error(distance_2d_polar, polar, prepared_polar, prepared_polar),
+        "3D хорда": max_error(distance_3d_spherical_chord, spherical,
+                              prepared_spherical, prepared_spherical),
+        "3D дуга": max_error(distance_3d_spherical_arc, spherical,
+                             prepared_spherical, prepared_spherical),
+    }
+    
+    print(f"  {'✓' if mixed_exact else '✗'} Підготовлена + звичайна: побітовий збіг")
+    for name, error in errors.items():
+        # Дуга через acos поблизу 0 чутлива до останніх бітів косинуса
+        tolerance = 1e-6 if name == "3D дуга" else 1e-10
+        print(f"  {'✓' if error < tolerance else '✗'} {name}: max похибка {error:.2e}")
+    
+    assert mixed_exact
+    assert errors["2D полярна"] < 1e-10 and errors["3D хорда"] < 1e-10
+    assert errors["3D дуга"] < 1e-6
+
+
+def test_compact_points():
+    """Компактні точки: той самий інтерфейс і ті самі результати, що й dataclass-точки"""
+    print("\n" + "=" * 70)
+    print("ПЕРЕВІРКА КОМПАКТНИХ ТОЧОК")
+    print("=" * 70)
+    
+    from compact_points import (
+        CompactCartesianPoint2D, CompactPolarPoint,
+        CompactCartesianPoint3D, CompactSphericalPoint
+    )
+    from distances import distance_2d_polar, distance_3d_spherical_arc
+    
+    rng = random.Random(17)
+    polar = [PolarPoint(rng.uniform(1, 100), rng.uniform(-math.pi, math.pi)) for _ in range(200)]
+    spherical = [SphericalPoint(rng.uniform(1, 100), rng.uniform(-math.pi, math.pi),
+                                rng.uniform(0, math.pi)) for _ in range(200)]
+    compact_polar = [CompactPolarPoint(p.radius, p.angle) for p in polar]
+    compact_spherical = [CompactSphericalPoint(s.radius, s.azimuth, s.polar_angle)
+                         for s in spherical]
+    
+    def immutable(point):
+        try:
+            point.x = 1.0
+        except AttributeError:
+            return True
+        return False
+    
+    point = CompactCartesianPoint2D(3.0, 4.0)
+    
+    # Компактна точка й dataclass-точка поводяться однаково в порівняннях
+    # і операціях кортежу: значення або TypeError
+    def outcome(operation, p):
+        try:
+            return operation(p)
+        except TypeError:
+            return TypeError
+    
+    operations = [
+        lambda p: p == (3.0, 4.0), lambda p: (3.0, 4.0) == p, lambda p: p != (3.0, 4.0),
+        lambda p: p < type(p)(4.0, 4.0), lambda p: p >= type(p)(3.0, 4.0),
+        lambda p: p < (4.0, 4.0), lambda p: (4.0, 4.0) > p, lambda p: sorted([p, p]),
+        lambda p: p[0], lambda p: p + (1.0,), lambda p: (1.0,) + p, lambda p: p * 2,
+        lambda p: 2 * p, lambda p: p == type(p)(3.0, 4.0),
+    ]
+    same_semantics = [outcome(op, point) for op in operations] == \
+                     [outcome(op, CartesianPoint2D(3.0, 4.0)) for op in operations]
+    
+    checks = [
+        ("Перетворення 2D збігаються побітово",
+         all(tuple(CompactCartesianPoint2D.from_polar(c)) == (CartesianPoint2D.from_polar(p).x,
+                                                              CartesianPoint2D.from_polar(p).y)
+             for p, c in zip(polar, compact_polar))),
+        ("Перетворення 3D збігаються побітово",
+         all(tuple(CompactSphericalPoint.from_cartesian(CompactCartesianPoint3D.from_spherical(c)))
+             == (lambda s: (s.radius, s.azimuth, s.polar_angle))(
+                 SphericalPoint.from_cartesian(CartesianPoint3D.from_spherical(s)))
+             for s, c in zip(spherical, compact_spherical))),
+        ("Відстані приймають компактні точки",
+         all(distance_2d_polar(compact_polar[i], compact_polar[i - 1])
+             == distance_2d_polar(polar[i], polar[i - 1]) for i in range(len(polar)))
+         and all(distance_3d_spherical_arc(compact_spherical[i], compact_spherical[i - 1])
+                 == distance_3d_spherical_arc(spherical[i], spherical[i - 1])
+                 for i in range(len(spherical)))),
+        ("Колонки будуються з компактних точок",
+         PolarArray.from_points(compact_polar) == PolarArray.from_points(polar)),
+        ("Незмінність", immutable(point)),
+        ("Немає __dict__ на екземпляр", not hasattr(point, '__dict__')),
+        ("Рівність і хеш", point == CompactCartesianPoint2D(3.0, 4.0)
+         and hash(point) == hash(CompactCartesianPoint2D(3.0, 4.0))
+         and len({point, CompactCartesianPoint2D(3.0, 4.0)}) == 1),
+        ("Не дорівнює кортежу чи точці іншого класу",
+         point != (3.0, 4.0) and point != CartesianPoint2D(3.0, 4.0)),
+        ("repr", repr(point) == "CompactCartesianPoint2D(x=3.0000, y=4.0000)"),
+        ("Порівняння й операції кортежу — як у dataclass-точки", same_semantics),
+        ("Розпакування та _replace працюють",
+         tuple(point) == (3.0, 4.0) and point._replace(y=5.0) == CompactCartesianPoint2D(3.0, 5.0)),
+    ]
+    
+    for name, passed in checks:
+        print(f"  {'✓' if passed else '✗'} {name}")
+    
+    assert all(passed for _, passed in checks)
+
+
+def test_conversion_cache():
+    """Кеш перетворень: ті самі результати, лічильники, витіснення LRU, потоки"""
+    print("\n" + "=" * 70)
+    print("ПЕРЕВІРКА КЕШУ ПЕРЕТВОРЕНЬ")
+    print("=" * 70)
+    
+    import threading
+    from conversion_cache import (
+        ConversionCache, conversion_cache, enable_conversion_cache, disable_conversion_cache
+    )
+    
+    rng = random.Random(21)
+    stations = [PolarPoint(rng.uniform(1, 100), rng.uniform(-math.pi, math.pi)) for _ in range(50)]
+    stream = [rng.choice(stations) for _ in range(2000)]
+    uncached = CartesianPoint2D.from_polar
+    uncached_to_polar = PolarPoint.from_cartesian
+    
+    cache = ConversionCache.for_conversion('polar_to_cartesian', maxsize=100)
+    same = all(cache(p) == uncached(p) for p in stream)
+    stats = cache.stats()
+    
+    small = ConversionCache.for_conversion('polar_to_cartesian', maxsize=2)
+    a, b, c = stations[:3]
+    small(a), small(b), small(a), small(c)  # c витісняє b, а не щойно використану a
+    small(a)
+    lru = small.stats().hits == 2 and small.stats().evictions == 1
+    
+    # -0.0 і 0.0 — різні записи (atan2 дає π і 0), NaN не потрапляє в кеш
+    signed = ConversionCache.for_conversion('cartesian_to_polar', maxsize=8)
+    zeros = [CartesianPoint2D(-1.0, 0.0), CartesianPoint2D(-1.0, -0.0)]
+    signed_zeros = ([signed(p) for p in zeros] == [uncached_to_polar(p) for p in zeros]
+                    and [signed(p).angle for p in zeros] == [math.pi, -math.pi])
+    for _ in range(5):
+        signed(CartesianPoint2D(math.nan, 1.0))
+    nan_skipped = len(signed) == 2 and signed.stats().misses == 7
+    
+    threaded = ConversionCache.for_conversion('spherical_to_cartesian', maxsize=8)
+    spherical = [SphericalPoint(rng.uniform(1, 10), rng.uniform(-math.pi, math.pi),
+                                rng.uniform(0, math.pi)) for _ in range(32)]
+    errors = []
+    
+    def worker(seed):
+        local = random.Random(seed)
+        for _ in range(2000):
+            s = local.choice(spherical)
+            if threaded(s) != CartesianPoint3D.from_spherical(s):
+                errors.append(s)
+    
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    thread_stats = threaded.stats()
+    
+    with conversion_cache(maxsize=16) as caches:
+        module_same = all(CartesianPoint2D.from_polar(p) == uncached(p) for p in stream)
+        module_hits = caches['polar_to_cartesian'].stats().hits
+    restored = CartesianPoint2D.from_polar is uncached
+    enable_conversion_cache(conversions=['cartesian_to_polar'])
+    partial = (PolarPoint.from_cartesian is not uncached_to_polar
+               and CartesianPoint2D.from_polar is uncached)
+    disable_conversion_cache()
+    restored = restored and PolarPoint.from_cartesian is uncached_to_polar
+    
+    # Кеш поверх інструментування: промахи рахуються, вимкнення кешу лишає обгортку
+    from instrumentation import instrumented, instrumentation_stats
+    with instrumented():
+        wrapped = CartesianPoint2D.from_polar
+        with conversion_cache(maxsize=len(stations)):
+            for p in stream:
+                CartesianPoint2D.from_polar(p)
+        calls = instrumentation_stats(include_idle=True)['CartesianPoint2D.from_polar'].calls
+        keeps_wrapper = CartesianPoint2D.from_polar is wrapped
+    # Інструментування поверх кешу: вимкнення кешу не знімає обгортку
+    enable_conversion_cache(maxsize=len(stations))
+    with instrumented():
+        wrapped = CartesianPoint2D.from_polar
+        disable_conversion_cache()
+        keeps_wrapper = keeps_wrapper and CartesianPoint2D.from_polar is wrapped
+        for p in stations:
+            CartesianPoint2D.from_polar(p)
+        outer_calls = instrumentation_stats(include_idle=True)['CartesianPoint2D.from_polar'].calls
+    detached = all(CartesianPoint2D.from_polar(p) == uncached(p) for p in stations)
+    layered = (keeps_wrapper and calls == len(stations) and outer_calls == len(stations)
+               and detached)
+    
+    checks = [
+        ("Кешовані результати збігаються з некешованими", same),
+        (f"Лічильники: {stats}", stats.hits + stats.misses == len(stream)
+         and stats.misses == len(set(stream)) and stats.evictions == 0),
+        ("Витіснення найдавніше використаного запису", lru),
+        ("Знак нуля розрізняється", signed_zeros),
+        ("NaN не додає записів у кеш", nan_skipped),
+        (f"Кілька потоків: {thread_stats}", not errors and thread_stats.size <= 8
+         and thread_stats.hits + thread_stats.misses == 4 * 2000),
+        ("Увімкнення для модуля", module_same and module_hits > 0),
+        ("Вимкнення повертає некешовані методи", restored),
+        ("Увімкнення лише вибраних перетворень", partial),
+        (f"Разом з інструментуванням: {calls} промахів, обгортки збережено", layered),
+    ]
+    
+    for name, passed in checks:
+        print(f"  {'✓' if passed else '✗'} {name}")
+    
+    assert all(passed for _, passed in checks)
+
+
+def test_streaming_aggregates():
+    """Потокові агрегати збігаються з обчисленням на повному списку відстаней"""
+    print("\n" + "=" * 70)
+    print("ПЕРЕВІРКА ПОТОКОВИХ АГРЕГАТІВ ВІДСТАНЕЙ")
+    print("=" * 70)
+    
+    import statistics
+    import subprocess
+    import sys
+    from aggregates import (
+        DistanceAggregate, QuantileSketch, aggregate_chunks, aggregate_pairs, merge_all
+    )
+    from distances import distance_3d_spherical_arc, distance_3d_spherical_arc_batch
+    
+    rng = random.Random(31)
+    pairs = [(SphericalPoint(10, rng.uniform(-math.pi, math.pi), rng.uniform(0, math.pi)),
+              SphericalPoint(10, rng.uniform(-math.pi, math.pi), rng.uniform(0, math.pi)))
+             for _ in range(5000)]
+    distances = sorted(distance_3d_spherical_arc(a, b) for a, b in pairs)
+    histogram = (0.0, 10 * math.pi, 16)
+    
+    whole = aggregate_pairs(pairs, 'spherical_arc', chunk_size=700, histogram=histogram)
+    scalar = aggregate_pairs(pairs, distance_3d_spherical_arc, chunk_size=1000,
+                             histogram=histogram)
+    # Фрагменти колонок, агреговані окремо і потім об'єднані (як від різних процесів)
+    a = SphericalArray.from_points([p for p, _ in pairs])
+    b = SphericalArray.from_points([q for _, q in pairs])
+    parts = [aggregate_chunks([(a[i:i + 1234], b[i:i + 1234])], 'spherical_arc',
+                              histogram=histogram)
+             for i in range(0, len(pairs), 1234)]
+    merged = merge_all(parts)
+    one_by_one = DistanceAggregate(histogram)
+    for value in distance_3d_spherical_arc_batch(a, b):
+        one_by_one.add(value)
+    
+    width = histogram[1] / histogram[2]
+    expected_counts = [sum(1 for d in distances if i * width <= d < (i + 1) * width)
+                       for i in range(histogram[2])]
+    
+    def close(x, y, tolerance=1e-9):
+        return abs(x - y) <= tolerance * max(1.0, abs(y))
+    
+    def matches(aggregate):
+        stats = aggregate.stats
+        return (stats.count == len(distances)
+                and stats.min == distances[0] and stats.max == distances[-1]
+                and close(stats.mean, statistics.fmean(distances))
+                and close(stats.variance, statistics.pvariance(distances))
+                and aggregate.histogram.counts == expected_counts)
+    
+    # Квантилі ескізу: відносна похибка не більша за α для того самого рангу
+    quantile_errors = [
+        abs(whole.quantile(q) - distances[int(q * (len(distances) - 1))])
+        / distances[int(q * (len(distances) - 1))]
+        for q in (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0)]
+    accuracy = whole.sketch.relative_accuracy
+    
+    # Нескінченність і NaN відхиляються як ValueError, а не OverflowError зі швидкого шляху
+    rejected = []
+    for bad in (math.inf, math.nan):
+        try:
+            QuantileSketch().add_many([1.0, bad])
+        except ValueError:
+            rejected.append(bad)
+    
+    # Некоректний фрагмент відхиляється цілком: жодна статистика агрегату не змінюється
+    untouched = []
+    for bad in (math.inf, math.nan, -1.0):
+        aggregate = DistanceAggregate(histogram)
+        aggregate.add_many([1.0, 2.0])
+        try:
+            aggregate.add_many([3.0, bad, 4.0])
+        except ValueError:
+            untouched.append(aggregate.stats.count == aggregate.sketch.count
+                             == aggregate.histogram.total == 2
+                             and aggregate.stats.mean == 1.5 and aggregate.stats.max == 2.0)
+    
+    # Агрегати не тягнуть за собою пул процесів і спільну пам'ять
+    result = subprocess.run(
+        [sys.executable, '-c', "import sys, aggregates; print('parallel' in sys.modules)"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    
+    checks = [
+        ("Пакетна агрегація пар збігається зі statistics", matches(whole)),
+        ("Скалярна функція відстані", matches(scalar)),
+        ("Об'єднання часткових агрегатів фрагментів", matches(merged) and len(parts) > 1),
+        ("Оновлення по одному значенню (Велфорд)", matches(one_by_one)),
+        (f"Квантилі в межах α = {accuracy:g} (max {max(quantile_errors):.2e})",
+         max(quantile_errors) <= accuracy),
+        ("Ескіз займає обмежену пам'ять",
+         len(whole.sketch.buckets) <= whole.sketch.max_buckets),
+        ("Нескінченність і NaN у ескізі дають ValueError", len(rejected) == 2),
+        ("Агрегат відхиляє фрагмент з inf, NaN чи від'ємним до оновлення статистик",
+         untouched == [True, True, True]),
+        ("Імпорт aggregates не завантажує parallel", result.stdout.strip() == 'False'),
+    ]
+    
+    for name, passed in checks:
+        print(f"  {'✓' if passed else '✗'} {name}")
+    
+    assert all(passed for _, passed in checks)
+
+
+def test_fused_conversions():
+    """Перевірка реєстру перетворень: пошук шляху та злиті ядра проти ланцюжка викликів"""
+    print("\n" + "=" * 70)
+    print("ПЕРЕВІРКА ЗЛИТИХ БАГАТОКРОКОВИХ ПЕРЕТВОРЕНЬ")
+    print("=" * 70)
+    
+    from conversion_registry import compile_conversion, convert, find_path
+    from point_io import CONVERSIONS, convert_points
+    
+    # Скалярні прямі перетворення для еталонного ланцюжка
+    direct = {
+        ('polar', 'cartesian_2d'): CartesianPoint2D.from_polar,
+        ('cartesian_2d', 'polar'): PolarPoint.from_cartesian,
+        ('spherical', 'cartesian_3d'): CartesianPoint3D.from_spherical,
+        ('cartesian_3d', 'spherical'): SphericalPoint.from_cartesian,
+        ('cylindrical', 'cartesian_3d'): CartesianPoint3D.from_cylindrical,
+        ('cartesian_3d', 'cylindrical'): CylindricalPoint.from_cartesian,
+    }
+    rng = random.Random(43)
+    samples = {
+        'polar': [PolarPoint(rng.uniform(0, 10), rng.uniform(-math.pi, math.pi)) for _ in range(300)],
+        'cartesian_2d': [CartesianPoint2D(rng.uniform(-10, 10), rng.uniform(-10, 10)) for _ in range(300)],
+        'spherical': [SphericalPoint(rng.uniform(0, 10), rng.uniform(-math.pi, math.pi),
+                                     rng.uniform(0, math.pi)) for _ in range(300)],
+        'cartesian_3d': [CartesianPoint3D(rng.uniform(-10, 10), rng.uniform(-10, 10),
+                                          rng.uniform(-10, 10)) for _ in range(299)]
+                        + [CartesianPoint3D(0.0, 0.0, 0.0)],
+        'cylindrical': [CylindricalPoint(rng.uniform(0, 10), rng.uniform(-math.pi, math.pi),
+                                         rng.uniform(-10, 10)) for _ in range(300)],
+    }
+    arrays = {'polar': PolarArray, 'cartesian_2d': CartesianArray2D, 'spherical': SphericalArray,
+              'cartesian_3d': CartesianArray3D, 'cylindrical': CylindricalArray}
+    
+    checks = [
+        ("Шлях циліндрична -> сферична через декартову",
+         find_path('cylindrical', 'spherical') == ('cylindrical', 'cartesian_3d', 'spherical')),
+    ]
+    try:
+        find_path('polar', 'spherical')
+        checks.append(("Немає шляху між 2D і 3D -> ValueError", False))
+    except ValueError:
+        checks.append(("Немає шляху між 2D і 3D -> ValueError", True))
+    
+    groups = [('polar', 'cartesian_2d'), ('spherical', 'cartesian_3d', 'cylindrical')]
+    for group in groups:
+        for source in group:
+            for target in group:
+                if source == target:
+                    continue
+                fused = compile_conversion(source, target)
+                points = samples[source]
+                chained, chained_batch = points, arrays[source].from_points(points)
+                for start, end in zip(fused.path, fused.path[1:]):
+                    chained = [direct[(start, end)](p) for p in chained]
+                    chained_batch = CONVERSIONS[(start, end)](chained_batch)
+                checks.append((f"{' -> '.join(fused.path)}: скалярне та пакетне = ланцюжку",
+                               [fused(p) for p in points] == chained
+                               and fused.batch(arrays[source].from_points(points)) == chained_batch))
+    
+    cylindrical = CylindricalArray.from_points(samples['cylindrical'])
+    checks.append(("convert() та point_io.convert_points через реєстр",
+                   convert(samples['cylindrical'][0], 'spherical')
+                   == SphericalPoint.from_cartesian(CartesianPoint3D.from_cylindrical(samples['cylindrical'][0]))
+                   and convert_points(cylindrical, 'spherical')
+                   == compile_conversion('cylindrical', 'spherical').batch(cylindrical)))
+    
+    for name, passed in checks:
+        print(f"  {'✓' if passed else '✗'} {name}")
+    
+    assert all(passed for _, passed in checks)
+
+
+def test_parallel_engine():
+    """Перевірка паралельного режиму: результат збігається з однопроцесним"""
+    print("\n" + "=" * 70)
+    print("ПЕРЕВІРКА ПАРАЛЕЛЬНОГО РЕЖИМУ (СПІЛЬНА ПАМ'ЯТЬ)")
+    print("=" * 70)
+    
+    from distances import distance_3d_spherical_arc_batch, distance_2d_polar_batch
+    from parallel import parallel_distances, parallel_convert
+    
+    rng = random.Random(17)
+    n = 5000
+    spherical_a = SphericalArray.from_points([
+        SphericalPoint(rng.uniform(1, 10), rng.uniform(0, 2 * math.pi), rng.uniform(0, math.pi))
+        for _ in range(n)])
+    spherical_b = SphericalArray.from_points([
+        SphericalPoint(rng.uniform(1, 10), rng.uniform(0, 2 * math.pi), rng.uniform(0, math.pi))
+        for _ in range(n)])
+    polar = PolarArray.from_points([PolarPoint(rng.uniform(1, 10), rng.uniform(0, 2 * math.pi))
+                                    for _ in range(n)])
+    # Малий chunk_size змушує розбити роботу на кілька фрагментів
+    options = dict(workers=2, chunk_size=1200)
+    
+    checks = [
+        ("Відстані: дві колонки",
+         parallel_distances(spherical_a, spherical_b, 'spherical_arc', **options) ==
+         distance_3d_spherical_arc_batch(spherical_a, spherical_b)),
+        ("Відстані: точка + колонка",
+         parallel_distances(polar[0], polar, 'polar_2d', **options) ==
+         distance_2d_polar_batch(polar[0], polar)),
+        ("Перетворення сферична -> декартова",
+         parallel_convert(spherical_a, 'spherical_to_cartesian', **options) ==
+         CartesianArray3D.from_spherical(spherical_a)),
+    ]
+    
+    for name, passed in checks:
+        print(f"  {'✓' if passed else '✗'} {name}")
+    
+    assert all(passed for _, passed in checks)
+
+
+def test_streaming_io():
+    """Перевірка потокового читання/запису: фрагменти та збереження точності"""
+    print("\n" + "=" * 70)
+    print("ПЕРЕВІРКА ПОТОКОВОГО ВВЕДЕННЯ/ВИВЕДЕННЯ")
+    print("=" * 70)
+    
+    from point_io import convert_file, iter_chunks, write_chunks
+    
+    rng = random.Random(19)
+    spherical = SphericalArray.from_points([
+        SphericalPoint(rng.uniform(0, 100), rng.uniform(-math.pi, math.pi), rng.uniform(0, math.pi))
+        for _ in range(2500)])
+    expected = CartesianArray3D.from_spherical(spherical).to_points()
+    
+    checks = []
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "spherical.csv")
+        write_chunks(source, [spherical[:1000], spherical[1000:]], 'csv')
+        
+        chunks = list(iter_chunks(source, 'spherical', 'csv', chunk_size=600))
+        checks.append(("CSV читається фрагментами по 600 точок",
+                       [len(c) for c in chunks] == [600, 600, 600, 600, 100]))
+        checks.append(("CSV без втрати точності",
+                       [p for c in chunks for p in c] == spherical.to_points()))
+        
+        for fmt in ('binary', 'csv'):
+            target = os.path.join(tmp, "cartesian." + fmt)
+            count = convert_file(source, target, 'spherical', 'cartesian_3d',
+                                 'csv', fmt, chunk_size=700)
+            converted = [p for c in iter_chunks(target, 'cartesian_3d', fmt, 700) for p in c]
+            checks.append((f"Конвеєр spherical.csv -> cartesian.{fmt}",
+                           count == len(spherical) and converted == expected))
+        
+        # Колонки float32 записуються у файл як float64 без втрат
+        compact = spherical.astype('float32')
+        for fmt in ('binary', 'csv'):
+            target = os.path.join(tmp, "float32." + fmt)
+            write_chunks(target, [compact[:1000], compact[1000:]], fmt)
+            restored = [p for c in iter_chunks(target, 'spherical', fmt, 700) for p in c]
+            checks.append((f"Фрагменти float32 -> {fmt}", restored == compact.to_points()))
+    
+    for name, passed in checks:
+        print(f"  {'✓' if passed else '✗'} {name}")
+    
+    assert all(passed for _, passed in checks)
+
+
+def test_point_store():
+    """Перевірка бінарного сховища: mmap без копіювання та пакетні API на view"""
+    print("\n" + "=" * 70)
+    print("ПЕРЕВІРКА БІНАРНОГО СХОВИЩА ТОЧОК (MMAP)")
+    print("=" * 70)
+    
+    from distances import distance_2d_polar_batch
+    from point_store import open_store, write_store
+    
+    rng = random.Random(23)
+    polar = PolarArray.from_points([PolarPoint(rng.uniform(0, 100), rng.uniform(-math.pi, math.pi))
+                                    for _ in range(3000)])
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "polar.pts")
+        write_store(path, polar)
+        with open_store(path) as store:
+            mapped = store.points
+            checks = [
+                ("Заголовок: система та кількість",
+                 store.system == 'polar' and len(store) == len(polar)),
+                ("Колонки є memoryview над файлом",
+                 all(isinstance(c, memoryview) for c in mapped.columns())),
+                ("Значення збігаються з записаними", mapped == polar),
+                ("Перетворення приймає mapped view",
+                 CartesianArray2D.from_polar(mapped) == CartesianArray2D.from_polar(polar)),
+                ("Відстані приймають mapped view",
+                 distance_2d_polar_batch(mapped, polar[0]) == distance_2d_polar_batch(polar, polar[0])),
+            ]
+            del mapped
+    
+    for name, passed in checks:
+        print(f"  {'✓' if passed else '✗'} {name}")
+    
+    assert all(passed for _, passed in checks)
+
+
+def test_buffer_interop():
+    """Перевірка буферного протоколу: набори точок і результати без копіювання"""
+    print("\n" + "=" * 70)
+    print("ПЕРЕВІРКА БУФЕРНОГО ПРОТОКОЛУ (БЕЗ КОПІЮВАННЯ)")
+    print("=" * 70)
+    
+    from distances import distance_3d_cartesian_batch, distance_2d_polar_batch
+    
+    rng = random.Random(37)
+    cartesian = CartesianArray3D.from_points([
+        CartesianPoint3D(rng.uniform(-10, 10), rng.uniform(-10, 10), rng.uniform(-10, 10))
+        for _ in range(500)])
+    n = len(cartesian)
+    
+    # Колонки одна за одною у спільному масиві
+    columns = array('d', [*cartesian.x, *cartesian.y, *cartesian.z])
+    by_columns = CartesianArray3D.from_buffer(columns)
+    # Координати точок поспіль у bytearray (як від C-розширення чи з мережі)
+    packed = bytearray(cartesian.to_buffer('interleaved'))
+    interleaved = CartesianArray3D.from_buffer(packed, layout='interleaved')
+    
+    checks = [
+        ("from_buffer('columns') = from_points", by_columns == cartesian),
+        ("from_buffer('interleaved') = from_points", interleaved == cartesian),
+        ("Колонки — memoryview над тим самим буфером",
+         all(isinstance(c, memoryview) and c.obj is columns for c in by_columns.columns())),
+    ]
+    
+    # Без копіювання: зміни в буфері одразу видно в точках і навпаки
+    columns[n + 5] = 123.0
+    memoryview(packed).cast('d')[3 * 7 + 2] = -42.0
+    checks.append(("Запис у буфер видно в наборі точок",
+                   by_columns[5].y == 123.0 and interleaved[7].z == -42.0))
+    exported = by_columns.to_buffer()
+    exported[0] = 7.5
+    checks.append(("to_buffer набору з from_buffer віддає ту саму пам'ять",
+                   columns[0] == 7.5 and by_columns[0].x == 7.5))
+    columns[0], columns[n + 5] = cartesian.x[0], cartesian.y[5]
+    memoryview(packed).cast('d')[3 * 7 + 2] = cartesian.z[7]
+    
+    checks.append(("to_buffer: обидва розташування",
+                   list(cartesian.to_buffer()) == list(columns)
+                   and CartesianArray3D.from_buffer(cartesian.to_buffer('interleaved'),
+                                                    'interleaved') == cartesian))
+    
+    # Результат відстаней прямо в пам'ять отримувача
+    expected = distance_3d_cartesian_batch(cartesian, CartesianPoint3D(1.0, 2.0, 3.0))
+    out = array('d', [0.0]) * n
+    raw = bytearray(8 * n)
+    returned = distance_3d_cartesian_batch(interleaved, CartesianPoint3D(1.0, 2.0, 3.0), out=out)
+    distance_3d_cartesian_batch(by_columns, CartesianPoint3D(1.0, 2.0, 3.0), out=raw)
+    checks.append(("out=: результат записано у переданий буфер",
+                   returned is out and out == expected
+                   and list(memoryview(raw).cast('d')) == list(expected)))
+    
+    polar = PolarArray.from_buffer(array('d', [1.0, 2.0, 0.0, 0.5]))
+    errors = []
+    for name, call in [
+        ("out= неправильної довжини", lambda: distance_2d_polar_batch(polar, polar, out=array('d', [0.0]))),
+        ("out= лише для читання", lambda: distance_2d_polar_batch(polar, polar, out=bytes(16))),
+        ("Буфер не float64", lambda: PolarArray.from_buffer(array('i', [1, 2]))),
+        ("Кількість значень не ділиться на ширину", lambda: CartesianArray3D.from_buffer(array('d', [1.0, 2.0]))),
+    ]:
+        try:
+            call()
+            errors.append((name, False))
+        except (TypeError, ValueError):
+            errors.append((name, True))
+    checks.extend((f"{name} -> помилка", passed) for name, passed in errors)
+    
+    for name, passed in checks:
+        print(f"  {'✓' if passed else '✗'} {name}")
+    
+    assert all(passed for _, passed in checks)
+
+
+def test_data_generator():
+    """Перевірка генератора даних: відтворюваність незалежно від фрагментації та пулу"""
+    print("\n" + "=" * 70)
+    print("ПЕРЕВІРКА ГЕНЕРАТОРА ТЕСТОВИХ ДАНИХ")
+    print("=" * 70)
+    
+    from data_generator import DISTRIBUTIONS, generate, generate_chunk, iter_chunks
+    
+    n = 5000
+    checks = []
+    for name in DISTRIBUTIONS:
+        whole = generate(name, n, seed=7, chunk_size=1024)
+        streamed = [p for chunk in iter_chunks(name, n, seed=7, chunk_size=1024) for p in chunk]
+        checks.append((f"{name}: потік фрагментів = цілий набір", streamed == whole.to_points()))
+        checks.append((f"{name}: фрагмент 3 генерується окремо",
+                       generate_chunk(name, n, 3, seed=7, chunk_size=1024) == whole[3072:4096]))
+    
+    pooled = generate('clustered_on_sphere', n, seed=7, chunk_size=1024, workers=2)
+    checks.append(("Пул з 2 процесів дає той самий набір",
+                   pooled == generate('clustered_on_sphere', n, seed=7, chunk_size=1024)))
+    checks.append(("Різні потоки незалежні",
+                   generate('uniform_polar', 100, stream=1) != generate('uniform_polar', 100)))
+    
+    polar = generate('uniform_polar', n, radius=(2.0, 3.0))
+    checks.append(("uniform_polar: межі радіуса та кута",
+                   2.0 <= min(polar.radius) and max(polar.radius) < 3.0
+                   and 0.0 <= min(polar.angle) and max(polar.angle) < 2 * math.pi))
+    
+    # Рівномірність за площею: середнє cos θ ≈ 0, середнє cos² θ ≈ 1/3
+    sphere = generate('uniform_on_sphere', 20_000, radius=6371.0)
+    cosines = [math.cos(t) for t in sphere.polar_angle]
+    checks.append(("uniform_on_sphere: радіус сталий, cos θ рівномірний",
+                   set(sphere.radius) == {6371.0}
+                   and abs(math.fsum(cosines) / len(cosines)) < 0.02
+                   and abs(math.fsum(c * c for c in cosines) / len(cosines) - 1 / 3) < 0.02))
+    
+    clustered = generate('clustered_2d', n, clusters=4, spread=0.5, extent=1000.0)
+    occupied = {(round(x / 50), round(y / 50)) for x, y in zip(clustered.x, clustered.y)}
+    checks.append((f"clustered_2d: точки зосереджені ({len(occupied)} комірок 50×50)",
+                   len(occupied) <= 16))
+    
+    for name, passed in checks:
+        print(f"  {'✓' if passed else '✗'} {name}")
+    
+    assert all(passed for _, passed in checks)
+
+
+# Модулі, з яких може починатися імпорт (точки входу та модулі зі змінними середовища)
+ENTRY_MODULES = ('distances', 'instrumentation', 'backends', 'main', 'service',
+                 'benchmark', 'load_generator', 'parallel')
+
+
+def test_instrumentation():
+    """Перевірка інструментування: лічильники, розміри пакетів, повне відновлення функцій"""
+    print("\n" + "=" * 70)
+    print("ПЕРЕВІРКА ІНСТРУМЕНТУВАННЯ")
+    print("=" * 70)
+    
+    import json
+    import subprocess
+    import sys
+    import distances
+    import distance_matrix
+    from instrumentation import format_report, instrumentation_stats, instrumented, to_json
+    
+    original_polar = distances.distance_2d_polar
+    original_batch = distances.distance_2d_polar_batch
+    original_from_polar = CartesianArray2D.from_polar
+    rng = random.Random(31)
+    polar = PolarArray.from_points([PolarPoint(rng.uniform(1, 10), rng.uniform(-math.pi, math.pi))
+                                    for _ in range(50)])
+    
+    with instrumented():
+        for p in polar.to_points()[:3]:
+            distances.distance_2d_polar(p, PolarPoint(1.0, 0.0))
+        CartesianArray2D.from_polar(polar)
+        distances.DISTANCE_KERNELS['polar_2d'][1](polar, polar)
+        list(distance_matrix.iter_distance_tiles(polar[:4], polar[:5], 'polar_2d'))
+        inside = distances.distance_2d_polar is not original_polar
+    distances.distance_2d_polar(PolarPoint(1.0, 0.0), PolarPoint(2.0, 0.0))
+    
+    stats = instrumentation_stats()
+    exported = json.loads(to_json())
+    checks = [
+        ("Обгортки встановлені лише всередині блоку", inside),
+        ("Скалярні виклики", stats['distance_2d_polar'].calls == 3
+         and stats['distance_2d_polar'].items == 3),
+        ("Розмір пакета перетворення",
+         stats['CartesianArray2D.from_polar'].calls == 1
+         and stats['CartesianArray2D.from_polar'].max_batch == 50),
+        ("Виклики через реєстр DISTANCE_KERNELS (зокрема з distance_matrix)",
+         stats['distance_2d_polar_batch'].calls == 5
+         and stats['distance_2d_polar_batch'].items == 70),
+        ("Після блоку функції — оригінали",
+         distances.distance_2d_polar is original_polar
+         and CartesianArray2D.from_polar is original_from_polar
+         and distances.DISTANCE_KERNELS['polar_2d'][1] is original_batch),
+        ("JSON та текстовий звіт",
+         exported['distance_2d_polar']['calls'] == 3 and 'distance_2d_polar_batch' in format_report()),
+    ]
+    
+    # Увімкнення змінною середовища: JSON записується при виході
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stats.json")
+        env = dict(os.environ, COORDINATES_INSTRUMENT=path)
+        subprocess.run([sys.executable, '-c',
+                        'import distances\n'
+                        'distances.enable_from_environment()\n'
+                        'from distances import distance_3d_spherical_arc as arc\n'
+                        'from coordinate_systems import SphericalPoint as S\n'
+                        '[arc(S(1, 0, 1), S(1, 1, 1)) for _ in range(7)]'],
+                       env=env, check=True, cwd=package_dir)
+        with open(path, encoding='utf-8') as f:
+            from_env = json.load(f)
+        # Точка входу командного рядка застосовує змінну сама
+        subprocess.run([sys.executable, os.path.join(package_dir, 'main.py'),
+                        'distance', '--metric', 'spherical_arc', '--no-header'],
+                       input='1,0,1,1,1,1\n' * 3, env=env, check=True, cwd=package_dir,
+                       capture_output=True, text=True)
+        with open(path, encoding='utf-8') as f:
+            from_cli = json.load(f)
+    checks.append(("Змінна COORDINATES_INSTRUMENT вмикає запис JSON",
+                   from_env.get('distance_3d_spherical_arc', {}).get('calls') == 7))
+    checks.append(("main.py distance застосовує COORDINATES_INSTRUMENT",
+                   from_cli.get('distance_3d_spherical_arc_batch', {}).get('items') == 3))
+    
+    # Імпорт будь-якого модуля першим не падає на циклі distances ↔ instrumentation
+    env = dict(os.environ, COORDINATES_INSTRUMENT='1')
+    failed = [module for module in ENTRY_MODULES
+              if subprocess.run([sys.executable, '-c', f'import {module}'], env=env,
+                                cwd=package_dir, capture_output=True).returncode != 0]
+    checks.append((f"Імпорт модулів зі змінною середовища{': ' + ', '.join(failed) if failed else ''}",
+                   not failed))
+    
+    for name, passed in checks:
+        print(f"  {'✓' if passed else '✗'} {name}")
+    
+    assert all(passed for _, passed in checks)
+
+
+def test_backends():
+    """Перевірка бекендів: збіг з еталоном, вибір за розміром пакета, калібрування, відновлення"""
+    print("\n" + "=" * 70)
+    print("ПЕРЕВІРКА БЕКЕНДІВ ВІДСТАНЕЙ І ПЕРЕТВОРЕНЬ")
+    print("=" * 70)
+    
+    import subprocess
+    import sys
+    import distances
+    import backends
+    
+    rng = random.Random(37)
+    n = 300
+    
+    def column(low, high):
+        return [rng.uniform(low, high) for _ in range(n)]
+    
+    cartesian_2d = CartesianArray2D(column(-50, 50), column(-50, 50))
+    polar = PolarArray(column(0, 50), column(-math.pi, math.pi))
+    cartesian_3d = CartesianArray3D(column(-50, 50), column(-50, 50), column(-50, 50))
+    spherical = SphericalArray(column(1, 50), column(-math.pi, math.pi), column(0, math.pi))
+    others = {type(a): type(a)(*(list(reversed(c)) for c in a.columns()))
+              for a in (cartesian_2d, polar, cartesian_3d, spherical)}
+    calls = {
+        'distance_2d_cartesian_batch': [(cartesian_2d, others[CartesianArray2D]),
+                                        (cartesian_2d, CartesianPoint2D(1.0, -2.0))],
+        'distance_2d_polar_batch': [(polar, others[PolarArray]), (PolarPoint(3.0, 1.0), polar)],
+        'distance_3d_cartesian_batch': [(cartesian_3d, others[CartesianArray3D]),
+                                        (CartesianPoint3D(1.0, 2.0, 3.0), cartesian_3d)],
+        'distance_3d_spherical_chord_batch': [(spherical, others[SphericalArray])],
+        'distance_3d_spherical_arc_batch': [(spherical, others[SphericalArray]),
+                                            (spherical, SphericalPoint(10.0, 0.5, 1.0))],
+        'CartesianArray2D.from_polar': [(polar,)],
+        'PolarArray.from_cartesian': [(cartesian_2d,)],
+        'CartesianArray3D.from_spherical': [(spherical,)],
+        'SphericalArray.from_cartesian': [(cartesian_3d,)],
+    }
+    reference = backends.BACKENDS['python'].kernels
+    haversine_operations = ('distance_2d_polar_batch', 'distance_3d_spherical_chord_batch',
+                              'distance_3d_spherical_arc_batch')
+    
+    def values(result):
+        return [v for c in result.columns() for v in c] if hasattr(result, 'columns') else list(result)
+    
+    def close(result, expected):
+        # Поза еталоном acos біля ±1 втрачає половину розрядів (див. backends)
+        return len(result) == len(expected) and all(
+            abs(a - b) <= 1e-7 * max(1.0, abs(b)) for a, b in zip(result, expected))
+    
+    checks = []
+    for name in backends.available_backends():
+        backend = backends.BACKENDS[name]
+        passed = True
+        for operation, kernel in backend.kernels.items():
+            for arguments in calls[operation]:
+                expected = values(reference[operation](*arguments))
+                passed &= close(values(kernel(*arguments)), expected)
+                if operation in haversine_operations:
+                    passed &= close(values(kernel(*arguments, haversine=True)),
+                                    values(reference[operation](*arguments, haversine=True)))
+        out = bytearray(8 * n)
+        result = backend.kernels.get('distance_3d_cartesian_batch', reference['distance_3d_cartesian_batch'])(
+            cartesian_3d, others[CartesianArray3D], out=out)
+        passed &= result is out and close(memoryview(out).cast('d').tolist(),
+                                          list(distances.distance_3d_cartesian_batch(
+                                              cartesian_3d, others[CartesianArray3D])))
+        checks.append((f"{name}: збіг з еталоном ({len(backend.kernels)} операцій, out=)", passed))
+    
+    # Вибір за розміром пакета: до 100 точок — еталон, далі — stdlib
+    original = distances.distance_2d_cartesian_batch
+    stdlib = backends.BACKENDS['stdlib'].kernels['distance_2d_cartesian_batch']
+    backends.apply_calibration(backends.Calibration(
+        {'distance_2d_cartesian_batch': ((0, 'python'), (100, 'stdlib'))}))
+    small, large = cartesian_2d[:99], cartesian_2d[:100]
+    checks.append(("Диспетчер за розміром пакета та підміна в інших модулях",
+                   distances.distance_2d_cartesian_batch is not original
+                   and distances.DISTANCE_KERNELS['cartesian_2d'][1] is distances.distance_2d_cartesian_batch
+                   and distances.distance_2d_cartesian_batch(small, small[0]) == original(small, small[0])
+                   and distances.DISTANCE_KERNELS['cartesian_2d'][1](large, large[0]) == stdlib(large, large[0])))
+    backends.use_backend('stdlib')
+    selected = backends.active_backends()
+    checks.append(("use_backend: відсутні операції лишаються еталонними",
+                   selected['distance_2d_cartesian_batch'] == ((0, 'stdlib'),)
+                   and selected['distance_2d_polar_batch'] == ((0, 'python'),)
+                   and PolarArray.from_cartesian is backends.BACKENDS['stdlib'].kernels['PolarArray.from_cartesian']))
+    backends.reset_backends()
+    checks.append(("reset_backends повертає оригінали скрізь",
+                   distances.distance_2d_cartesian_batch is original
+                   and distances.DISTANCE_KERNELS['cartesian_2d'][1] is original
+                   and PolarArray.from_cartesian is reference['PolarArray.from_cartesian']))
+    
+    # Інструментування поверх бекенду змінює лише реєстри та атрибути власників,
+    # а не посилання всередині backends
+    from instrumentation import instrumented
+    backends.use_backend('stdlib')
+    with instrumented():
+        wrapped = distances.distance_2d_cartesian_batch.__wrapped__ is stdlib
+        untouched = (backends.BACKENDS['stdlib'].kernels['distance_2d_cartesian_batch'] is stdlib
+                     and not hasattr(backends._stdlib_distance_2d_cartesian, '__wrapped__'))
+    backends.reset_backends()
+    checks.append(("Інструментування не переписує функції всередині backends", wrapped and untouched))
+    # Еталон 'python' — оригінали, навіть якщо backends імпортовано після увімкнення обгорток
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run(
+        [sys.executable, '-c', 'import instrumentation; instrumentation.enable_instrumentation(); '
+                               'import backends; print(any(hasattr(f, "__wrapped__") '
+                               'for f in backends.BACKENDS["python"].kernels.values()))'],
+        capture_output=True, text=True, cwd=package_dir)
+    checks.append(("Еталон 'python' не містить обгорток інструментування", result.stdout.strip() == 'False'))
+    
+    try:
+        backends.use_backend('stdlib', ['distance_2d_polar_batch'])
+        rejected = False
+    except ValueError:
+        rejected = True
+    checks.append(("Явний вибір непідтримуваної операції відхиляється", rejected))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "backends.json")
+        calibration = backends.calibrate(sizes=(8, 512), repeat=1,
+                                         operations=['distance_3d_cartesian_batch', 'distance_2d_polar_batch'])
+        calibration.save(path)
+        loaded = backends.auto_select(path)
+        # Операції з єдиним кандидатом не міряються
+        candidates = {op: {b.name for b in backends.BACKENDS.values() if op in b.kernels}
+                      for op in calibration.choices}
+        measured = all(set(calibration.timings[op][8]) == names if len(names) > 1
+                       else op not in calibration.timings for op, names in candidates.items())
+        checks.append(("Калібрування: збереження, завантаження без повторного заміру",
+                       loaded == calibration and measured
+                       and backends.active_backends()['distance_3d_cartesian_batch']
+                       == calibration.choices['distance_3d_cartesian_batch']))
+        backends.reset_backends()
+        
+        # Вибір змінною середовища в окремому процесі; з інструментуванням
+        # обгортки лягають поверх диспетчерів бекендів
+        env = dict(os.environ, COORDINATES_BACKEND='stdlib')
+        result = subprocess.run(
+            [sys.executable, '-c', 'import distances; distances.enable_from_environment(); '
+                                   'print(distances.distance_3d_cartesian_batch.__module__)'],
+            env=env, capture_output=True, text=True, cwd=package_dir)
+        checks.append(("Змінна COORDINATES_BACKEND вибирає бекенд", result.stdout.strip() == 'backends'))
+        result = subprocess.run(
+            [sys.executable, '-c', 'import distances; distances.enable_from_environment(); '
+                                   'print(distances.distance_3d_cartesian_batch.__wrapped__.__module__)'],
+            env=dict(env, COORDINATES_INSTRUMENT=os.path.join(tmp, "stats.json")),
+            capture_output=True, text=True, cwd=package_dir)
+        checks.append(("Інструментування обгортає вибраний бекенд", result.stdout.strip() == 'backends'))
+        
+        # Точка входу та імпорт будь-якого модуля першим зі змінною середовища
+        env = dict(os.environ, COORDINATES_BACKEND='python')
+        result = subprocess.run(
+            [sys.executable, os.path.join(package_dir, 'main.py'), 'calibrate', '--show', '--cache', path],
+            env=env, capture_output=True, text=True, cwd=package_dir)
+        checks.append(("main.py calibrate --show зі змінною COORDINATES_BACKEND",
+                       result.returncode == 0 and 'distance_3d_cartesian_batch' in result.stdout))
+        failed = [module for module in ENTRY_MODULES
+                  if subprocess.run([sys.executable, '-c', f'import {module}'], env=env,
+                                    cwd=package_dir, capture_output=True).returncode != 0]
+        checks.append((f"Імпорт модулів зі змінною середовища{': ' + ', '.join(failed) if failed else ''}",
+                       not failed))
+    
+    for name, passed in checks:
+        print(f"  {'✓' if passed else '✗'} {name}")
+    
+    assert all(passed for _, passed in checks)
+
+
+def test_batch_cli():
+    """Перевірка неінтерактивного CLI: main.py convert/distance через файли та канали"""
+    print("\n" + "=" * 70)
+    print("ПЕРЕВІРКА ПАКЕТНОГО CLI (main.py convert / distance)")
+    print("=" * 70)
+    
+    import subprocess
+    import sys
+    from distances import distance_3d_spherical_arc_batch, distance_2d_polar_batch
+    from main import main
+    from point_io import iter_chunks, iter_columns, write_chunks
+    
+    rng = random.Random(29)
+    spherical = SphericalArray.from_points([
+        SphericalPoint(rng.uniform(1, 100), rng.uniform(-math.pi, math.pi), rng.uniform(0, math.pi))
+        for _ in range(1500)])
+    others = SphericalArray.from_points(list(reversed(spherical.to_points())))
+    
+    checks = []
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "spherical.bin")
+        write_chunks(source, [spherical], 'binary')
+        target = os.path.join(tmp, "cartesian.csv")
+        code = main(['convert', '--from', 'spherical', '--to', 'cartesian_3d', '-i', source,
+                     '-o', target, '--input-format', 'binary', '--chunk-size', '400'])
+        converted = [p for c in iter_chunks(target, 'cartesian_3d') for p in c]
+        checks.append(("convert: binary -> CSV фрагментами",
+                       code == 0 and converted == CartesianArray3D.from_spherical(spherical).to_points()))
+        
+        # Пари точок у декартових координатах, дуга рахується у сферичних
+        pairs = os.path.join(tmp, "pairs.csv")
+        with open(pairs, 'w') as f:
+            for a, b in zip(CartesianArray3D.from_spherical(spherical).to_points(),
+                            CartesianArray3D.from_spherical(others).to_points()):
+                f.write(f"{a.x!r},{a.y!r},{a.z!r},{b.x!r},{b.y!r},{b.z!r}\n")
+        distances_path = os.path.join(tmp, "arc.bin")
+        code = main(['distance', '--metric', 'spherical_arc', '--system', 'cartesian_3d',
+                     '-i', pairs, '-o', distances_path, '--output-format', 'binary',
+                     '--chunk-size', '512'])
+        values = [v for c in iter_columns(distances_path, 1, 'binary') for v in c[0]]
+        expected = distance_3d_spherical_arc_batch(
+            SphericalArray.from_cartesian(CartesianArray3D.from_spherical(spherical)),
+            SphericalArray.from_cartesian(CartesianArray3D.from_spherical(others)))
+        checks.append(("distance: пари з перетворенням системи", code == 0 and values == list(expected)))
+    
+    # Стандартний вхід -> стандартний вихід окремим процесом
+    polar = PolarArray.from_points([PolarPoint(rng.uniform(1, 10), rng.uniform(-math.pi, math.pi))
+                                    for _ in range(50)])
+    lines = ''.join(f"{p.radius!r},{p.angle!r}\n" for p in polar.to_points())
+    result = subprocess.run(
+        [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py'),
+         'distance', '--metric', 'polar_2d', '--reference', '1,0', '--haversine', '--no-header'],
+        input=lines, capture_output=True, text=True)
+    reference = PolarArray.from_points([PolarPoint(1.0, 0.0)] * len(polar))
+    checks.append(("distance: stdin -> stdout з опорною точкою",
+                   result.returncode == 0 and [float(v) for v in result.stdout.split()]
+                   == list(distance_2d_polar_batch(polar, reference, haversine=True))))
+    
+    result = subprocess.run(
+        [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py'),
+         'distance', '--metric', 'cartesian_3d', '--system', 'polar'],
+        input="1,0,2,0\n", capture_output=True, text=True)
+    checks.append(("Несумісні системи: код 1 та повідомлення у stderr",
+                   result.returncode == 1 and result.stderr.startswith("Помилка")))
+    
+    for name, passed in checks:
+        print(f"  {'✓' if passed else '✗'} {name}")
+    
+    assert all(passed for _, passed in checks)
+
+
+def test_storage_precision():
+    """Перевірка точності зберігання float32: збереження типу в усіх шляхах обробки"""
+    print("\n" + "=" * 70)
+    print("ПЕРЕВІРКА ТОЧНОСТІ ЗБЕРІГАННЯ (FLOAT32)")
+    print("=" * 70)
+    
+    from distances import distance_3d_spherical_arc_batch, distance_2d_polar_batch
+    from parallel import parallel_distances, parallel_convert
+    from point_store import write_store, open_store
+    from data_generator import generate
+    from conversion_registry import compile_conversion
+    from point_io import convert_points
+    import backends
+    
+    n = 3000
+    spherical = generate('uniform_spherical', n, seed=3, precision='float32')
+    cylindrical = CylindricalArray.from_cartesian(CartesianArray3D.from_spherical(spherical))
+    polar = generate('uniform_polar', n, seed=3)
+    float64_out = array('d', bytes(8 * n))
+    float32_out = array('f', bytes(4 * n))
+    
+    checks = [
+        ("generate(precision='float32') дає колонки float32",
+         spherical.precision == 'float32'
+         and all(column.typecode == 'f' for column in spherical.columns())),
+        ("astype: float32 == округлений float64, повторний виклик без копії",
+         polar.astype('float32') == PolarArray(*(array('f', c) for c in polar.columns()))
+         and spherical.astype('float32') is spherical),
+        ("from_points: float32 округлює, float64 без втрат",
+         PolarArray.from_points(polar.to_points(), 'float32') == polar.astype('float32')
+         and PolarArray.from_points(polar.to_points()) == polar),
+        ("Перетворення зберігають точність",
+         CartesianArray3D.from_spherical(spherical).precision == 'float32'
+         and CylindricalArray.from_cartesian(
+             CartesianArray3D.from_spherical(spherical)).precision == 'float32'),
+        ("Злиті багатокрокові перетворення зберігають точність",
+         compile_conversion('cylindrical', 'spherical').batch(cylindrical).precision == 'float32'
+         and convert_points(cylindrical, 'spherical')
+         == compile_conversion('cylindrical', 'spherical').batch(cylindrical)
+         and convert_points(cylindrical, 'spherical').precision == 'float32'),
+        ("Відстані float32 для колонок float32, float64 для змішаних",
+         distance_3d_spherical_arc_batch(spherical, spherical[0]).typecode == 'f'
+         and distance_2d_polar_batch(polar.astype('float32'), polar[::-1]).typecode == 'd'),
+        ("out: запис у буфер float64 чи float32 незалежно від входів",
+         distance_3d_spherical_arc_batch(spherical, spherical, out=float64_out) is float64_out
+         and distance_3d_spherical_arc_batch(spherical, spherical, out=float32_out) is float32_out
+         and float32_out == distance_3d_spherical_arc_batch(spherical, spherical)),
+        ("to_buffer / from_buffer у float32",
+         SphericalArray.from_buffer(spherical.to_buffer('interleaved'), 'interleaved',
+                                    precision='float32') == spherical),
+        ("Паралельний режим: float32 у спільній пам'яті",
+         parallel_distances(spherical, spherical[0], 'spherical_arc', workers=2, chunk_size=700)
+         == distance_3d_spherical_arc_batch(spherical, spherical[0])
+         and parallel_convert(spherical, 'spherical_to_cartesian', workers=2, chunk_size=700)
+         == CartesianArray3D.from_spherical(spherical)),
+    ]
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'points.pts')
+        write_store(path, spherical)
+        with open_store(path) as store:
+            checks.append(("Файл точок: тип float32 і удвічі менший розмір",
+                           store.typecode == 'f' and store.points == spherical
+                           and os.path.getsize(path) == 64 + 3 * 4 * n))
+    
+    for name, backend in backends.BACKENDS.items():
+        cartesian = backend.kernels.get('SphericalArray.from_cartesian')
+        distance = backend.kernels.get('distance_3d_cartesian_batch')
+        source = CartesianArray3D.from_spherical(spherical)
+        checks.append((f"Бекенд {name}: результати float32",
+                       (cartesian is None or cartesian(source).precision == 'float32')
+                       and (distance is None or distance(source, source).typecode == 'f')))
+    
+    for name, passed in checks:
+        print(f"  {'✓' if passed else '✗'} {name}")
+    
+    assert all(passed for _, passed in checks)
 
 
 if __name__ == "__main__":
     test_2d_conversions()
     test_3d_conversions()
     test_distance_equivalence()
+    test_batch_conversions()
+    test_batch_distances()
+    test_distance_matrix()
+    test_prepared_points()
+    test_compact_points()
+    test_conversion_cache()
+    test_streaming_aggregates()
+    test_fused_conversions()
+    test_parallel_engine()
+    test_streaming_io()
+    test_point_store()
+    test_buffer_interop()
+    test_data_generator()
+    test_instrumentation()
+    test_backends()
+    test_batch_cli()
+    test_storage_precision()
     
     print("\n" + "=" * 70)
     print("ТЕСТУВАННЯ ЗАВЕРШЕНО")
@@ -0,0 +1,129 @@
+"""
+Тести геодезичних координат WGS84: відомі точки, зворотне перетворення,
+відстань Вінсенті та збіг пакетних шляхів зі скалярними
+"""
+
+import math
+import random
+from coordinate_systems import CartesianPoint3D, CartesianArray3D
+from geodetic import (
+    GeodeticPoint, GeodeticArray,
+    WGS84_A, WGS84_B,
+    cartesian_from_geodetic, cartesian_array_from_geodetic,
+    geodesic_distance, geodesic_distance_batch
+)
+
+
+def _report(name: str, passed: bool) -> bool:
+    print(f"  {'✓' if passed else '✗'} {name}")
+    return passed
+
+
+def test_geodetic_conversions():
+    """Геодезичні <-> ECEF: відомі точки, зворотне перетворення, пакетні шляхи"""
+    print("\n" + "=" * 70)
+    print("ТЕСТУВАННЯ ГЕОДЕЗИЧНИХ ПЕРЕТВОРЕНЬ WGS84")
+    print("=" * 70)
+
+    all_passed = True
+    equator = cartesian_from_geodetic(GeodeticPoint(0.0, 0.0, 0.0))
+    pole = cartesian_from_geodetic(GeodeticPoint(math.pi / 2, 0.0, 100.0))
+    all_passed &= _report("Екватор на нульовому меридіані -> (a, 0, 0)",
+                          equator == CartesianPoint3D(WGS84_A, 0.0, 0.0))
+    all_passed &= _report("Північний полюс на висоті 100 м -> (0, 0, b + 100)",
+                          abs(pole.x) < 1e-9 and abs(pole.z - (WGS84_B + 100)) < 1e-6)
+    back = GeodeticPoint.from_cartesian(CartesianPoint3D(0.0, 0.0, -WGS84_B))
+    all_passed &= _report("Південний полюс з ECEF",
+                          back.latitude == -math.pi / 2 and abs(back.height) < 1e-6)
+
+    rng = random.Random(37)
+    points = GeodeticArray.from_points([
+        GeodeticPoint(math.asin(rng.uniform(-1, 1)), rng.uniform(-math.pi, math.pi),
+                      rng.choice([0.0, rng.uniform(-1e4, 1e4), rng.uniform(1e5, 4e7)]))
+        for _ in range(3000)] + [GeodeticPoint(0.0, math.pi, 0.0), GeodeticPoint(0.0, 0.0, 1e7)])
+    ecef = cartesian_array_from_geodetic(points)
+    restored = GeodeticArray.from_cartesian(ecef)
+    error = max(max(abs(a - b) for a, b in zip(restored.latitude, points.latitude)) * WGS84_A,
+                max(abs(math.remainder(a - b, 2 * math.pi))
+                    for a, b in zip(restored.longitude, points.longitude)) * WGS84_A,
+                max(abs(a - b) for a, b in zip(restored.height, points.height)))
+    all_passed &= _report(f"Зворотне перетворення (похибка {error:.1e} м < 1 мкм)", error < 1e-6)
+    all_passed &= _report("Пакетне -> ECEF збігається побітово",
+                          ecef.to_points() == [cartesian_from_geodetic(p) for p in points])
+    all_passed &= _report("Пакетне ECEF -> геодезичні збігається побітово",
+                          restored.to_points()
+                          == [GeodeticPoint.from_cartesian(c) for c in ecef])
+
+    try:
+        GeodeticPoint.from_cartesian(CartesianPoint3D(0.0, 0.0, 0.0))
+        rejected = False
+    except ValueError:
+        rejected = True
+    all_passed &= _report("Центр Землі відхиляється з ValueError", rejected)
+
+    assert all_passed
+
+
+def test_geodesic_distance():
+    """Відстань Вінсенті: еталонний приклад, вироджені випадки, пакетний шлях"""
+    print("\n" + "=" * 70)
+    print("ТЕСТУВАННЯ ГЕОДЕЗИЧНОЇ ВІДСТАНІ (ВІНСЕНТІ)")
+    print("=" * 70)
+
+    all_passed = True
+    # Приклад Вінсенті: Flinders Peak -> Buninyong, 54 972.271 м
+    flinders = GeodeticPoint.from_degrees(-(37 + 57 / 60 + 3.72030 / 3600),
+                                          144 + 25 / 60 + 29.52440 / 3600)
+    buninyong = GeodeticPoint.from_degrees(-(37 + 39 / 60 + 10.15610 / 3600),
+                                           143 + 55 / 60 + 35.38390 / 3600)
+    distance = geodesic_distance(flinders, buninyong)
+    all_passed &= _report(f"Flinders Peak -> Buninyong = {distance:.3f} м",
+                          abs(distance - 54972.271) < 1e-3)
+    all_passed &= _report("Симетрія та нуль для однакових точок",
+                          abs(geodesic_distance(buninyong, flinders) - distance) < 1e-6
+                          and geodesic_distance(flinders, flinders) == 0.0)
+    quarter = geodesic_distance(GeodeticPoint(0.0, 0.0), GeodeticPoint(0.0, math.pi / 2))
+    all_passed &= _report("Чверть екватора = π·a/2",
+                          abs(quarter - math.pi * WGS84_A / 2) < 1e-4)
+
+    # Майже антиподальна пара, де ітерація без згладжування осцилює
+    near_antipodal = geodesic_distance(GeodeticPoint.from_degrees(21.092684928938578, 153.94627607595712),
+                                       GeodeticPoint.from_degrees(-21.28398649519922, -26.19525160777133))
+    all_passed &= _report(f"Майже антиподальні точки збігаються ({near_antipodal:,.0f} м)",
+                          19.9e6 < near_antipodal <= math.pi * WGS84_A)
+
+    # Антиподальні пари, де ітерація Вінсенті не збігається; еталон — GeographicLib
+    antipodal_cases = [
+        ((0.0, 0.0), (0.0, 180.0), 20003931.458625),
+        ((0.0, 0.0), (0.0, 179.7), 19995624.889961),
+        ((0.1, 0.0), (-0.1, 180.0), 20003931.458625),
+        ((-30.0, 0.0), (29.9, 179.8), 19989832.827610),
+    ]
+    errors = [abs(geodesic_distance(GeodeticPoint.from_degrees(*p), GeodeticPoint.from_degrees(*q))
+                  - expected) for p, q, expected in antipodal_cases]
+    all_passed &= _report(f"Екваторіальні та інші антиподи (похибка до {max(errors) * 1e3:.2f} мм)",
+                          max(errors) < 1e-3)
+    equator = GeodeticArray.from_points([GeodeticPoint.from_degrees(0.0, lon)
+                                         for lon in (0.0, 90.0, 179.5, 179.9)])
+    all_passed &= _report("Пакет з антиподами не переривається винятком",
+                          list(geodesic_distance_batch(GeodeticPoint(0.0, 0.0), equator))
+                          == [geodesic_distance(GeodeticPoint(0.0, 0.0), q) for q in equator])
+
+    rng = random.Random(41)
+    a = GeodeticArray.from_points([GeodeticPoint(math.asin(rng.uniform(-1, 1)),
+                                                 rng.uniform(-math.pi, math.pi))
+                                   for _ in range(1000)])
+    b = GeodeticArray.from_points(list(reversed(a.to_points())))
+    all_passed &= _report("Пакетна відстань збігається побітово",
+                          list(geodesic_distance_batch(a, b))
+                          == [geodesic_distance(p, q) for p, q in zip(a, b)])
+    all_passed &= _report("Одиночна точка транслюється на колонку",
+                          list(geodesic_distance_batch(flinders, a))
+                          == [geodesic_distance(flinders, q) for q in a])
+
+    assert all_passed
+
+
+if __name__ == "__main__":
+    test_geodetic_conversions()
+    test_geodesic_distance()
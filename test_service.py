@@ -0,0 +1,151 @@
+"""
+Тести локального сервісу: відповіді збігаються з прямими викликами,
+одночасні запити об'єднуються в пакети, помилки не зачіпають сусідів
+"""
+
+import asyncio
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+from dataclasses import astuple
+from coordinate_systems import (
+    CartesianPoint2D, PolarPoint,
+    CartesianPoint3D, SphericalPoint
+)
+from distances import (
+    distance_2d_polar, distance_3d_cartesian,
+    distance_3d_spherical_chord, distance_3d_spherical_arc
+)
+from service import DistanceService, ServiceClient
+
+
+def _report(name: str, passed: bool) -> bool:
+    print(f"  {'✓' if passed else '✗'} {name}")
+    return passed
+
+
+async def _scenario(address: dict) -> list:
+    rng = random.Random(3)
+    polar = [PolarPoint(rng.uniform(1, 100), rng.uniform(-math.pi, math.pi)) for _ in range(200)]
+    spherical = [SphericalPoint(rng.uniform(1, 100), rng.uniform(-math.pi, math.pi),
+                                rng.uniform(0, math.pi)) for _ in range(200)]
+    cartesian = [CartesianPoint3D.from_spherical(s) for s in spherical]
+
+    async with DistanceService(window=0.01) as service:
+        await service.start(**address)
+        where = service.address
+        connect = ({'path': where} if isinstance(where, str) else
+                   {'host': where[0], 'port': where[1]})
+        clients = [await ServiceClient.connect(**connect) for _ in range(3)]
+
+        def client(i):
+            return clients[i % len(clients)]
+
+        polar_results, arc_results, chord_results, approx_results, cartesian_results, \
+            converted = await asyncio.gather(
+                asyncio.gather(*(client(i).distance('polar_2d', astuple(polar[i]),
+                                                    astuple(polar[i - 1]))
+                                 for i in range(len(polar)))),
+                asyncio.gather(*(client(i).distance('spherical_arc', astuple(spherical[i]),
+                                                    astuple(spherical[i - 1]))
+                                 for i in range(len(spherical)))),
+                asyncio.gather(*(client(i).distance('spherical_chord', astuple(spherical[i]),
+                                                    astuple(spherical[i - 1]))
+                                 for i in range(len(spherical)))),
+                asyncio.gather(*(client(i).distance('spherical_arc', astuple(spherical[i]),
+                                                    astuple(spherical[i - 1]), haversine=True)
+                                 for i in range(len(spherical)))),
+                asyncio.gather(*(client(i).distance('cartesian_3d', astuple(cartesian[i]),
+                                                    astuple(cartesian[i - 1]))
+                                 for i in range(len(cartesian)))),
+                asyncio.gather(*(client(i).convert('polar_to_cartesian', astuple(p))
+                                 for i, p in enumerate(polar))))
+
+        # Некоректні запити отримують помилку, сусідні запити — результат.
+        # Для r = 1597/7 точна формула дає √ від'ємного, і пакет падає цілком.
+        # Нескінченний результат (1e308 - -1e308) повертається помилкою, а не токеном Infinity
+        mixed = await asyncio.gather(
+            clients[0].distance('polar_2d', [1.0, 0.0], [2.0, 1.0]),
+            clients[0].distance('polar_2d', [1597 / 7, 0.5], [1597 / 7, 0.5]),
+            clients[0].distance('no_such_metric', [1.0], [2.0]),
+            clients[0].distance('polar_2d', [1.0], [2.0, 1.0]),
+            clients[0].convert('polar_to_cartesian', [1.0, 'кут']),
+            clients[0].distance('cartesian_3d', [0.0, 0.0, 0.0], [1.0, 0.0, 0.0],
+                                haversine=True),
+            clients[0].distance('polar_2d', [math.nan, 0.0], [1.0, 0.0]),
+            clients[0].distance('cartesian_2d', [1e308, 0.0], [-1e308, 0.0]),
+            clients[0].convert('polar_to_cartesian', [2.0, 0.0]),
+            return_exceptions=True)
+        stats = service.stats()
+        for c in clients:
+            await c.close()
+
+    requests = 6 * 200 + 9
+    return [
+        ("Полярна відстань збігається побітово",
+         polar_results == [distance_2d_polar(polar[i], polar[i - 1]) for i in range(len(polar))]),
+        ("Дуга збігається побітово",
+         arc_results == [distance_3d_spherical_arc(spherical[i], spherical[i - 1])
+                         for i in range(len(spherical))]),
+        ("Хорда збігається побітово",
+         chord_results == [distance_3d_spherical_chord(spherical[i], spherical[i - 1])
+                           for i in range(len(spherical))]),
+        ("Гаверсинусний режим передається",
+         approx_results == [distance_3d_spherical_arc(spherical[i], spherical[i - 1],
+                                                      haversine=True)
+                            for i in range(len(spherical))]),
+        ("Декартова відстань збігається побітово",
+         cartesian_results == [distance_3d_cartesian(cartesian[i], cartesian[i - 1])
+                               for i in range(len(cartesian))]),
+        ("Перетворення збігаються побітово",
+         converted == [list(astuple(CartesianPoint2D.from_polar(p))) for p in polar]),
+        ("Помилки повертаються лише некоректним запитам",
+         mixed[0] == distance_2d_polar(PolarPoint(1.0, 0.0), PolarPoint(2.0, 1.0))
+         and all(isinstance(result, ValueError) for result in mixed[1:8])
+         and mixed[8] == [2.0, 0.0]),
+        (f"Запити об'єднуються в пакети ({stats['requests']} запитів, "
+         f"{stats['batches']} пакетів)",
+         stats['requests'] == requests - 5 and stats['batches'] < stats['requests'] / 10),
+    ]
+
+
+def test_service_matches_direct_calls():
+    """Сервіс через TCP та Unix-сокет дає ті самі результати, що й прямі виклики"""
+    print("\n" + "=" * 70)
+    print("ТЕСТУВАННЯ СЕРВІСУ З МІКРОПАКЕТУВАННЯМ")
+    print("=" * 70)
+
+    addresses = [("TCP", {'host': '127.0.0.1', 'port': 0})]
+    tmpdir = None
+    if hasattr(socket, 'AF_UNIX'):
+        tmpdir = tempfile.TemporaryDirectory()
+        addresses.append(("Unix-сокет", {'path': os.path.join(tmpdir.name, 'service.sock')}))
+
+    all_passed = True
+    try:
+        for label, address in addresses:
+            print(f"\n{label}:")
+            for name, passed in asyncio.run(_scenario(address)):
+                all_passed &= _report(name, passed)
+    finally:
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+    # Реєстри беруться з distances і coordinate_systems, без пулу процесів
+    result = subprocess.run(
+        [sys.executable, '-c',
+         "import sys, service, load_generator; print('parallel' in sys.modules)"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    print()
+    all_passed &= _report("Імпорт service і load_generator не завантажує parallel",
+                          result.stdout.strip() == 'False')
+
+    assert all_passed
+
+
+if __name__ == "__main__":
+    test_service_matches_direct_calls()
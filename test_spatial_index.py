@@ -0,0 +1,159 @@
+"""
+Тести просторових індексів: результати мають збігатися з повним перебором
+"""
+
+import math
+import random
+from dataclasses import astuple
+from coordinate_systems import (
+    CartesianPoint2D, CartesianPoint3D, SphericalPoint,
+    CartesianArray2D, CartesianArray3D
+)
+from distances import (
+    distance_2d_cartesian, distance_3d_cartesian, distance_3d_spherical_arc
+)
+from spatial_index import KDTree, SphericalIndex, brute_force_knn
+from spatial_join import arc_join, radius_join
+
+
+def _report(name: str, passed: bool) -> bool:
+    print(f"  {'✓' if passed else '✗'} {name}")
+    return passed
+
+
+def test_kdtree_matches_brute_force():
+    """KD-дерево: k-NN, радіус та прямокутник збігаються з повним перебором"""
+    print("=" * 70)
+    print("ТЕСТУВАННЯ KD-ДЕРЕВА")
+    print("=" * 70)
+    
+    rng = random.Random(5)
+    # Округлені координати дають багато однакових відстаней та дублікатів
+    points_2d = [CartesianPoint2D(round(rng.uniform(-10, 10), 1),
+                                  round(rng.uniform(-10, 10), 1)) for _ in range(3000)]
+    points_3d = [CartesianPoint3D(rng.gauss(0, 5), rng.gauss(0, 5), rng.gauss(0, 5))
+                 for _ in range(3000)]
+    
+    all_passed = True
+    for label, points, array_type, distance in (
+            ("2D", points_2d, CartesianArray2D, distance_2d_cartesian),
+            ("3D", points_3d, CartesianArray3D, distance_3d_cartesian)):
+        tree = KDTree(points, leaf_size=8)
+        columns = array_type.from_points(points)
+        queries = points[:20] + [type(points[0])(*(rng.uniform(-12, 12) for _ in range(tree.dims)))
+                                 for _ in range(20)]
+        
+        knn_ok = tree.knn_batch(queries, 7) == [brute_force_knn(columns, q, 7) for q in queries]
+        radius_ok = tree.query_radius_batch(queries, 1.5) == [
+            [i for i, p in enumerate(points) if distance(q, p) <= 1.5] for q in queries]
+        
+        boxes = [(q, type(q)(*(v + 3 for v in astuple(q)))) for q in queries]
+        box_ok = tree.query_box_batch(boxes) == [
+            [i for i, p in enumerate(points)
+             if all(lo <= v <= hi for lo, v, hi in zip(astuple(low), astuple(p), astuple(high)))]
+            for low, high in boxes]
+        
+        all_passed &= _report(f"{label}: k-NN", knn_ok)
+        all_passed &= _report(f"{label}: пошук у радіусі", radius_ok)
+        all_passed &= _report(f"{label}: пошук у прямокутнику", box_ok)
+    
+    assert all_passed
+
+
+def test_spherical_index_matches_brute_force():
+    """Сферичний індекс: k-NN та пошук у межах дуги точно збігаються з перебором"""
+    print("\n" + "=" * 70)
+    print("ТЕСТУВАННЯ СФЕРИЧНОГО ІНДЕКСУ (ДУГОВА ВІДСТАНЬ)")
+    print("=" * 70)
+    
+    rng = random.Random(8)
+    radius = 6371.0
+    # Округлені кути дають дублікати та однакові дуги
+    points = [SphericalPoint(radius, round(rng.uniform(-math.pi, math.pi), 2),
+                             round(math.acos(rng.uniform(-1, 1)), 2))
+              for _ in range(3000)]
+    index = SphericalIndex(points, leaf_size=8)
+    queries = points[:20] + [
+        SphericalPoint(radius, rng.uniform(-math.pi, math.pi), rng.uniform(0, math.pi))
+        for _ in range(20)
+    ] + [SphericalPoint(radius, 0, 0), SphericalPoint(radius, 0, math.pi)]
+    
+    def brute_force(query):
+        return sorted((distance_3d_spherical_arc(query, p), i) for i, p in enumerate(points))
+    
+    knn_ok = index.knn_batch(queries, 9) == [brute_force(q)[:9] for q in queries]
+    arc_ok = index.within_arc_batch(queries, 500.0) == [
+        sorted(i for d, i in brute_force(q) if d <= 500.0) for q in queries]
+    
+    try:
+        SphericalIndex([SphericalPoint(1, 0, 0), SphericalPoint(2, 0, 0)])
+        radius_checked = False
+    except ValueError:
+        radius_checked = True
+    
+    all_passed = _report("k-NN за дугою", knn_ok)
+    all_passed &= _report("пошук у межах дуги", arc_ok)
+    all_passed &= _report("різні радіуси відхиляються", radius_checked)
+    
+    assert all_passed
+
+
+def test_spatial_join_matches_brute_force():
+    """Просторове з'єднання: усі пари в межах порогу, як у вкладених циклах"""
+    print("\n" + "=" * 70)
+    print("ТЕСТУВАННЯ ПРОСТОРОВОГО З'ЄДНАННЯ (СІТКА КОМІРОК)")
+    print("=" * 70)
+    
+    rng = random.Random(13)
+    
+    def pairs(chunks):
+        return sorted((i, j) for left, right in chunks for i, j in zip(left, right))
+    
+    # Округлені координати дають пари точно на відстані порогу
+    a_2d = [CartesianPoint2D(round(rng.uniform(-20, 20)), round(rng.uniform(-20, 20)))
+            for _ in range(700)]
+    b_2d = [CartesianPoint2D(round(rng.uniform(-20, 20)), round(rng.uniform(-20, 20)))
+            for _ in range(600)]
+    a_3d = [CartesianPoint3D(rng.gauss(0, 5), rng.gauss(0, 5), rng.gauss(0, 5)) for _ in range(700)]
+    b_3d = [CartesianPoint3D(rng.gauss(0, 5), rng.gauss(0, 5), rng.gauss(0, 5)) for _ in range(600)]
+    
+    all_passed = True
+    for label, a, b, distance, radius in (
+            ("2D", a_2d, b_2d, distance_2d_cartesian, 2.0),
+            ("3D", a_3d, b_3d, distance_3d_cartesian, 1.5)):
+        expected = [(i, j) for i, p in enumerate(a) for j, q in enumerate(b)
+                    if distance(p, q) <= radius]
+        chunks = list(radius_join(a, b, radius, chunk_size=100))
+        all_passed &= _report(f"{label}: пари збігаються з перебором ({len(expected)})",
+                              pairs(chunks) == expected)
+        all_passed &= _report(f"{label}: фрагменти по chunk_size",
+                              all(len(left) == len(right) == 100 for left, right in chunks[:-1]))
+    all_passed &= _report("2D: нульовий радіус — лише однакові точки",
+                          pairs(radius_join(a_2d, b_2d, 0.0))
+                          == [(i, j) for i, p in enumerate(a_2d) for j, q in enumerate(b_2d) if p == q])
+    
+    radius = 6371.0
+    a_sphere = [SphericalPoint(radius, round(rng.uniform(-math.pi, math.pi), 2),
+                               round(math.acos(rng.uniform(-1, 1)), 2)) for _ in range(700)]
+    b_sphere = [SphericalPoint(radius, round(rng.uniform(-math.pi, math.pi), 2),
+                               round(math.acos(rng.uniform(-1, 1)), 2)) for _ in range(600)]
+    for arc in (300.0, 2000.0, math.pi * radius):
+        expected = [(i, j) for i, p in enumerate(a_sphere) for j, q in enumerate(b_sphere)
+                    if distance_3d_spherical_arc(p, q) <= arc]
+        all_passed &= _report(f"Сфера: дуга {arc:.0f} ({len(expected)} пар)",
+                              pairs(arc_join(a_sphere, b_sphere, arc)) == expected)
+    
+    try:
+        arc_join([SphericalPoint(1, 0, 0)], [SphericalPoint(2, 0, 0)], 1.0)
+        radius_checked = False
+    except ValueError:
+        radius_checked = True
+    all_passed &= _report("різні радіуси відхиляються", radius_checked)
+    
+    assert all_passed
+
+
+if __name__ == "__main__":
+    test_kdtree_matches_brute_force()
+    test_spherical_index_matches_brute_force()
+    test_spatial_join_matches_brute_force()